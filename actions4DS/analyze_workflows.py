@@ -1,52 +1,118 @@
 import re
+import sys
+import threading
+from array import array
 from collections import Counter
 from pathlib import Path
-from typing import Optional, Union
+from typing import Callable, Iterable, Optional, Union
 
+import numpy as np
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
-from config import DATA_DIR, DUMPS_DIR
-from mlxtend import frequent_patterns
-from mlxtend.frequent_patterns import apriori
-from mlxtend.preprocessing import TransactionEncoder
+from config import setup_run
+from cooccurrence import CooccurrenceMatrix, RuleThresholds
+from corpus import WorkflowArchive, is_workflow_key
+from html_extraction import (
+    MarketplacePage,
+    extract_marketplace_link,
+    extract_marketplace_page,
+)
+from instrumentation import metrics
+from jobs import Job, dag_depths, extract_job, needed_jobs
+from marketplace import MarketplaceCatalog
 from models import GitHubSlug
+from references import ReferenceKind, ReferenceResolver, classify_reference
 from rich import print
 from ruamel.yaml import YAML
+from summaries import SummaryTables
+from workflow_index import WorkflowIndex
 
 
 class Action:
+    """An action referenced by the `uses` key of a workflow step.
+
+    A few hundred distinct actions account for most of the occurrences in the
+    corpus, so actions are interned: `Action.intern()` maps each distinct slug
+    to a small integer id, and workflows only store those ids.
+    """
+
+    __slots__ = (
+        "slug",
+        "name",
+        "slug_without_tag",
+        "tag",
+        "reference_kind",
+        "docker_related",
+        "parsed_marketplace_page",
+        "available_in_marketplace",
+        "is_from_verified_creator",
+        "categories",
+    )
 
     scraping_cache: dict = {}
     BASE_GITHUB_URL = "https://github.com"
 
+    # When set, marketplace data is looked up here instead of being scraped
+    marketplace_catalog: Optional[MarketplaceCatalog] = None
+    SLUG_REGEX = re.compile(r"^(.*\/([^@\n]*))(@.*)?$")
+    ASDICT_KEYS = (
+        "action_slug",
+        "action_name",
+        "action_slug_noTag",
+        "action_tag",
+        "docker_related_action",
+        "action_reference_type",
+        "available_in_marketplace",
+        "from_verified_creator",
+        "category_1",
+        "category_2",
+    )
+
+    # Intern table: slug -> id, and id -> Action
+    _ids: dict[str, int] = {}
+    _instances: list["Action"] = []
+    _intern_lock = threading.Lock()
+
     def __init__(
         self,
         slug: str,
     ) -> None:
         # Slug validation
-        regex = re.compile(r"^(.*\/([^@\n]*))(@.*)?$")
-        match = regex.match(slug)
+        match = self.SLUG_REGEX.match(slug)
         if match:
-            self.slug = slug
+            self.slug = sys.intern(slug)
         else:
             raise ValueError("Invalid action slug.")
 
-        self.name = match.group(2)
-        self.slug_without_tag = match.group(1)
-        self.tag = match.group(3)
+        self.name = sys.intern(match.group(2))
+        self.slug_without_tag = sys.intern(match.group(1))
+        self.tag = sys.intern(match.group(3)) if match.group(3) else None
+        self.reference_kind: ReferenceKind = classify_reference(slug).kind
 
         self.docker_related = self._is_docker_related()
 
-        self.parsed_marketplace_page: BeautifulSoup = (
-            self._get_parsed_marketplace_page()
-        )
-
+        self.parsed_marketplace_page: Optional[MarketplacePage] = None
         self.is_from_verified_creator = None
         self.categories = None
-        if self.parsed_marketplace_page:
-            self.is_from_verified_creator = self._is_from_verified_creator()
-            self.categories = self._get_action_categories()
+        if self.reference_kind is not ReferenceKind.REMOTE_ACTION:
+            # Local actions and docker images are never on the marketplace
+            self.available_in_marketplace = False
+        elif self.marketplace_catalog is not None and (
+            self.marketplace_catalog.complete
+            or self.slug_without_tag in self.marketplace_catalog
+        ):
+            listing = self.marketplace_catalog.get(self.slug_without_tag)
+            self.available_in_marketplace: bool = listing is not None
+            if listing:
+                self.is_from_verified_creator = listing.verified_creator
+                self.categories = listing.categories
+        else:
+            # No catalog, or missing from an incomplete one: scrape GitHub
+            self.parsed_marketplace_page = self._get_parsed_marketplace_page()
+            self.available_in_marketplace = bool(self.parsed_marketplace_page)
+            if self.parsed_marketplace_page:
+                self.is_from_verified_creator = self._is_from_verified_creator()
+                self.categories = self._get_action_categories()
 
     def asdict(self) -> dict:
         return {
@@ -55,14 +121,52 @@ class Action:
             "action_slug_noTag": self.slug_without_tag,
             "action_tag": self.tag,
             "docker_related_action": self.docker_related,
-            "available_in_marketplace": True if self.parsed_marketplace_page else False,
+            "action_reference_type": self.reference_kind.value,
+            "available_in_marketplace": self.available_in_marketplace,
             "from_verified_creator": True if self.is_from_verified_creator else False,
             "category_1": self.categories[0] if self.categories else None,
-            "category_2": self.categories[1]
-            if self.categories and len(self.categories) > 1
-            else None,
+            "category_2": (
+                self.categories[1]
+                if self.categories and len(self.categories) > 1
+                else None
+            ),
         }
 
+    @classmethod
+    def intern(cls, slug: str) -> int:
+        """Return the id of the action with the given slug.
+
+        The action is created (and enriched with marketplace data) the first
+        time its slug is seen.
+        """
+        action_id = cls._ids.get(slug)
+        if action_id is None:
+            with cls._intern_lock:
+                action_id = cls._ids.get(slug)
+                if action_id is None:
+                    action = cls(slug)
+                    action_id = len(cls._instances)
+                    cls._instances.append(action)
+                    cls._ids[action.slug] = action_id
+        return action_id
+
+    @classmethod
+    def from_id(cls, action_id: int) -> "Action":
+        return cls._instances[action_id]
+
+    @classmethod
+    def to_dataframe(cls, action_ids: np.ndarray) -> pd.DataFrame:
+        """Build one row per action occurrence from an array of action ids.
+
+        Each distinct action is converted once; the rows are then gathered
+        with a vectorized take.
+        """
+        columns = list(cls.ASDICT_KEYS)
+        distinct_actions_df = pd.DataFrame.from_records(
+            [action.asdict() for action in cls._instances], columns=columns
+        )
+        return distinct_actions_df.take(action_ids).reset_index(drop=True)
+
     def __repr__(self) -> str:
         return f'Action("{self.slug}")'
 
@@ -72,91 +176,73 @@ class Action:
     def _is_docker_related(self) -> bool:
         return True if re.search("docker", self.slug, re.IGNORECASE) else False
 
-    def _get_parsed_marketplace_page(self) -> Optional[BeautifulSoup]:
+    @metrics.timed("action.marketplace_lookup")
+    def _get_parsed_marketplace_page(self) -> Optional[MarketplacePage]:
 
         cache = self.scraping_cache.get(self.slug_without_tag)
         if cache:
             if cache["available_in_marketplace"]:
-                return cache["parsed_html"]
+                return cache["marketplace_page"]
             else:
                 return None
         else:
             URL = self.BASE_GITHUB_URL + "/" + self.slug_without_tag
 
             try:
-                page = requests.get(URL)
+                with metrics.timer("http.repo_page"):
+                    page = requests.get(URL)
                 if page.status_code != 200:
-                    raise Exception("GitHub repo not found.")
-                repo_page_html = BeautifulSoup(page.content, "html.parser")
-                view_on_marketplace_btn = repo_page_html.find(
-                    "a", string="View on Marketplace"
-                )
-                if view_on_marketplace_btn:
-                    marketplace_ref = view_on_marketplace_btn["href"]
+                    raise LookupError("GitHub repo not found.")
+                with metrics.timer("action.html_extraction"):
+                    marketplace_ref = extract_marketplace_link(page.content)
+                if not marketplace_ref:
+                    raise LookupError("Action not published on the marketplace.")
 
                 URL = self.BASE_GITHUB_URL + marketplace_ref
-                page = requests.get(URL)
+                with metrics.timer("http.marketplace_page"):
+                    page = requests.get(URL)
                 if page.status_code != 200:
-                    raise Exception("Marketplace page not found.")
-                parsed_html = BeautifulSoup(page.content, "html.parser")
+                    raise LookupError("Marketplace page not found.")
+                with metrics.timer("action.html_extraction"):
+                    marketplace_page = extract_marketplace_page(page.content)
                 self.scraping_cache.update(
                     {
                         self.slug_without_tag: {
                             "available_in_marketplace": True,
-                            "parsed_html": parsed_html,
-                            "from_verified_creator": None,
-                            "categories": None,
+                            "marketplace_page": marketplace_page,
                         }
                     }
                 )
-                return parsed_html
-            except Exception:
+                return marketplace_page
+            except (LookupError, requests.RequestException):
                 self.scraping_cache.update(
                     {
                         self.slug_without_tag: {
                             "available_in_marketplace": False,
-                            "parsed_html": None,
-                            "from_verified_creator": None,
-                            "categories": None,
+                            "marketplace_page": None,
                         }
                     }
                 )
                 return None
 
     def _is_from_verified_creator(self) -> bool:
-        cache = self.scraping_cache[self.slug_without_tag]["from_verified_creator"]
-        if cache:
-            return cache
-        else:
-            res = (
-                True
-                if self.parsed_marketplace_page.find_all(
-                    "svg", class_="octicon-verified"
-                )
-                else False
-            )
-            self.scraping_cache[self.slug_without_tag]["from_verified_creator"] = res
-            return res
+        return self.parsed_marketplace_page.verified_creator
 
     def _get_action_categories(self) -> tuple:
-        cache = self.scraping_cache[self.slug_without_tag]["categories"]
-        if cache:
-            return cache
-        else:
-            res = tuple(
-                c.text.strip()
-                for c in self.parsed_marketplace_page.find_all("a", class_="topic-tag")
-            )
-            self.scraping_cache[self.slug_without_tag]["categories"] = res
-            return res
+        return self.parsed_marketplace_page.categories
 
 
 class RunCommand:
+
+    __slots__ = ("command", "docker_related", "docker_commands")
+
     def __init__(self, command: str) -> None:
         self.command: str = command
         self.docker_related: bool = self._is_docker_related()
         self.docker_commands: list[str] = (
-            self._get_docker_commands() if self.docker_related else []
+            [sys.intern(c) for c in self._get_docker_commands()]
+            if self.docker_related
+            else []
         )
 
     def asdict(self) -> dict:
@@ -193,26 +279,88 @@ class RunCommand:
             r"cml-?.*(?: --?\S*)* (\S*).*",
             self.command,
             re.IGNORECASE,
-        ) 
+        )
 
 
 class Workflow:
-    def __init__(self, data_dir: Path, local_path: Path) -> None:
+
+    __slots__ = (
+        "_data_dir",
+        "_local_path",
+        "_content",
+        "_yaml",
+        "name",
+        "events",
+        "action_ids",
+        "indirect_action_ids",
+        "reusable_workflows",
+        "n_of_run_commands",
+        "docker_related_commands",
+        "docker_commands",
+        "jobs",
+    )
+
+    def __init__(
+        self,
+        data_dir: Path,
+        local_path: Path,
+        content: Optional[str] = None,
+        resolver: Optional[ReferenceResolver] = None,
+    ) -> None:
         self._data_dir: Path = data_dir
         self._local_path: Path = local_path
+        self._content: Optional[str] = content
 
-        self._yaml: dict = self._parse_yaml()
+        self._yaml: Optional[dict] = self._parse_yaml()
 
         self.name: Optional[str] = self._yaml.get("name")
-        self.events: list[str] = self._get_triggering_events()
-
-        raw_actions, raw_commands = self._get_raw_components()
-        self.actions: list[Action] = [Action(a) for a in raw_actions]
-        self.commands: list[RunCommand] = [RunCommand(c) for c in raw_commands]
+        self.events: list[str] = [
+            sys.intern(str(e)) for e in self._get_triggering_events()
+        ]
+
+        raw_actions, raw_commands, raw_workflows, self.jobs = self._get_raw_components()
+        with metrics.timer("workflow.actions"):
+            references = [classify_reference(a) for a in raw_actions]
+            # Interned action ids (see `Action.intern()`)
+            self.action_ids: array = array(
+                "I",
+                [
+                    Action.intern(r.value)
+                    for r in references
+                    if r.kind is not ReferenceKind.INVALID
+                ],
+            )
+            # Remote actions used through local composite actions
+            self.indirect_action_ids: array = array("I")
+            if resolver:
+                repository = str(self.repository)
+                for reference in references:
+                    if reference.kind is ReferenceKind.LOCAL_ACTION:
+                        nested = resolver.resolve_action(repository, reference.value)
+                        self.indirect_action_ids.extend(
+                            Action.intern(a) for a in nested or ()
+                        )
+        with metrics.timer("workflow.reusable_workflows"):
+            self.reusable_workflows: list[str] = [
+                self._resolve_reusable_workflow(w, resolver) for w in raw_workflows
+            ]
+        # Only the docker facts of the run commands are kept, not their scripts
+        with metrics.timer("workflow.run_commands"):
+            run_commands = [RunCommand(c) for c in raw_commands]
+        self.n_of_run_commands: int = len(run_commands)
+        self.docker_related_commands: bool = any(c.docker_related for c in run_commands)
         self.docker_commands: Counter = Counter()
-        for run_command in self.commands:
+        for run_command in run_commands:
             self.docker_commands.update(run_command.docker_commands)
 
+        # Everything needed has been extracted: drop the raw document
+        self._yaml = None
+        self._content = None
+
+    @property
+    def actions(self) -> list[Action]:
+        return [Action.from_id(action_id) for action_id in self.action_ids]
+
     @property
     def filename(self) -> str:
         return self._local_path.name
@@ -230,11 +378,15 @@ class Workflow:
             "filename": self.filename,
             "name": self.name,
             "trigger_events": self.events,
-            "n_of_actions": len(self.actions),
+            "n_of_actions": len(self.action_ids),
+            "n_of_indirect_actions": len(self.indirect_action_ids),
+            "reusable_workflows": self.reusable_workflows,
             "docker_related_actions": any([a.docker_related for a in self.actions]),
-            "n_of_run_commands": len(self.commands),
-            "docker_related_commands": any([c.docker_related for c in self.commands]),
+            "n_of_run_commands": self.n_of_run_commands,
+            "docker_related_commands": self.docker_related_commands,
             "docker_commands": list(self.docker_commands.keys()),
+            "n_of_jobs": len(self.jobs),
+            "critical_path_length": max((j.dag_depth for j in self.jobs), default=0),
         }
         return d
 
@@ -244,8 +396,11 @@ class Workflow:
     def __str__(self) -> str:
         return str(self._local_path.relative_to(self._data_dir))
 
+    @metrics.timed("workflow.parse_yaml")
     def _parse_yaml(self) -> dict:
         yaml_parser = YAML(typ="safe", pure=True)
+        if self._content is not None:
+            return yaml_parser.load(self._content)
         return yaml_parser.load(self._local_path)
 
     def _get_triggering_events(self) -> list[str]:
@@ -258,12 +413,23 @@ class Workflow:
             events = [events_raw]
         return events
 
-    def _get_raw_components(self) -> tuple[list[str], list[str]]:
+    def _get_raw_components(
+        self,
+    ) -> tuple[list[str], list[str], list[str], list[Job]]:
         actions = []
         run_commands = []
-
-        for job in self._yaml["jobs"].keys():
-            for step in self._yaml["jobs"][job]["steps"]:
+        reusable_workflows = []
+        raw_jobs = []
+
+        for job_id, job in self._yaml["jobs"].items():
+            if not isinstance(job, dict):
+                continue
+            raw_jobs.append((str(job_id), job))
+            # Jobs calling a reusable workflow have no steps
+            workflow = job.get("uses")
+            if workflow:
+                reusable_workflows.append(str(workflow))
+            for step in job.get("steps") or []:
                 action = step.get("uses")
                 if action:
                     action = str(action)
@@ -274,55 +440,175 @@ class Workflow:
                     run_command = str(run_command)
                     run_commands.append(run_command)
 
-        return actions, run_commands
+        # The depths in the `needs` DAG require the dependencies of all jobs
+        with metrics.timer("workflow.jobs"):
+            depths = dag_depths({job_id: needed_jobs(job) for job_id, job in raw_jobs})
+            jobs = [
+                extract_job(job_id, job, depths[job_id]) for job_id, job in raw_jobs
+            ]
 
+        return actions, run_commands, reusable_workflows, jobs
+
+    def _resolve_reusable_workflow(
+        self, value: str, resolver: Optional[ReferenceResolver]
+    ) -> str:
+        """Return the corpus key of a local reusable workflow, else `value`."""
+        reference = classify_reference(value, job_level=True)
+        if resolver and reference.kind is ReferenceKind.LOCAL_WORKFLOW:
+            key = resolver.resolve_workflow(str(self.repository), value)
+            if key:
+                return sys.intern(key)
+        return sys.intern(value)
 
-class WorkflowAnalyzer:
-    def __init__(self, data_dir: Path) -> None:
 
+class WorkflowAnalyzer:
+    # Thresholds of the association rules derived from the co-occurrences
+    rule_thresholds = RuleThresholds()
+
+    def __init__(self, data_dir: Union[Path, WorkflowArchive]) -> None:
+        self.summaries: Optional[SummaryTables] = None
+        self._load_workflows(data_dir)
+        self._analyze()
+
+    @classmethod
+    def from_workflows(
+        cls, workflows: Iterable[Workflow], summaries: Optional[SummaryTables] = None
+    ) -> "WorkflowAnalyzer":
+        """Analyze workflows that were already parsed (e.g., by `pipeline.py`).
+
+        Args:
+            workflows: the parsed workflows
+            summaries: summary tables already maintained for `workflows`
+        """
+        analyzer = cls.__new__(cls)
+        analyzer.workflows = list(workflows)
+        analyzer.summaries = summaries
+        analyzer._analyze()
+        return analyzer
+
+    def save(self, dumps_dir: Path) -> None:
+        """Serialize the dataframes and the workflow index to `dumps_dir`."""
+        self.workflows_df.to_pickle(dumps_dir / "workflows_df.pkl")
+        self.actions_df.to_pickle(dumps_dir / "actions_df.pkl")
+        self.jobs_df.to_pickle(dumps_dir / "jobs_df.pkl")
+        self.frequent_actions_df.to_pickle(dumps_dir / "frequent_actions_df.pkl")
+        self.frequent_actions_noTags_df.to_pickle(
+            dumps_dir / "frequent_actions_noTags_df.pkl"
+        )
+        self.frequent_docker_commands_subsample_df.to_pickle(
+            dumps_dir / "frequent_docker_commands_subsample_df.pkl"
+        )
+        self.index.save(dumps_dir / "workflow_index.npz")
+        self.summaries.save(dumps_dir / "summary_tables.npz")
+        for name, matrix in self.cooccurrences.items():
+            matrix.save(dumps_dir / f"cooccurrence_{name}.npz")
+        for name, rules_df in self.association_rules.items():
+            rules_df.to_pickle(dumps_dir / f"association_rules_{name}_df.pkl")
+
+    def _load_workflows(self, data_dir: Union[Path, WorkflowArchive]) -> None:
         self.workflows: list[Workflow] = []
+        # Local `uses:` references are resolved against the corpus files
+        resolver = ReferenceResolver(corpus_file_reader(data_dir))
+
+        with metrics.timer("analysis.load_workflows"):
+            if isinstance(data_dir, WorkflowArchive):
+                # Packed corpus: keys are paths relative to the data directory
+                for key, data in data_dir.items():
+                    if not is_workflow_key(key):
+                        continue
+                    self.workflows.append(
+                        Workflow(Path(), Path(key), str(data, "utf8"), resolver)
+                    )
+            else:
+                for workflow_path in data_dir.glob("*/*/*.y*ml"):
+                    self.workflows.append(
+                        Workflow(data_dir, workflow_path, resolver=resolver)
+                    )
 
-        for workflow_path in data_dir.glob("**/*.y*ml"):
-            self.workflows.append(Workflow(data_dir, workflow_path))
+    def _analyze(self) -> None:
+        # Same order whatever the source of the workflows
+        self.workflows.sort(key=str)
+        metrics.count("analysis.workflows", len(self.workflows))
 
         # DATAFRAMES
-        # Workflows
-        self.workflows_df = pd.DataFrame.from_records(
-            [workflow.asdict() for workflow in self.workflows]
-        )
+        with metrics.timer("analysis.dataframes"):
+            # Workflows
+            self.workflows_df = pd.DataFrame.from_records(
+                [workflow.asdict() for workflow in self.workflows]
+            )
 
-        # Actions
-        dataset_actions = []
-        for workflow in self.workflows:
-            workflow_actions = []
-            for action in workflow.actions:
-                action_dict = action.asdict()
-                action_dict["workflow"] = str(workflow)
-                workflow_actions.append(action_dict)
-            dataset_actions.extend(workflow_actions)
-        self.actions_df = pd.DataFrame.from_records(dataset_actions)
+            # Actions: built from the interned ids of all the occurrences
+            action_ids = np.frombuffer(
+                b"".join(workflow.action_ids.tobytes() for workflow in self.workflows),
+                dtype=np.uintc,
+            )
+            workflow_names = np.array([str(w) for w in self.workflows], dtype=object)
+            occurrences_per_workflow = [len(w.action_ids) for w in self.workflows]
+            self.actions_df = Action.to_dataframe(action_ids)
+            self.actions_df["workflow"] = np.repeat(
+                workflow_names, occurrences_per_workflow
+            )
+
+            # Jobs
+            self.jobs_df = pd.DataFrame.from_records(
+                [job.asdict() for workflow in self.workflows for job in workflow.jobs],
+                columns=list(Job.ASDICT_KEYS),
+            )
+            self.jobs_df["workflow"] = np.repeat(
+                workflow_names, [len(w.jobs) for w in self.workflows]
+            )
+
+        # INVERTED INDEXES
+        with metrics.timer("analysis.index"):
+            self.index = WorkflowIndex.from_workflows(self.workflows)
+
+        # SUMMARY TABLES
+        if self.summaries is None:
+            with metrics.timer("analysis.summaries"):
+                self.summaries = SummaryTables.from_workflows(self.workflows)
 
         # FREQUENT PATTERN MINING
+        transactions = {
+            "actions": self._get_actions_per_workflow(include_tags=True),
+            "actions_noTags": self._get_actions_per_workflow(include_tags=False),
+            "docker_commands_subsample": self._get_docker_commands_per_workflow(
+                include_workflows_without_docker_commands=False
+            ),
+        }
         # Actions
-        self.frequent_actions_df = self._get_frequently_cooccurring_actions(
-            support=0.05, include_tags=True
+        self.frequent_actions_df = self._mine_frequent_patterns(
+            transactions["actions"], support=0.05
         )
-        self.frequent_actions_noTags_df = self._get_frequently_cooccurring_actions(
-            support=0.05, include_tags=False
+        self.frequent_actions_noTags_df = self._mine_frequent_patterns(
+            transactions["actions_noTags"], support=0.05
         )
 
         # Docker commands
-        self.frequent_docker_commands_subsample_df = (
-            self._get_frequently_cooccurring_docker_commands(
-                support=0.05, include_workflows_without_docker_commands=False
-            )
+        self.frequent_docker_commands_subsample_df = self._mine_frequent_patterns(
+            transactions["docker_commands_subsample"], support=0.05
         )
 
+        # CO-OCCURRENCES AND ASSOCIATION RULES
+        with metrics.timer("analysis.cooccurrence"):
+            self.cooccurrences: dict[str, CooccurrenceMatrix] = {
+                name: CooccurrenceMatrix.from_transactions(name_transactions)
+                for name, name_transactions in transactions.items()
+            }
+            self.association_rules: dict[str, pd.DataFrame] = {
+                name: matrix.association_rules(self.rule_thresholds)
+                for name, matrix in self.cooccurrences.items()
+            }
+
+    @metrics.timed("analysis.apriori")
     def _mine_frequent_patterns(
-        self, transactions_df: pd.DataFrame, support: float
+        self, transactions: list[list[str]], support: float
     ) -> pd.DataFrame:
+        # Imported here: mlxtend pulls in scikit-learn, which is slow to import
+        from mlxtend.frequent_patterns import apriori
+        from mlxtend.preprocessing import TransactionEncoder
+
         te = TransactionEncoder()
-        encoding = te.fit(transactions_df).transform(transactions_df)
+        encoding = te.fit(transactions).transform(transactions)
         encoding_df = pd.DataFrame(encoding, columns=te.columns_)
         frequent_itemsets = apriori(encoding_df, min_support=support, use_colnames=True)
         frequent_itemsets["length"] = frequent_itemsets["itemsets"].apply(
@@ -330,48 +616,70 @@ class WorkflowAnalyzer:
         )
         return frequent_itemsets
 
-    def _get_frequently_cooccurring_actions(
-        self, support: float, include_tags: bool = True
-    ) -> pd.DataFrame:
-        actions_per_workflow = []
+    def _get_actions_per_workflow(self, include_tags: bool = True) -> list[list[str]]:
         if include_tags:
-            for workflow in self.workflows:
-                actions_per_workflow.append(
-                    [action.slug for action in workflow.actions]
-                )
-        else:
-            for workflow in self.workflows:
-                actions_per_workflow.append(
-                    [action.slug_without_tag for action in workflow.actions]
-                )
-        return self._mine_frequent_patterns(actions_per_workflow, support=support)
-
-    def _get_frequently_cooccurring_docker_commands(
-        self, support: float, include_workflows_without_docker_commands: bool = True
-    ) -> pd.DataFrame:
+            return [
+                [action.slug for action in workflow.actions]
+                for workflow in self.workflows
+            ]
+        return [
+            [action.slug_without_tag for action in workflow.actions]
+            for workflow in self.workflows
+        ]
+
+    def _get_docker_commands_per_workflow(
+        self, include_workflows_without_docker_commands: bool = True
+    ) -> list[list[str]]:
         docker_commands_per_workflow = []
         for workflow in self.workflows:
-            workflow_docker_commands = workflow.docker_commands.keys()
+            workflow_docker_commands = list(workflow.docker_commands.keys())
             if (
                 include_workflows_without_docker_commands
                 or len(workflow_docker_commands) > 0
             ):
                 docker_commands_per_workflow.append(workflow_docker_commands)
-        return self._mine_frequent_patterns(docker_commands_per_workflow, support)
+        return docker_commands_per_workflow
+
+
+def corpus_file_reader(
+    data_dir: Union[Path, WorkflowArchive],
+) -> Callable[[str], Optional[str]]:
+    """Return a function reading corpus files by their relative path."""
+    if isinstance(data_dir, WorkflowArchive):
+        return lambda key: data_dir.read_text(key) if key in data_dir else None
+
+    def read_file(key: str) -> Optional[str]:
+        path = data_dir / key
+        return path.read_text() if path.is_file() else None
+
+    return read_file
+
+
+def use_marketplace_catalog(dumps_dir: Path) -> None:
+    """Enrich actions from the marketplace catalog, if it has been built."""
+    catalog_path = dumps_dir / "marketplace_catalog.json"
+    if catalog_path.exists():
+        Action.marketplace_catalog = MarketplaceCatalog.load(catalog_path)
 
 
 if __name__ == "__main__":
-    wa = WorkflowAnalyzer(DATA_DIR)
-
-    # Serializing dataframes
-    wa.workflows_df.to_pickle(DUMPS_DIR / "workflows_df.pkl")
-    wa.actions_df.to_pickle(DUMPS_DIR / "actions_df.pkl")
-    wa.frequent_actions_df.to_pickle(DUMPS_DIR / "frequent_actions_df.pkl")
-    wa.frequent_actions_noTags_df.to_pickle(
-        DUMPS_DIR / "frequent_actions_noTags_df.pkl"
-    )
-    wa.frequent_docker_commands_subsample_df.to_pickle(
-        DUMPS_DIR / "frequent_docker_commands_subsample_df.pkl"
+    settings = setup_run()
+    if settings.instrumentation_enabled:
+        metrics.enable()
+
+    use_marketplace_catalog(settings.dumps_dir)
+
+    if settings.workflow_archive:
+        # Reading only: a missing archive is an error, not an empty corpus
+        with WorkflowArchive(settings.workflow_archive, create=False) as archive:
+            wa = WorkflowAnalyzer(archive)
+    else:
+        wa = WorkflowAnalyzer(settings.data_dir)
+
+    wa.save(settings.dumps_dir)
+
+    metrics.write_report(
+        settings.dumps_dir, "WorkflowAnalyzer", prometheus=settings.prometheus_export
     )
 
     print("Done.")
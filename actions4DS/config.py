@@ -1,82 +1,149 @@
-"""Set up the project configuration"""
+"""Set up the project configuration.
+
+Importing this module has no side effects: the configuration is read lazily
+from `env.ini` and `settings.json` (in the current directory) by
+`get_settings()`, and returned as a small, picklable `Settings` object that can
+be handed to worker processes.
+
+Logging and error formatting are process-wide, so they are configured only by
+the entry points (see `setup_run()`).
+"""
 
 import configparser
 import json
 import logging
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-
-import pretty_errors
-from rich.logging import RichHandler
+from typing import Optional
 
 BASE_DIR = Path(__file__).parent.parent.absolute()
 
-# Load environment variables from `env.ini`
-config = configparser.ConfigParser()
-env_file = Path("env.ini")
-if not env_file.exists():
-    raise ValueError("The env.ini file does not exist.")
-else:
-    config.read(env_file)
-
-# Load settings from `settings.json`
-settings_file = Path("settings.json")
-if not settings_file.exists():
-    raise ValueError("The settings.json file does not exist.")
-else:
-    with open(settings_file) as s:
-        EXPERIMENT_SETTINGS = json.load(s)
+
+@dataclass(frozen=True)
+class Settings:
+    """Project configuration, as read from `env.ini` and `settings.json`."""
+
+    data_dir: Path
+    logs_dir: Path
+    dumps_dir: Path
+    token_list: list[str] = field(default_factory=list)
+    experiment_settings: dict = field(default_factory=dict)
+
+    # Optional packed corpus, used in place of `data_dir` when set
+    workflow_archive: Optional[Path] = None
+
+    # Optional directory of the bare git clones mined by `history.py`
+    clones_dir: Optional[Path] = None
+
+    # Per-stage timers and counters (see `instrumentation.py`)
+    instrumentation_enabled: bool = True
+    prometheus_export: bool = False
+
+    @classmethod
+    def from_files(
+        cls,
+        env_file: Path = Path("env.ini"),
+        settings_file: Path = Path("settings.json"),
+    ) -> "Settings":
+        # Load environment variables from `env.ini`
+        if not env_file.exists():
+            raise ValueError("The env.ini file does not exist.")
+        config = configparser.ConfigParser()
+        config.read(env_file)
+
+        # Load settings from `settings.json`
+        if not settings_file.exists():
+            raise ValueError("The settings.json file does not exist.")
+        with open(settings_file) as s:
+            experiment_settings = json.load(s)
+
+        paths = config["PATHS"]
+        return cls(
+            data_dir=Path(paths["DATA_DIR"]),
+            logs_dir=Path(paths["LOGS_DIR"]),
+            dumps_dir=Path(paths["DUMPS_DIR"]),
+            token_list=json.loads(config["GITHUB"]["TOKEN_LIST"]),
+            experiment_settings=experiment_settings,
+            workflow_archive=(
+                Path(paths["WORKFLOW_ARCHIVE"]) if "WORKFLOW_ARCHIVE" in paths else None
+            ),
+            clones_dir=Path(paths["CLONES_DIR"]) if "CLONES_DIR" in paths else None,
+            instrumentation_enabled=config.getboolean(
+                "INSTRUMENTATION", "ENABLED", fallback=True
+            ),
+            prometheus_export=config.getboolean(
+                "INSTRUMENTATION", "PROMETHEUS_EXPORT", fallback=False
+            ),
+        )
+
+    def create_directories(self) -> None:
+        """Ensure the logs, data and dumps directories exist."""
+        for directory in (self.logs_dir, self.data_dir, self.dumps_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Load (once per process) the settings from the current directory."""
+    return Settings.from_files()
+
 
 # ------- #
 # LOGGING #
 # ------- #
 
-# Ensure the logs directory exists
-LOGS_DIR = Path(config["PATHS"]["LOGS_DIR"])
-LOGS_DIR.mkdir(parents=True, exist_ok=True)
-
-# Logging configuration
-current_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-logfile_path = LOGS_DIR / (current_time + ".log")
-logging.basicConfig(
-    filename=logfile_path,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)-8s - %(message)s",
-)
-
-# Mirror logging to stdout
-console_handler = RichHandler(markup=True)
-logging.getLogger().addHandler(console_handler)
-
-# Configure error formatter
-pretty_errors.configure(
-    separator_character="*",
-    filename_display=pretty_errors.FILENAME_EXTENDED,
-    line_number_first=True,
-    display_link=True,
-    lines_before=5,
-    lines_after=2,
-    line_color=pretty_errors.RED + "> " + pretty_errors.default_config.line_color,
-    code_color="  " + pretty_errors.default_config.line_color,
-    truncate_code=True,
-    display_locals=True,
-)
-
-# ------------ #
-# DATA STORAGE #
-# ------------ #
-
-# Ensure the data directory exists
-DATA_DIR = Path(config["PATHS"]["DATA_DIR"])
-DATA_DIR.mkdir(parents=True, exist_ok=True)
-
-# Ensure the dumps directory exists
-DUMPS_DIR = Path(config["PATHS"]["DUMPS_DIR"])
-DUMPS_DIR.mkdir(parents=True, exist_ok=True)
-
-
-# ---------- #
-# GITHUB API #
-# ---------- #
-
-TOKEN_LIST: list[str] = json.loads(config["GITHUB"]["TOKEN_LIST"])
+
+def configure_logging(logs_dir: Path) -> Path:
+    """Log to a new timestamped file in `logs_dir`, mirrored to stdout.
+
+    Returns:
+        Path: the path of the log file
+    """
+    from rich.logging import RichHandler
+
+    current_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    logfile_path = logs_dir / (current_time + ".log")
+    logging.basicConfig(
+        filename=logfile_path,
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)-8s - %(message)s",
+    )
+
+    # Mirror logging to stdout
+    console_handler = RichHandler(markup=True)
+    logging.getLogger().addHandler(console_handler)
+
+    return logfile_path
+
+
+def configure_error_formatting(display_locals: bool = False) -> None:
+    """Install the `pretty_errors` formatter.
+
+    Displaying the local variables of each frame can be very slow when large
+    objects (e.g., DataFrames) are in scope, hence it is off by default.
+    """
+    import pretty_errors
+
+    pretty_errors.configure(
+        separator_character="*",
+        filename_display=pretty_errors.FILENAME_EXTENDED,
+        line_number_first=True,
+        display_link=True,
+        lines_before=5,
+        lines_after=2,
+        line_color=pretty_errors.RED + "> " + pretty_errors.default_config.line_color,
+        code_color="  " + pretty_errors.default_config.line_color,
+        truncate_code=True,
+        display_locals=display_locals,
+    )
+
+
+def setup_run() -> Settings:
+    """Prepare the process for a run: to be called by entry points only."""
+    settings = get_settings()
+    settings.create_directories()
+    configure_logging(settings.logs_dir)
+    configure_error_formatting()
+    return settings
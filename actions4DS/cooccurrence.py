@@ -0,0 +1,212 @@
+"""
+Sparse co-occurrence matrices and pairwise association rules.
+
+Each workflow is a transaction (e.g., the set of its actions). The transactions
+are encoded as a sparse binary matrix `X` (one row per transaction, one column
+per item), so that all the pairwise co-occurrence counts are obtained with a
+single sparse product, `X.T @ X`. Its diagonal holds the number of
+transactions containing each item.
+
+The rules `antecedent -> consequent` between two items are then derived from
+the non-zero entries of the matrix, with vectorized operations:
+
+- support: fraction of the transactions containing both items;
+- confidence: `support(a, c) / support(a)`;
+- lift: `confidence / support(c)`.
+
+The matrices are saved by `WorkflowAnalyzer`, so rules with other thresholds
+can be derived without reloading the workflows:
+
+    python actions4DS/cooccurrence.py path/to/cooccurrence_actions.npz --min-lift 2
+"""
+
+import argparse
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+@dataclass(frozen=True)
+class RuleThresholds:
+    """Minimum support, confidence and lift of the association rules."""
+
+    min_support: float = 0.05
+    min_confidence: float = 0.5
+    min_lift: float = 1.0
+
+
+class CooccurrenceMatrix:
+    """Symmetric matrix of the number of transactions containing two items.
+
+    Args:
+        items: the items, in the order of the rows and columns of `counts`
+        counts: co-occurrence counts (item counts on the diagonal)
+        n_transactions: number of transactions the counts are computed from
+    """
+
+    def __init__(
+        self, items: list[str], counts: sparse.csr_matrix, n_transactions: int
+    ) -> None:
+        self.items = items
+        self.counts = counts
+        self.n_transactions = n_transactions
+        self._positions = {item: i for i, item in enumerate(items)}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __repr__(self) -> str:
+        return (
+            f"CooccurrenceMatrix({len(self)} items, "
+            f"{self.n_transactions} transactions)"
+        )
+
+    @classmethod
+    def from_transactions(
+        cls, transactions: Iterable[Iterable[str]]
+    ) -> "CooccurrenceMatrix":
+        """Count the co-occurrences of the items of the transactions.
+
+        Items repeated within a transaction are counted once.
+        """
+        transaction_items = [set(transaction) for transaction in transactions]
+        indptr = np.cumsum([0] + [len(items) for items in transaction_items])
+        flat_items = np.array(
+            [item for items in transaction_items for item in items], dtype=object
+        )
+        if len(flat_items):
+            items, columns = np.unique(flat_items, return_inverse=True)
+        else:
+            items, columns = np.empty(0, dtype=object), np.empty(0, dtype=np.int64)
+        incidence = sparse.csr_matrix(
+            (np.ones(len(columns), dtype=np.int32), columns, indptr),
+            shape=(len(transaction_items), len(items)),
+        )
+        counts = (incidence.T @ incidence).tocsr()
+        counts.sort_indices()
+        return cls(items.tolist(), counts, len(transaction_items))
+
+    @property
+    def item_counts(self) -> np.ndarray:
+        return self.counts.diagonal()
+
+    def count(self, item: str, other_item: str) -> int:
+        """Number of transactions containing both items."""
+        i = self._positions.get(item)
+        j = self._positions.get(other_item)
+        if i is None or j is None:
+            return 0
+        return int(self.counts[i, j])
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per pair of distinct co-occurring items."""
+        pairs = sparse.triu(self.counts, k=1).tocoo()
+        items = np.array(self.items, dtype=object)
+        return (
+            pd.DataFrame(
+                {
+                    "item_1": items[pairs.row],
+                    "item_2": items[pairs.col],
+                    "count": pairs.data,
+                    "support": pairs.data / max(self.n_transactions, 1),
+                }
+            )
+            .sort_values(["count", "item_1", "item_2"], ascending=[False, True, True])
+            .reset_index(drop=True)
+        )
+
+    def association_rules(
+        self, thresholds: RuleThresholds = RuleThresholds()
+    ) -> pd.DataFrame:
+        """Rules between pairs of items, sorted by decreasing lift."""
+        pairs = self.counts.tocoo()
+        off_diagonal = pairs.row != pairs.col
+        antecedents = pairs.row[off_diagonal]
+        consequents = pairs.col[off_diagonal]
+
+        n_transactions = max(self.n_transactions, 1)
+        item_supports = self.item_counts / n_transactions
+        support = pairs.data[off_diagonal] / n_transactions
+        antecedent_support = item_supports[antecedents]
+        consequent_support = item_supports[consequents]
+        confidence = support / antecedent_support
+        lift = confidence / consequent_support
+
+        selected = (
+            (support >= thresholds.min_support)
+            & (confidence >= thresholds.min_confidence)
+            & (lift >= thresholds.min_lift)
+        )
+        items = np.array(self.items, dtype=object)
+        return (
+            pd.DataFrame(
+                {
+                    "antecedent": items[antecedents[selected]],
+                    "consequent": items[consequents[selected]],
+                    "antecedent_support": antecedent_support[selected],
+                    "consequent_support": consequent_support[selected],
+                    "support": support[selected],
+                    "confidence": confidence[selected],
+                    "lift": lift[selected],
+                }
+            )
+            .sort_values(
+                ["lift", "support", "antecedent", "consequent"],
+                ascending=[False, False, True, True],
+            )
+            .reset_index(drop=True)
+        )
+
+    # ----------- #
+    # PERSISTENCE #
+    # ----------- #
+
+    def save(self, path: Path) -> None:
+        """Save the matrix (CSR arrays and items) as a compressed `.npz` file."""
+        metadata = {"items": self.items, "n_transactions": self.n_transactions}
+        with open(path, "wb") as matrix_file:
+            np.savez_compressed(
+                matrix_file,
+                data=self.counts.data,
+                indices=self.counts.indices,
+                indptr=self.counts.indptr,
+                metadata=np.frombuffer(
+                    json.dumps(metadata).encode("utf8"), dtype=np.uint8
+                ),
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> "CooccurrenceMatrix":
+        with np.load(path) as arrays:
+            metadata = json.loads(arrays["metadata"].tobytes().decode("utf8"))
+            n_items = len(metadata["items"])
+            counts = sparse.csr_matrix(
+                (arrays["data"], arrays["indices"], arrays["indptr"]),
+                shape=(n_items, n_items),
+            )
+        return cls(metadata["items"], counts, metadata["n_transactions"])
+
+
+if __name__ == "__main__":
+    defaults = RuleThresholds()
+    parser = argparse.ArgumentParser(
+        description="Derive association rules from a saved co-occurrence matrix."
+    )
+    parser.add_argument("matrix", type=Path, help="e.g. cooccurrence_actions.npz")
+    parser.add_argument("--min-support", type=float, default=defaults.min_support)
+    parser.add_argument("--min-confidence", type=float, default=defaults.min_confidence)
+    parser.add_argument("--min-lift", type=float, default=defaults.min_lift)
+    parser.add_argument("--top", type=int, default=20, help="rules to print")
+    args = parser.parse_args()
+
+    matrix = CooccurrenceMatrix.load(args.matrix)
+    rules_df = matrix.association_rules(
+        RuleThresholds(args.min_support, args.min_confidence, args.min_lift)
+    )
+    print(matrix)
+    print(rules_df.head(args.top).to_string())
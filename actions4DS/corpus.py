@@ -0,0 +1,281 @@
+"""
+Packed storage for scraped GitHub Actions workflows.
+
+A workflow archive is a single append-only file holding every downloaded
+workflow, next to a small offset index (`<archive>.idx`). Records are laid out
+as:
+
+    <key length: uint16><data length: uint32><key: utf-8><data: raw bytes>
+
+where the key is the path the workflow would have inside `DATA_DIR`
+(`<owner>/<repository>/<filename>`). The index maps each key to the offset and
+length of its data, so reads are served straight from a memory map of the
+archive without touching the directory tree. A record truncated by an
+interrupted write is cut off when the archive is opened, so that new records
+are appended right after the last complete one.
+"""
+
+import argparse
+import mmap
+import struct
+import threading
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from models import GitHubSlug
+
+
+class WorkflowArchive:
+    """Append-only, memory-mappable archive of workflow files.
+
+    Args:
+        path: path of the archive
+        create: whether to create the archive if it does not exist
+    """
+
+    MAGIC = b"A4DSPK01"
+    RECORD_HEADER = struct.Struct("<HI")
+    INDEX_SUFFIX = ".idx"
+
+    def __init__(self, path: Path, create: bool = True) -> None:
+        self.path: Path = Path(path)
+        self.index_path: Path = self.path.with_name(self.path.name + self.INDEX_SUFFIX)
+
+        # key -> (data offset, data length)
+        self._index: dict[str, tuple[int, int]] = {}
+        # "owner/repo" -> keys of the repository, in insertion order
+        self._repos: dict[str, list[str]] = {}
+
+        self._lock = threading.Lock()
+        self._mmap: Optional[mmap.mmap] = None
+        self._read_file = None
+
+        if not self.path.exists():
+            if not create:
+                raise ValueError(f'The workflow archive "{self.path}" does not exist.')
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "wb") as archive_file:
+                archive_file.write(self.MAGIC)
+            self.index_path.write_text("", encoding="utf8")
+        else:
+            with open(self.path, "rb") as archive_file:
+                if archive_file.read(len(self.MAGIC)) != self.MAGIC:
+                    raise ValueError(f'"{self.path}" is not a workflow archive.')
+        self._load_index()
+
+        self._append_file = open(self.path, "ab")
+        self._index_file = open(self.index_path, "a", encoding="utf8")
+
+    def __enter__(self) -> "WorkflowArchive":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __repr__(self) -> str:
+        return f'WorkflowArchive("{self.path}")'
+
+    def keys(self) -> list[str]:
+        """Return the keys stored in the archive, in insertion order."""
+        return sorted(self._index, key=lambda k: self._index[k][0])
+
+    def items(self) -> Iterator[tuple[str, memoryview]]:
+        """Iterate over `(key, data)` pairs, in insertion order."""
+        for key in self.keys():
+            yield key, self.read_bytes(key)
+
+    def has_repo(self, slug: Union[GitHubSlug, str]) -> bool:
+        return str(slug) in self._repos
+
+    def repo_keys(self, slug: Union[GitHubSlug, str]) -> list[str]:
+        """Return the keys stored for a repository, in insertion order."""
+        return list(self._repos.get(str(slug), ()))
+
+    def read_bytes(self, key: str) -> memoryview:
+        """Return a zero-copy view over the data stored under `key`."""
+        offset, length = self._index[key]
+        archive_map = self._get_mmap(offset + length)
+        return memoryview(archive_map)[offset : offset + length]
+
+    def read_text(self, key: str) -> str:
+        return str(self.read_bytes(key), "utf8")
+
+    def append(self, key: str, data: Union[str, bytes]) -> None:
+        """Append a record to the archive.
+
+        Appending an existing key shadows the previous record.
+        """
+        if isinstance(data, str):
+            data = data.encode("utf8")
+        encoded_key = key.encode("utf8")
+        if "\t" in key or "\n" in key:
+            raise ValueError("Archive keys cannot contain tabs or newlines.")
+
+        with self._lock:
+            record_offset = self._append_file.tell()
+            self._append_file.write(
+                self.RECORD_HEADER.pack(len(encoded_key), len(data))
+            )
+            self._append_file.write(encoded_key)
+            self._append_file.write(data)
+            self._append_file.flush()
+
+            data_offset = record_offset + self.RECORD_HEADER.size + len(encoded_key)
+            self._index_file.write(f"{key}\t{data_offset}\t{len(data)}\n")
+            self._index_file.flush()
+            self._add_to_index(key, data_offset, len(data))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._mmap is not None:
+                try:
+                    self._mmap.close()
+                except BufferError:
+                    # Views over the map are still alive: let GC release it
+                    pass
+                self._mmap = None
+            if self._read_file is not None:
+                self._read_file.close()
+                self._read_file = None
+            self._append_file.close()
+            self._index_file.close()
+
+    def rebuild_index(self) -> None:
+        """Rewrite the index file by scanning the record headers.
+
+        A truncated last record is removed from the archive.
+        """
+        self._index.clear()
+        self._repos.clear()
+        end = self._scan_records(len(self.MAGIC))
+        if end < self.path.stat().st_size:
+            with open(self.path, "r+b") as archive_file:
+                archive_file.truncate(end)
+        with open(self.index_path, "w", encoding="utf8") as index_file:
+            for key in self.keys():
+                offset, length = self._index[key]
+                index_file.write(f"{key}\t{offset}\t{length}\n")
+
+    def _add_to_index(self, key: str, offset: int, length: int) -> None:
+        if key not in self._index:
+            owner, repo, *_ = key.split("/")
+            self._repos.setdefault(f"{owner}/{repo}", []).append(key)
+        self._index[key] = (offset, length)
+
+    def _load_index(self) -> None:
+        """Load the offset index, recovering records missing from it."""
+        indexed_end = len(self.MAGIC)
+        if self.index_path.exists():
+            with open(self.index_path, encoding="utf8") as index_file:
+                for line in index_file:
+                    try:
+                        key, offset, length = line.rstrip("\n").split("\t")
+                    except ValueError:
+                        # Truncated last line (e.g., interrupted write)
+                        break
+                    self._add_to_index(key, int(offset), int(length))
+                    indexed_end = max(indexed_end, int(offset) + int(length))
+
+        # Records missing from the index, or indexed records cut off
+        if indexed_end != self.path.stat().st_size or not self.index_path.exists():
+            self.rebuild_index()
+
+    def _scan_records(self, start: int) -> int:
+        """Index the records from `start`; return the end of the last complete one."""
+        archive_size = self.path.stat().st_size
+        end = start
+        with open(self.path, "rb") as archive_file:
+            archive_file.seek(start)
+            while True:
+                header = archive_file.read(self.RECORD_HEADER.size)
+                if len(header) < self.RECORD_HEADER.size:
+                    break
+                key_length, data_length = self.RECORD_HEADER.unpack(header)
+                encoded_key = archive_file.read(key_length)
+                data_offset = archive_file.tell()
+                if (
+                    len(encoded_key) < key_length
+                    or data_offset + data_length > archive_size
+                ):
+                    # Truncated last record
+                    break
+                self._add_to_index(encoded_key.decode("utf8"), data_offset, data_length)
+                archive_file.seek(data_length, 1)
+                end = data_offset + data_length
+        return end
+
+    def _get_mmap(self, required_size: int) -> mmap.mmap:
+        with self._lock:
+            if self._mmap is None or len(self._mmap) < required_size:
+                if self._read_file is None:
+                    self._read_file = open(self.path, "rb")
+                # Older maps stay valid for the views already handed out
+                self._mmap = mmap.mmap(
+                    self._read_file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            return self._mmap
+
+
+def is_workflow_key(key: str) -> bool:
+    """Whether `key` is a workflow (`owner/repo/file.yml`), not another file.
+
+    Workflows are stored flat in the directory of their repository; other
+    files of the repository (e.g., the definitions of local actions) live in
+    subdirectories.
+    """
+    return key.count("/") == 2 and key.endswith((".yml", ".yaml"))
+
+
+def pack_directory(data_dir: Path, archive_path: Path) -> WorkflowArchive:
+    """Pack a `DATA_DIR`-style directory tree into a workflow archive."""
+    archive = WorkflowArchive(archive_path)
+    for workflow_path in sorted(data_dir.glob("**/*.y*ml")):
+        key = workflow_path.relative_to(data_dir).as_posix()
+        archive.append(key, workflow_path.read_bytes())
+    return archive
+
+
+def unpack_archive(archive_path: Path, data_dir: Path) -> int:
+    """Expand a workflow archive into a `DATA_DIR`-style directory tree.
+
+    Returns:
+        int: the number of workflow files written
+    """
+    n_of_files = 0
+    with WorkflowArchive(archive_path, create=False) as archive:
+        for key, data in archive.items():
+            workflow_path = data_dir / key
+            workflow_path.parent.mkdir(parents=True, exist_ok=True)
+            workflow_path.write_bytes(data)
+            n_of_files += 1
+    return n_of_files
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert workflows between a directory tree and an archive."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    pack_parser = subparsers.add_parser("pack", help="directory -> archive")
+    pack_parser.add_argument("data_dir", type=Path)
+    pack_parser.add_argument("archive", type=Path)
+    unpack_parser = subparsers.add_parser("unpack", help="archive -> directory")
+    unpack_parser.add_argument("archive", type=Path)
+    unpack_parser.add_argument("data_dir", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        with pack_directory(args.data_dir, args.archive) as packed:
+            print(f"Packed {len(packed)} workflows into {args.archive}.")
+    else:
+        n_of_files = unpack_archive(args.archive, args.data_dir)
+        print(f"Unpacked {n_of_files} workflows into {args.data_dir}.")
@@ -0,0 +1,352 @@
+"""
+Mining of the history of the workflows from local git clones.
+
+The contents API only returns the current snapshot of `.github/workflows`;
+getting past versions would take one API call per file per commit. Instead,
+`HistoryMiner`:
+
+1. makes a bare, blobless clone of each repository (`--filter=blob:none`: the
+   commits and trees are downloaded, the file contents are not), or reuses an
+   existing local clone;
+2. lists the commits of the default branch touching `.github/workflows` with
+   a single `git log --raw`, which only needs commits and trees;
+3. fetches the missing workflow blobs of a partial clone in one batch, then
+   reads them all through a single long-lived `git cat-file --batch` process;
+4. runs the usual `Workflow` extraction on each version, producing one record
+   per commit and workflow file.
+
+From the command line (clones are kept in `CLONES_DIR`):
+
+    python actions4DS/history.py
+"""
+
+import argparse
+import logging
+import subprocess  # nosec
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path, PurePosixPath
+from typing import Iterable, Optional
+
+import pandas as pd
+from analyze_workflows import Workflow
+from instrumentation import metrics
+from models import GitHubSlug
+
+WORKFLOWS_DIR = ".github/workflows"
+
+
+def _git(repo_path: Path, *args: str, stdin: Optional[str] = None) -> str:
+    """Run a git command in `repo_path` and return its standard output."""
+    return subprocess.run(  # nosec
+        ["git", "-C", str(repo_path), *args],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+@dataclass(frozen=True)
+class WorkflowChange:
+    """A workflow file added, modified or deleted by a commit."""
+
+    commit: str
+    timestamp: int
+    path: str
+    status: str  # "A", "M" or "D"
+    blob: Optional[str]  # `None` for deletions
+
+
+class CatFileBatch:
+    """Long-lived `git cat-file --batch` process reading objects by id."""
+
+    def __init__(self, repo_path: Path) -> None:
+        self._process = subprocess.Popen(  # nosec
+            ["git", "-C", str(repo_path), "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def __enter__(self) -> "CatFileBatch":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def read_many(self, object_ids: list[str]) -> dict[str, Optional[bytes]]:
+        """Read objects in bulk (`None` for the missing ones).
+
+        Requests are written by a separate thread while the answers are read,
+        so that neither side of the pipes fills up.
+        """
+
+        def write_requests() -> None:
+            for object_id in object_ids:
+                self._process.stdin.write(object_id.encode("ascii") + b"\n")
+            self._process.stdin.flush()
+
+        writer = threading.Thread(target=write_requests, daemon=True)
+        writer.start()
+        objects = {}
+        for object_id in object_ids:
+            header = self._process.stdout.readline().decode("ascii").split()
+            if len(header) != 3:
+                # "<object id> missing"
+                objects[object_id] = None
+                continue
+            size = int(header[2])
+            objects[object_id] = self._process.stdout.read(size)
+            self._process.stdout.read(1)  # Trailing newline
+        writer.join()
+        return objects
+
+    def close(self) -> None:
+        if self._process.stdin:
+            self._process.stdin.close()
+        self._process.wait()
+        if self._process.stdout:
+            self._process.stdout.close()
+
+
+class HistoryMiner:
+    """Extract the history of the workflows of repositories.
+
+    Args:
+        clones_dir: directory of the bare clones (`<owner>/<repo>.git`)
+        clone_url: URL template of the repositories to clone
+    """
+
+    CLONE_URL = "https://github.com/{slug}.git"
+    RECORD_SEPARATOR = "\x1e"
+    FIELD_SEPARATOR = "\x1f"
+
+    def __init__(self, clones_dir: Path, clone_url: Optional[str] = None) -> None:
+        self.clones_dir = clones_dir
+        self.clone_url = clone_url or self.CLONE_URL
+
+    def clone_path(self, slug: GitHubSlug) -> Path:
+        return self.clones_dir / slug.repo_owner / (slug.repo_name + ".git")
+
+    @metrics.timed("history.clone")
+    def ensure_clone(self, slug: GitHubSlug) -> Path:
+        """Return the local clone of `slug`, making a blobless one if needed."""
+        clone_path = self.clone_path(slug)
+        if not clone_path.exists():
+            clone_path.parent.mkdir(parents=True, exist_ok=True)
+            subprocess.run(  # nosec
+                [
+                    "git",
+                    "clone",
+                    "--bare",
+                    "--quiet",
+                    "--filter=blob:none",
+                    self.clone_url.format(slug=slug),
+                    str(clone_path),
+                ],
+                capture_output=True,
+                check=True,
+            )
+        return clone_path
+
+    @metrics.timed("history.log")
+    def workflow_changes(self, repo_path: Path) -> list[WorkflowChange]:
+        """List the changes to the workflows, oldest commit first."""
+        log = _git(
+            repo_path,
+            "-c",
+            "core.quotePath=false",
+            "log",
+            "--reverse",
+            "--raw",
+            "--no-renames",
+            "--no-abbrev",
+            f"--format={self.RECORD_SEPARATOR}%H{self.FIELD_SEPARATOR}%ct",
+            "--",
+            WORKFLOWS_DIR,
+        )
+        changes = []
+        for record in log.split(self.RECORD_SEPARATOR)[1:]:
+            header, *raw_lines = record.strip("\n").split("\n")
+            commit, timestamp = header.split(self.FIELD_SEPARATOR)
+            for raw_line in raw_lines:
+                if not raw_line.startswith(":"):
+                    continue
+                metadata, path = raw_line.split("\t", 1)
+                _, _, _, blob, status = metadata.split()
+                # GitHub ignores the subdirectories of `.github/workflows`
+                pure_path = PurePosixPath(path)
+                if str(pure_path.parent) != WORKFLOWS_DIR or pure_path.suffix not in (
+                    ".yml",
+                    ".yaml",
+                ):
+                    continue
+                changes.append(
+                    WorkflowChange(
+                        commit,
+                        int(timestamp),
+                        path,
+                        status[0],
+                        None if status[0] == "D" else blob,
+                    )
+                )
+        return changes
+
+    @metrics.timed("history.prefetch")
+    def prefetch_blobs(self, repo_path: Path, changes: list[WorkflowChange]) -> None:
+        """Fetch the missing workflow blobs of a partial clone in one request.
+
+        Otherwise, `git cat-file` would fetch each missing blob on demand.
+        """
+        blobs = {change.blob for change in changes if change.blob}
+        promisor = _git(
+            repo_path,
+            "config",
+            "--type=bool",
+            "--default=false",
+            "remote.origin.promisor",
+        )
+        if not blobs or promisor.strip() != "true":
+            return
+        # Walking the trees of the commits (not the blobs) never triggers a fetch
+        missing = [
+            line[1:]
+            for line in _git(
+                repo_path,
+                "rev-list",
+                "--objects",
+                "--missing=print",
+                "--no-walk",
+                "--stdin",
+                "--",
+                WORKFLOWS_DIR,
+                stdin="\n".join(dict.fromkeys(c.commit for c in changes)) + "\n",
+            ).splitlines()
+            if line.startswith("?") and line[1:] in blobs
+        ]
+        if missing:
+            _git(
+                repo_path,
+                "-c",
+                "fetch.negotiationAlgorithm=noop",
+                "fetch",
+                "origin",
+                "--no-tags",
+                "--no-write-fetch-head",
+                "--recurse-submodules=no",
+                "--filter=blob:none",
+                "--stdin",
+                stdin="\n".join(missing) + "\n",
+            )
+
+    def mine(self, slug: GitHubSlug, repo_path: Optional[Path] = None) -> list[dict]:
+        """Return one record per commit and workflow file of `slug`.
+
+        Args:
+            slug: the repository
+            repo_path: existing local clone (otherwise, `ensure_clone()`)
+        """
+        repo_path = repo_path or self.ensure_clone(slug)
+        changes = self.workflow_changes(repo_path)
+        blobs = list(dict.fromkeys(c.blob for c in changes if c.blob))
+        self.prefetch_blobs(repo_path, changes)
+        with metrics.timer("history.cat_file"):
+            with CatFileBatch(repo_path) as cat_file:
+                contents = cat_file.read_many(blobs)
+
+        records = []
+        # Versions shared by several commits (e.g., reverts) are parsed once
+        parsed_blobs: dict[str, dict] = {}
+        for change in changes:
+            record = {
+                "repository": str(slug),
+                "commit": change.commit,
+                "commit_datetime": datetime.fromtimestamp(
+                    change.timestamp, timezone.utc
+                ),
+                "filename": PurePosixPath(change.path).name,
+                "change": change.status,
+            }
+            if change.blob:
+                if change.blob not in parsed_blobs:
+                    parsed_blobs[change.blob] = self._extract(
+                        slug, record["filename"], contents.get(change.blob)
+                    )
+                record.update(parsed_blobs[change.blob])
+            records.append(record)
+        metrics.count("history.records", len(records))
+        return records
+
+    def mine_all(self, slugs: Iterable[GitHubSlug]) -> pd.DataFrame:
+        """Mine several repositories; the ones failing are logged and skipped."""
+        records: list[dict] = []
+        for slug in slugs:
+            try:
+                records.extend(self.mine(slug))
+            except (subprocess.CalledProcessError, OSError) as e:
+                logging.info(f'[HistoryMiner] Cannot mine "{slug}": {e!r}')
+        return pd.DataFrame.from_records(records)
+
+    @staticmethod
+    def _extract(slug: GitHubSlug, filename: str, content: Optional[bytes]) -> dict:
+        """Run the `Workflow` extraction on one version of a workflow file."""
+        if content is None:
+            return {"valid": False, "error": "Blob not available."}
+        try:
+            with metrics.timer("history.extract"):
+                workflow = Workflow(
+                    Path(), Path(str(slug), filename), content.decode("utf8")
+                )
+        except Exception as e:
+            # Past versions can be invalid YAML or invalid workflows
+            return {"valid": False, "error": repr(e)}
+        extracted = workflow.asdict()
+        for key in ("repository", "filename"):
+            del extracted[key]
+        extracted["actions"] = [action.slug for action in workflow.actions]
+        extracted.update({"valid": True, "error": None})
+        return extracted
+
+
+if __name__ == "__main__":
+    from analyze_workflows import use_marketplace_catalog
+    from config import setup_run
+    from get_repo_list import get_repos_cml
+
+    parser = argparse.ArgumentParser(description="Mine the history of workflows.")
+    parser.add_argument(
+        "--clones-dir", type=Path, default=None, help="defaults to CLONES_DIR"
+    )
+    parser.add_argument(
+        "--slugs",
+        type=Path,
+        default=None,
+        help="file with one slug per line (defaults to the CML repositories)",
+    )
+    args = parser.parse_args()
+
+    settings = setup_run()
+    if settings.instrumentation_enabled:
+        metrics.enable()
+    use_marketplace_catalog(settings.dumps_dir)
+
+    clones_dir = args.clones_dir or settings.clones_dir
+    if clones_dir is None:
+        raise ValueError("Set CLONES_DIR in env.ini or pass --clones-dir.")
+    if args.slugs:
+        slugs = [
+            GitHubSlug(line.strip())
+            for line in args.slugs.read_text().splitlines()
+            if line.strip()
+        ]
+    else:
+        slugs = get_repos_cml()
+
+    history_df = HistoryMiner(clones_dir).mine_all(slugs)
+    history_df.to_pickle(settings.dumps_dir / "workflow_history_df.pkl")
+
+    metrics.write_report(
+        settings.dumps_dir, "HistoryMiner", prometheus=settings.prometheus_export
+    )
+    print(f"Mined {len(history_df)} workflow versions.")
@@ -0,0 +1,134 @@
+"""
+Targeted extraction of the few facts we need from GitHub HTML pages.
+
+Building a complete `BeautifulSoup` tree of a repository or marketplace page
+(tens of KB of markup, mostly navigation and scripts) only to look for a badge
+and a handful of links is slow, and the tree is large to keep around. Instead,
+the functions below scan the raw HTML with compiled regular expressions for
+the start tags of interest (`<a>`, `<svg>` and `<clipboard-copy>`), inspect
+their attributes, and
+return a small immutable record. No document tree is built or retained, and
+the scan of a repository page stops at the first "View on Marketplace" link.
+"""
+
+import html
+import re
+from dataclasses import dataclass
+from typing import Iterator, Optional, Union
+
+# Start tag of an element of interest; quoted attribute values may contain ">"
+TAG_REGEX = re.compile(
+    r"<(a|svg|clipboard-copy)\b((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>", re.IGNORECASE
+)
+ATTRIBUTE_REGEX = re.compile(r"([\w:-]+)\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s\"'>]+))")
+CLOSING_A_REGEX = re.compile(r"</a\s*>", re.IGNORECASE)
+INNER_TAG_REGEX = re.compile(r"<[^>]*>")
+# Repository link of the sidebar of a marketplace page
+REPOSITORY_URL_REGEX = re.compile(r"^https://github\.com/([\w.-]+/[\w.-]+)/?$")
+# Installation snippet of a marketplace page, e.g. "uses: owner/repo/path@v1"
+USES_REGEX = re.compile(r"uses:\s*([\w.-]+/[\w.-]+(?:/[\w./-]+)?)@")
+
+
+@dataclass(frozen=True)
+class MarketplacePage:
+    """Facts extracted from the marketplace page of an action."""
+
+    repository: Optional[str]
+    # Slug used in `uses:` (without tag), e.g. `owner/repo/path` for an action
+    # published from a subdirectory of `repository`
+    action: Optional[str]
+    verified_creator: bool
+    categories: tuple[str, ...]
+
+
+def _to_text(document: Union[str, bytes]) -> str:
+    if isinstance(document, bytes):
+        return document.decode("utf8", errors="replace")
+    return document
+
+
+def _iter_tags(document: str) -> Iterator[tuple[str, dict[str, str], int]]:
+    """Yield `(tag name, attributes, end of the start tag)` of `<a>`/`<svg>`."""
+    for match in TAG_REGEX.finditer(document):
+        attributes = {
+            name.lower(): html.unescape(
+                double_quoted or single_quoted or unquoted or ""
+            )
+            for name, double_quoted, single_quoted, unquoted in (
+                ATTRIBUTE_REGEX.findall(match.group(2))
+            )
+        }
+        yield match.group(1).lower(), attributes, match.end()
+
+
+def _has_class(attributes: dict[str, str], class_name: str) -> bool:
+    return class_name in attributes.get("class", "").split()
+
+
+def _anchor_html(document: str, start: int) -> str:
+    """Inner HTML of the `<a>` element whose start tag ends at `start`."""
+    closing = CLOSING_A_REGEX.search(document, start)
+    return document[start : closing.start() if closing else len(document)]
+
+
+def _anchor_text(document: str, start: int) -> str:
+    """Text of the `<a>` element whose start tag ends at `start`."""
+    inner_html = _anchor_html(document, start)
+    return " ".join(html.unescape(INNER_TAG_REGEX.sub("", inner_html)).split())
+
+
+def extract_marketplace_link(document: Union[str, bytes]) -> Optional[str]:
+    """Return the href of the "View on Marketplace" link of a repository page."""
+    document = _to_text(document)
+    for tag, attributes, end in _iter_tags(document):
+        if (
+            tag == "a"
+            and "href" in attributes
+            and _anchor_text(document, end) == "View on Marketplace"
+        ):
+            return attributes["href"]
+    return None
+
+
+def extract_marketplace_page(document: Union[str, bytes]) -> MarketplacePage:
+    """Extract the repository, verified badge and categories of an action.
+
+    The repository is the one of the sidebar link (the one with the repository
+    icon), not the first `uses:` text of the page, which may be an example
+    using another action. The installation snippet (copied to the clipboard)
+    only tells which subdirectory of the repository the action lives in.
+    """
+    document = _to_text(document)
+    repository = None
+    snippet_action = None
+    verified_creator = False
+    categories = []
+    for tag, attributes, end in _iter_tags(document):
+        if tag == "svg":
+            verified_creator = verified_creator or _has_class(
+                attributes, "octicon-verified"
+            )
+        elif tag == "clipboard-copy":
+            uses_match = USES_REGEX.search(attributes.get("value", ""))
+            if uses_match and snippet_action is None:
+                snippet_action = uses_match.group(1)
+        elif _has_class(attributes, "topic-tag"):
+            categories.append(_anchor_text(document, end))
+        elif repository is None:
+            url_match = REPOSITORY_URL_REGEX.match(attributes.get("href", ""))
+            if url_match and "octicon-repo" in _anchor_html(document, end):
+                repository = url_match.group(1)
+
+    action = repository
+    if (
+        repository
+        and snippet_action
+        and snippet_action.lower().startswith(repository.lower() + "/")
+    ):
+        action = snippet_action
+    return MarketplacePage(
+        repository=repository,
+        action=action,
+        verified_creator=verified_creator,
+        categories=tuple(categories),
+    )
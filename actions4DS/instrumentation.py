@@ -0,0 +1,240 @@
+"""
+Lightweight timers and counters for the scraping and analysis stages.
+
+Instrumentation is off by default: every timer then resolves to a shared no-op
+object, so the cost of an instrumented call is a single attribute check.
+Once enabled, timings and counts are accumulated in memory (thread-safely)
+and written at the end of the run as a JSON/CSV report, plus an optional
+Prometheus text-format file.
+
+Usage:
+
+    from instrumentation import metrics
+
+    with metrics.timer("github.get_repo"):
+        repo = github.get_repo(slug)
+
+    @metrics.timed("workflow.parse_yaml")
+    def _parse_yaml(self): ...
+"""
+
+import csv
+import functools
+import json
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+
+class _NullTimer:
+    """Timer used while instrumentation is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("_instrumentation", "_name", "_start")
+
+    def __init__(self, instrumentation: "Instrumentation", name: str) -> None:
+        self._instrumentation = instrumentation
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._instrumentation.add_time(self._name, time.perf_counter() - self._start)
+
+
+class Instrumentation:
+    """Registry of named timers and counters."""
+
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self) -> None:
+        """Start collecting; the run starts now unless it is already enabled."""
+        with self._lock:
+            if not self.enabled:
+                self.start_datetime = datetime.now()
+            self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.start_datetime: datetime = datetime.now()
+            # name -> [number of calls, total seconds, max seconds]
+            self._timers: dict[str, list] = {}
+            self._counters: Counter = Counter()
+
+    def timer(self, name: str):
+        """Return a context manager timing the enclosed block under `name`."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name: str) -> Callable:
+        """Decorate a function so that each call is timed under `name`."""
+
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.add_time(name, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    def add_time(self, name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                self._timers[name] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                if seconds > timer[2]:
+                    timer[2] = seconds
+
+    def count(self, name: str, increment: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] += increment
+
+    def report(self) -> dict:
+        """Return the collected timings and counts as a dictionary."""
+        with self._lock:
+            timers = {
+                name: {
+                    "count": calls,
+                    "total_seconds": round(total, 6),
+                    "mean_seconds": round(total / calls, 6),
+                    "max_seconds": round(maximum, 6),
+                }
+                for name, (calls, total, maximum) in sorted(self._timers.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+        end_datetime = datetime.now()
+        return {
+            "start_datetime": str(self.start_datetime),
+            "end_datetime": str(end_datetime),
+            "wall_clock_seconds": (end_datetime - self.start_datetime).total_seconds(),
+            "timers": timers,
+            "counters": counters,
+        }
+
+    def to_prometheus(self, prefix: str = "actions4ds") -> str:
+        """Render the collected metrics in the Prometheus text format."""
+        report = self.report()
+        lines = [
+            f"# HELP {prefix}_timer_seconds_total Time spent in each instrumented block.",
+            f"# TYPE {prefix}_timer_seconds_total counter",
+        ]
+        for name, timer in report["timers"].items():
+            lines.append(
+                f'{prefix}_timer_seconds_total{{name="{name}"}} {timer["total_seconds"]}'
+            )
+        lines += [
+            f"# HELP {prefix}_timer_calls_total Calls of each instrumented block.",
+            f"# TYPE {prefix}_timer_calls_total counter",
+        ]
+        for name, timer in report["timers"].items():
+            lines.append(
+                f'{prefix}_timer_calls_total{{name="{name}"}} {timer["count"]}'
+            )
+        lines += [
+            f"# HELP {prefix}_events_total Instrumented event counts.",
+            f"# TYPE {prefix}_events_total counter",
+        ]
+        for name, value in report["counters"].items():
+            lines.append(f'{prefix}_events_total{{name="{name}"}} {value}')
+        lines += [
+            f"# HELP {prefix}_wall_clock_seconds Duration of the run.",
+            f"# TYPE {prefix}_wall_clock_seconds gauge",
+            f"{prefix}_wall_clock_seconds {report['wall_clock_seconds']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_report(
+        self, dumps_dir: Path, run_name: str, prometheus: bool = False
+    ) -> Optional[Path]:
+        """Write the run report to `DUMPS_DIR` as JSON and CSV files.
+
+        The files are named after the current date and `run_name`, like the
+        scraping dumps. A `.prom` file is also written if `prometheus` is set.
+
+        Returns:
+            Path: the path of the JSON report (`None` if disabled)
+        """
+        if not self.enabled:
+            return None
+
+        report = self.report()
+        current_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        base_path = dumps_dir / (current_time + "_" + run_name + "_metrics")
+
+        json_path = base_path.with_suffix(".json")
+        with open(json_path, "w") as json_file:
+            json.dump(report, json_file, indent=4)
+
+        with open(base_path.with_suffix(".csv"), "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(
+                [
+                    "kind",
+                    "name",
+                    "count",
+                    "total_seconds",
+                    "mean_seconds",
+                    "max_seconds",
+                ]
+            )
+            for name, timer in report["timers"].items():
+                writer.writerow(
+                    [
+                        "timer",
+                        name,
+                        timer["count"],
+                        timer["total_seconds"],
+                        timer["mean_seconds"],
+                        timer["max_seconds"],
+                    ]
+                )
+            for name, value in report["counters"].items():
+                writer.writerow(["counter", name, value, "", "", ""])
+
+        if prometheus:
+            base_path.with_suffix(".prom").write_text(self.to_prometheus())
+
+        return json_path
+
+
+# Process-wide registry used by all modules
+metrics = Instrumentation()
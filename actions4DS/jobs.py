@@ -0,0 +1,196 @@
+"""
+Job-level structure of workflows.
+
+Analyses of the cost of CI (runners, matrix builds, job dependencies,
+containers) need facts about the jobs of each workflow, not only the flat list
+of its steps. They are extracted by `Workflow` in the same pass over the parsed
+YAML document as the actions and run commands, so that the document can be
+dropped right after, and end up in `WorkflowAnalyzer.jobs_df`.
+
+For each job, the `needs` dependencies form a DAG: `dag_depth` is the number
+of jobs on the longest chain of dependencies ending at the job, and the
+critical path length of the workflow is the largest depth of its jobs.
+"""
+
+import itertools
+from dataclasses import dataclass
+from typing import Any, Optional
+
+# Keys of a `strategy.matrix` that are not dimensions
+MATRIX_SPECIAL_KEYS = ("include", "exclude")
+
+
+@dataclass(frozen=True)
+class Job:
+    """Facts about a job of a workflow."""
+
+    job_id: str
+    name: Optional[str]
+    runs_on: Optional[str]
+    runner_os: Optional[str]
+    n_of_steps: int
+    # Number of jobs the matrix expands to; `None` if it is an expression
+    matrix_size: Optional[int]
+    needs: tuple[str, ...]
+    dag_depth: int
+    container: Optional[str]
+    services: tuple[str, ...]
+    # Reusable workflow called by the job, if any
+    uses: Optional[str]
+
+    ASDICT_KEYS = (
+        "job_id",
+        "job_name",
+        "runs_on",
+        "runner_os",
+        "n_of_steps",
+        "matrix_size",
+        "needs",
+        "dag_depth",
+        "container",
+        "services",
+        "reusable_workflow",
+    )
+
+    def asdict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "job_name": self.name,
+            "runs_on": self.runs_on,
+            "runner_os": self.runner_os,
+            "n_of_steps": self.n_of_steps,
+            "matrix_size": self.matrix_size,
+            "needs": list(self.needs),
+            "dag_depth": self.dag_depth,
+            "container": self.container,
+            "services": list(self.services),
+            "reusable_workflow": self.uses,
+        }
+
+
+def extract_job(job_id: str, job: dict, dag_depth: int = 1) -> Job:
+    """Build the `Job` record of the `jobs.<job_id>` mapping of a workflow."""
+    runs_on = _runs_on(job.get("runs-on"))
+    container = job.get("container")
+    if isinstance(container, dict):
+        container = container.get("image")
+    services = job.get("services")
+    uses = job.get("uses")
+    return Job(
+        job_id=str(job_id),
+        name=str(job["name"]) if job.get("name") is not None else None,
+        runs_on=runs_on,
+        runner_os=runner_os(runs_on),
+        n_of_steps=len(job.get("steps") or []),
+        matrix_size=matrix_size(job.get("strategy")),
+        needs=needed_jobs(job),
+        dag_depth=dag_depth,
+        container=str(container) if container else None,
+        services=tuple(str(s) for s in services) if isinstance(services, dict) else (),
+        uses=str(uses) if uses else None,
+    )
+
+
+def needed_jobs(job: dict) -> tuple[str, ...]:
+    needs = job.get("needs")
+    if not needs:
+        return ()
+    if isinstance(needs, list):
+        return tuple(str(n) for n in needs)
+    return (str(needs),)
+
+
+def dag_depths(needs: dict[str, tuple[str, ...]]) -> dict[str, int]:
+    """Length (in jobs) of the longest chain of `needs` ending at each job.
+
+    Unknown dependencies are ignored, and so are the edges closing a cycle
+    (GitHub rejects such workflows anyway).
+    """
+    depths: dict[str, int] = {}
+
+    def depth(job_id: str, visiting: frozenset) -> int:
+        if job_id in depths:
+            return depths[job_id]
+        visiting = visiting | {job_id}
+        parents = [n for n in needs[job_id] if n in needs and n not in visiting]
+        depths[job_id] = 1 + max((depth(n, visiting) for n in parents), default=0)
+        return depths[job_id]
+
+    for job_id in needs:
+        depth(job_id, frozenset())
+    return depths
+
+
+def matrix_size(strategy: Any) -> Optional[int]:
+    """Number of jobs a `strategy.matrix` expands to.
+
+    Follows the GitHub rules: the dimensions are combined, then the `exclude`
+    entries are removed, then each `include` entry extends the combinations
+    whose original values it does not overwrite, or is added as a new
+    combination if there is none. `None` if the matrix (or one of its
+    dimensions) is an expression evaluated at run time.
+    """
+    matrix = strategy.get("matrix") if isinstance(strategy, dict) else None
+    if matrix is None:
+        return 1
+    if not isinstance(matrix, dict):
+        return None
+    dimensions = {k: v for k, v in matrix.items() if k not in MATRIX_SPECIAL_KEYS}
+    exclude = matrix.get("exclude") or []
+    include = matrix.get("include") or []
+    if not all(isinstance(v, list) for v in dimensions.values()) or not (
+        isinstance(exclude, list) and isinstance(include, list)
+    ):
+        return None
+
+    combinations = []
+    if dimensions:
+        combinations = [
+            dict(zip(dimensions, values))
+            for values in itertools.product(*dimensions.values())
+        ]
+    combinations = [
+        c
+        for c in combinations
+        if not any(_matches(c, entry) for entry in exclude if isinstance(entry, dict))
+    ]
+    size = len(combinations)
+    for entry in include:
+        if not isinstance(entry, dict):
+            continue
+        original_values = {k: v for k, v in entry.items() if k in dimensions}
+        if not any(_matches(c, original_values) for c in combinations):
+            size += 1
+    return size
+
+
+def _matches(combination: dict, entry: dict) -> bool:
+    return all(k in combination and combination[k] == v for k, v in entry.items())
+
+
+def _runs_on(value: Any) -> Optional[str]:
+    """Normalize `runs-on` (a label, a list of labels, or a runner group)."""
+    if isinstance(value, dict):
+        value = value.get("labels") or value.get("group")
+    if isinstance(value, list):
+        return ",".join(str(label) for label in value)
+    return str(value) if value else None
+
+
+def runner_os(runs_on: Optional[str]) -> Optional[str]:
+    """Coarse runner type: linux, windows, macos, self-hosted, expression, other."""
+    if runs_on is None:
+        return None
+    labels = runs_on.lower()
+    if "${{" in labels:
+        return "expression"
+    if "self-hosted" in labels:
+        return "self-hosted"
+    for os_name, prefixes in (
+        ("linux", ("ubuntu", "linux")),
+        ("windows", ("windows",)),
+        ("macos", ("macos",)),
+    ):
+        if any(prefix in labels for prefix in prefixes):
+            return os_name
+    return "other"
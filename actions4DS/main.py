@@ -1,14 +1,75 @@
-from config import DATA_DIR, DUMPS_DIR, EXPERIMENT_SETTINGS, TOKEN_LIST
+import argparse
+
+from analyze_workflows import use_marketplace_catalog
+from config import setup_run
+from corpus import WorkflowArchive
 from get_repo_list import get_repos_cml
+from instrumentation import metrics
+from pipeline import WorkflowPipeline
+from sampling import SamplingPlan
 from scrape_repos import WorkflowScraper
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect (and analyze) workflows.")
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="analyze the workflows while they are downloaded",
+    )
+    parser.add_argument(
+        "--sample-margin",
+        type=float,
+        default=None,
+        help="only scrape a sample sized for this margin of error (e.g. 0.05)",
+    )
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--strata", choices=SamplingPlan.STRATA, default="none")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.sample_margin and args.pipelined:
+        parser.error("--sample-margin cannot be combined with --pipelined")
+
+    settings = setup_run()
+    if settings.instrumentation_enabled:
+        metrics.enable()
 
     # STEP 1: get list of repo slugs
     slugs = get_repos_cml()
+    if args.sample_margin:
+        # The rest of the slugs can be scraped later: the sample is not
+        # downloaded again
+        plan = SamplingPlan(slugs, args.strata, args.seed)
+        slugs = plan.sample_for(args.sample_margin, args.confidence)
 
     # STEP 2: scrape repos to collect workflows
-    wf_scraper = WorkflowScraper(
-        EXPERIMENT_SETTINGS, TOKEN_LIST, DUMPS_DIR, DATA_DIR, slugs
+    archive = (
+        WorkflowArchive(settings.workflow_archive)
+        if settings.workflow_archive
+        else None
+    )
+    if args.pipelined:
+        # STEP 3 (overlapped with STEP 2): analyze the workflows
+        use_marketplace_catalog(settings.dumps_dir)
+        wa = WorkflowPipeline(settings, slugs, archive).run()
+        wa.save(settings.dumps_dir)
+    else:
+        wf_scraper = WorkflowScraper(
+            settings.experiment_settings,
+            settings.token_list,
+            settings.dumps_dir,
+            settings.data_dir,
+            slugs,
+            archive,
+            record_outcomes=bool(args.sample_margin),
+        )
+        wf_scraper.scrape_repos()
+        if args.sample_margin:
+            print(wf_scraper.estimate_prevalence(plan, args.confidence).to_string())
+    if archive is not None:
+        archive.close()
+
+    metrics.write_report(
+        settings.dumps_dir,
+        "WorkflowPipeline" if args.pipelined else "WorkflowScraper",
+        prometheus=settings.prometheus_export,
     )
-    wf_scraper.scrape_repos()
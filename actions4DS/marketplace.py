@@ -0,0 +1,330 @@
+"""
+Local index of the GitHub Marketplace actions.
+
+Looking up each action of the corpus on GitHub costs two page downloads (the
+repository page, to find its "View on Marketplace" link, and the marketplace
+page). Instead, `MarketplaceCatalog.build()` enumerates the marketplace once:
+
+1. it crawls the paginated listing of each category, collecting the URLs of
+   the marketplace pages of the actions;
+2. it downloads each marketplace page once, extracting the repository slug of
+   the action, whether its creator is verified, and its categories (see
+   `html_extraction.py`).
+
+The resulting catalog maps the slug of each action (its repository, or a
+subdirectory of it) to its marketplace listing;
+it is saved as JSON and turns the enrichment of `Action`s into a dictionary
+lookup. A previous catalog can be passed to `build()` to only resolve the
+pages that were not resolved yet.
+
+Each category is crawled until a listing page brings no new action. If the
+crawl is capped with `max_pages` and a category has more pages, the category
+is recorded as truncated: the catalog is then incomplete, and an action
+missing from it may still be on the marketplace (see `complete`).
+
+From the command line:
+
+    python actions4DS/marketplace.py build --output path/to/catalog.json
+"""
+
+import argparse
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import requests
+from html_extraction import extract_marketplace_page
+from instrumentation import metrics
+
+# Category slugs of the marketplace, with their display names
+CATEGORIES = {
+    "api-management": "API management",
+    "chat": "Chat",
+    "code-quality": "Code quality",
+    "code-review": "Code review",
+    "continuous-integration": "Continuous integration",
+    "dependency-management": "Dependency management",
+    "deployment": "Deployment",
+    "ides": "IDEs",
+    "learning": "Learning",
+    "localization": "Localization",
+    "mobile": "Mobile",
+    "monitoring": "Monitoring",
+    "project-management": "Project management",
+    "publishing": "Publishing",
+    "security": "Security",
+    "support": "Support",
+    "testing": "Testing",
+    "utilities": "Utilities",
+}
+
+
+@dataclass(frozen=True)
+class MarketplaceListing:
+    """Marketplace facts about the action hosted in `repository`."""
+
+    repository: str
+    marketplace_url: str
+    verified_creator: bool
+    categories: tuple[str, ...]
+    # `owner/repo/path` for an action published from a subdirectory
+    action: Optional[str] = None
+
+    @property
+    def slug(self) -> str:
+        """Slug of the action (without tag), as used in workflows."""
+        return self.action or self.repository
+
+
+class MarketplaceCatalog:
+    """Index from action slugs to marketplace listings."""
+
+    BASE_GITHUB_URL = "https://github.com"
+    LISTING_LINK_REGEX = re.compile(r'href="(/marketplace/actions/[\w.-]+)"')
+
+    def __init__(
+        self,
+        listings: Optional[dict[str, MarketplaceListing]] = None,
+        unresolved_urls: Optional[list[str]] = None,
+        truncated_categories: Optional[list[str]] = None,
+    ) -> None:
+        # Slugs are case-insensitive on GitHub: keys are lowercase
+        self.listings: dict[str, MarketplaceListing] = {
+            slug.lower(): listing for slug, listing in (listings or {}).items()
+        }
+        # Marketplace pages whose repository could not be determined
+        self.unresolved_urls: list[str] = unresolved_urls or []
+        # Categories whose listing was not crawled to the last page
+        self.truncated_categories: list[str] = truncated_categories or []
+
+    def __len__(self) -> int:
+        return len(self.listings)
+
+    def __contains__(self, slug: object) -> bool:
+        return isinstance(slug, str) and slug.lower() in self.listings
+
+    def __repr__(self) -> str:
+        return f"MarketplaceCatalog({len(self)} listings)"
+
+    @property
+    def complete(self) -> bool:
+        """Whether an action missing from the catalog is not on the marketplace."""
+        return not self.truncated_categories
+
+    def get(self, slug: str) -> Optional[MarketplaceListing]:
+        """Return the listing of the action `slug` (`owner/repo[/path]`)."""
+        return self.listings.get(slug.lower())
+
+    # -------- #
+    # CRAWLING #
+    # -------- #
+
+    @classmethod
+    def build(
+        cls,
+        base_url: Optional[str] = None,
+        categories: Optional[list[str]] = None,
+        max_pages: Optional[int] = None,
+        workers: int = 8,
+        previous: Optional["MarketplaceCatalog"] = None,
+    ) -> "MarketplaceCatalog":
+        """Crawl the marketplace and build a catalog.
+
+        Args:
+            base_url: root URL of GitHub (a local stand-in can be used)
+            categories: category slugs to crawl (defaults to all of them)
+            max_pages: maximum number of listing pages crawled per category
+                (by default, categories are crawled to their last page)
+            workers: number of concurrent downloads of marketplace pages
+            previous: catalog whose listings are reused instead of downloaded
+        """
+        base_url = base_url or cls.BASE_GITHUB_URL
+        session = requests.Session()
+
+        marketplace_urls: list[str] = []
+        truncated_categories: list[str] = []
+        for category in categories or list(CATEGORIES):
+            urls, truncated = cls._crawl_category(
+                session, base_url, category, max_pages
+            )
+            if truncated:
+                logging.warning(
+                    f'[MarketplaceCatalog] Category "{category}" has more than '
+                    f"{max_pages} pages: its listing is truncated."
+                )
+                truncated_categories.append(category)
+            for url in urls:
+                if url not in marketplace_urls:
+                    marketplace_urls.append(url)
+        logging.info(
+            f"[MarketplaceCatalog] Found {len(marketplace_urls)} marketplace pages."
+        )
+
+        listings: dict[str, MarketplaceListing] = {}
+        known_urls: set[str] = set()
+        if previous:
+            for slug, listing in previous.listings.items():
+                listings[slug] = listing
+                known_urls.add(listing.marketplace_url)
+        urls_to_resolve = [url for url in marketplace_urls if url not in known_urls]
+
+        unresolved_urls = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            resolved = executor.map(
+                lambda url: cls._fetch_listing(session, base_url, url),
+                urls_to_resolve,
+            )
+            for url, listing in zip(urls_to_resolve, resolved):
+                if listing:
+                    listings[listing.slug.lower()] = listing
+                else:
+                    unresolved_urls.append(url)
+
+        return cls(listings, unresolved_urls, truncated_categories)
+
+    @classmethod
+    def _crawl_category(
+        cls,
+        session: requests.Session,
+        base_url: str,
+        category: str,
+        max_pages: Optional[int],
+    ) -> tuple[list[str], bool]:
+        """Return the marketplace URLs listed in a category, across pages.
+
+        Returns:
+            tuple: the URLs, and whether the crawl stopped at `max_pages`
+                while the category had more pages
+        """
+        urls: list[str] = []
+        page_number = 0
+        while True:
+            page_number += 1
+            new_urls = [
+                url
+                for url in cls._crawl_listing_page(
+                    session, base_url, category, page_number
+                )
+                if url not in urls
+            ]
+            if not new_urls:
+                # Past the last page
+                return urls, False
+            if max_pages is not None and page_number > max_pages:
+                # Page fetched only to tell whether the listing is truncated
+                return urls, True
+            urls.extend(new_urls)
+
+    @classmethod
+    def _crawl_listing_page(
+        cls, session: requests.Session, base_url: str, category: str, page_number: int
+    ) -> list[str]:
+        with metrics.timer("http.marketplace_listing"):
+            page = session.get(
+                base_url + "/marketplace",
+                params={"type": "actions", "category": category, "page": page_number},
+            )
+        if page.status_code != 200:
+            return []
+        return list(dict.fromkeys(cls.LISTING_LINK_REGEX.findall(page.text)))
+
+    @classmethod
+    def _fetch_listing(
+        cls, session: requests.Session, base_url: str, marketplace_url: str
+    ) -> Optional[MarketplaceListing]:
+        try:
+            with metrics.timer("http.marketplace_page"):
+                page = session.get(base_url + marketplace_url)
+        except requests.RequestException as e:
+            logging.info(f'[MarketplaceCatalog] Error on "{marketplace_url}": {e!r}')
+            return None
+        if page.status_code != 200:
+            return None
+        return cls.parse_listing(page.text, marketplace_url)
+
+    @classmethod
+    def parse_listing(
+        cls, html: str, marketplace_url: str
+    ) -> Optional[MarketplaceListing]:
+        """Extract the listing facts from the HTML of a marketplace page."""
+        with metrics.timer("marketplace.html_extraction"):
+            page = extract_marketplace_page(html)
+        if not page.repository:
+            return None
+        return MarketplaceListing(
+            page.repository,
+            marketplace_url,
+            page.verified_creator,
+            page.categories,
+            page.action,
+        )
+
+    # ----------- #
+    # PERSISTENCE #
+    # ----------- #
+
+    def save(self, path: Path) -> None:
+        catalog = {
+            "build_datetime": str(datetime.now()),
+            "listings": [asdict(listing) for listing in self.listings.values()],
+            "unresolved_urls": self.unresolved_urls,
+            "truncated_categories": self.truncated_categories,
+        }
+        with open(path, "w") as catalog_file:
+            json.dump(catalog, catalog_file, indent=4)
+
+    @classmethod
+    def load(cls, path: Path) -> "MarketplaceCatalog":
+        with open(path) as catalog_file:
+            catalog = json.load(catalog_file)
+        listings = {}
+        for listing in catalog["listings"]:
+            listing["categories"] = tuple(listing["categories"])
+            listing = MarketplaceListing(**listing)
+            listings[listing.slug] = listing
+        return cls(
+            listings,
+            catalog.get("unresolved_urls", []),
+            catalog.get("truncated_categories", []),
+        )
+
+
+if __name__ == "__main__":
+    from config import get_settings, setup_run
+
+    parser = argparse.ArgumentParser(description="Build the marketplace catalog.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="crawl the marketplace")
+    build_parser.add_argument(
+        "--output", type=Path, default=None, help="defaults to DUMPS_DIR"
+    )
+    build_parser.add_argument("--base-url", default=MarketplaceCatalog.BASE_GITHUB_URL)
+    build_parser.add_argument("--category", nargs="+", choices=list(CATEGORIES))
+    build_parser.add_argument(
+        "--max-pages", type=int, default=None, help="defaults to every page"
+    )
+    build_parser.add_argument("--workers", type=int, default=8)
+    build_parser.add_argument(
+        "--update", action="store_true", help="reuse the listings already resolved"
+    )
+    args = parser.parse_args()
+
+    setup_run()
+    output = args.output or get_settings().dumps_dir / "marketplace_catalog.json"
+    previous = (
+        MarketplaceCatalog.load(output) if args.update and output.exists() else None
+    )
+    catalog = MarketplaceCatalog.build(
+        base_url=args.base_url,
+        categories=args.category,
+        max_pages=args.max_pages,
+        workers=args.workers,
+        previous=previous,
+    )
+    catalog.save(output)
+    print(f"Saved {len(catalog)} listings to {output}.")
@@ -0,0 +1,154 @@
+"""
+Pipelined scraping and analysis of workflows.
+
+In the batch path, `WorkflowScraper.scrape_repos()` downloads every repository
+before `WorkflowAnalyzer` parses the whole `DATA_DIR`, so the analysis CPU is
+idle while the (network-bound) scraping runs, and vice versa. Here, the two
+stages overlap:
+
+    slugs --(bounded queue)--> scraper threads --(bounded queue)--> parser
+
+The workflows of each repository are parsed as soon as they are downloaded,
+so only the aggregation (dataframes, indexes, pattern mining) is left when the
+last download completes. Both queues are bounded: the feeder waits while the
+scraper threads are busy, and the scraper threads wait while the parser lags
+behind. The outputs are the same as those of the batch path.
+
+The overlap only saves the time the scraper threads spend waiting on the
+network: parsing and the scraper threads share the GIL, so CPU-bound work is
+not sped up, and the thread switches cost a few percent. Against the local
+mock of GitHub (benchmark stage `pipeline`, 100 repositories, 4 tokens), the
+pipelined run takes 1.06x the time of the batch path without latency, about
+the same time with 10 ms per request, and 0.91x with 50 ms per request.
+
+While the pipeline runs, the frequent actions and docker commands are tracked
+with bounded memory (see `streaming.py`), and checkpointed to `DUMPS_DIR`
+every `checkpoint_every` repositories, so that they can be queried before the
+scraping completes.
+"""
+
+import logging
+import queue
+import threading
+from pathlib import Path
+from typing import Optional
+
+from analyze_workflows import Workflow, WorkflowAnalyzer, corpus_file_reader
+from config import Settings
+from corpus import WorkflowArchive
+from instrumentation import metrics
+from models import GitHubSlug
+from references import ReferenceResolver
+from scrape_repos import WorkflowScraper
+from streaming import LossyCounter
+from summaries import SummaryTables
+
+
+class WorkflowPipeline:
+    """Scrape repositories and parse their workflows concurrently.
+
+    Args:
+        settings: project settings (tokens, data and dumps directories)
+        slugs: repositories to scrape
+        archive: packed corpus used in place of `settings.data_dir`
+        queue_size: capacity of the queues of slugs and downloaded repos
+        checkpoint_every: repositories between checkpoints of the frequent items
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        slugs: list[GitHubSlug],
+        archive: Optional[WorkflowArchive] = None,
+        queue_size: int = 32,
+        checkpoint_every: int = 100,
+    ) -> None:
+        self.settings = settings
+        self.archive = archive
+        self.repo_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.scraper = WorkflowScraper(
+            settings.experiment_settings,
+            settings.token_list,
+            settings.dumps_dir,
+            settings.data_dir,
+            slugs,
+            archive,
+            workflow_sink=self.repo_queue,
+            max_queued_slugs=queue_size,
+        )
+        self.workflows: list[Workflow] = []
+        # Maintained as the workflows are parsed
+        self.summaries = SummaryTables()
+        self.frequent_items = {
+            "actions_noTags": LossyCounter(),
+            "docker_commands_subsample": LossyCounter(),
+        }
+        self.checkpoint_every = checkpoint_every
+        self._n_of_parsed_repos = 0
+        self._resolver = ReferenceResolver(
+            corpus_file_reader(archive if archive is not None else settings.data_dir)
+        )
+        self._error: Optional[BaseException] = None
+
+    def run(self) -> WorkflowAnalyzer:
+        parser_thread = threading.Thread(target=self._parse_repos, daemon=True)
+        parser_thread.start()
+        try:
+            self.scraper.scrape_repos()
+        finally:
+            # Sentinel: no more repositories
+            self.repo_queue.put(None)
+            parser_thread.join()
+        if self._error is not None:
+            raise self._error
+        self.save_frequent_items()
+
+        with metrics.timer("pipeline.aggregation"):
+            return WorkflowAnalyzer.from_workflows(self.workflows, self.summaries)
+
+    def _parse_repos(self) -> None:
+        """Parse the workflows of each repository taken from the queue."""
+        while True:
+            item = self.repo_queue.get()
+            if item is None:
+                break
+            slug, repo_workflows = item
+            if self._error is not None:
+                # Keep draining the queue so that the scraper never blocks
+                continue
+            try:
+                with metrics.timer("pipeline.parse_repo"):
+                    for key, text in repo_workflows:
+                        workflow = self._parse_workflow(key, text)
+                        self.workflows.append(workflow)
+                        self.summaries.add_workflow(workflow)
+                        self._count_items(workflow)
+                self._n_of_parsed_repos += 1
+                if self._n_of_parsed_repos % self.checkpoint_every == 0:
+                    self.save_frequent_items()
+            except Exception as e:
+                logging.info(f'[WorkflowPipeline] Error while parsing "{slug}".')
+                self._error = e
+
+    def _count_items(self, workflow: Workflow) -> None:
+        """Add a workflow to the transactions of the frequent items."""
+        with metrics.timer("pipeline.frequent_items"):
+            self.frequent_items["actions_noTags"].add(
+                action.slug_without_tag for action in workflow.actions
+            )
+            # Same subsample as in `WorkflowAnalyzer`
+            if workflow.docker_commands:
+                self.frequent_items["docker_commands_subsample"].add(
+                    workflow.docker_commands.keys()
+                )
+
+    def save_frequent_items(self) -> None:
+        for name, counter in self.frequent_items.items():
+            counter.save(self.settings.dumps_dir / f"frequent_items_{name}.npz")
+
+    def _parse_workflow(self, key: str, text: str) -> Workflow:
+        # Same paths as in `WorkflowAnalyzer`, so that workflow names match
+        if self.archive is not None:
+            return Workflow(Path(), Path(key), text, self._resolver)
+        data_dir = self.settings.data_dir
+        return Workflow(data_dir, data_dir / key, text, self._resolver)
@@ -0,0 +1,211 @@
+"""
+Classification and offline resolution of the `uses:` references of workflows.
+
+A `uses:` value can point to very different things:
+
+- a remote action, `owner/repo[/path]@ref` (a marketplace candidate);
+- a local action, `./path/to/action`, defined in the same repository (paths
+  leaving the repository with `..` are invalid);
+- a docker image, `docker://image:tag`;
+- a reusable workflow, called at the job level, either local
+  (`./.github/workflows/build.yml`) or remote
+  (`owner/repo/.github/workflows/build.yml@ref`).
+
+Only remote actions can be looked up on GitHub. Local references are resolved
+against the files already downloaded for the repository, without any network
+call: the workflows of a repository are stored flat in `DATA_DIR/<owner>/<repo>/`,
+and `WorkflowScraper` stores the definitions of the local actions they use
+under their path (e.g., `<owner>/<repo>/.github/actions/setup/action.yml`).
+Resolutions are memoized, since the same local action is typically referenced
+by several workflows of a repository.
+"""
+
+import re
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from pathlib import PurePosixPath
+from typing import Callable, Optional
+
+from ruamel.yaml import YAML
+from ruamel.yaml.error import YAMLError
+
+
+class ReferenceKind(str, Enum):
+    REMOTE_ACTION = "remote_action"
+    LOCAL_ACTION = "local_action"
+    DOCKER_IMAGE = "docker_image"
+    LOCAL_WORKFLOW = "local_workflow"
+    REMOTE_WORKFLOW = "remote_workflow"
+    INVALID = "invalid"
+
+
+REMOTE_ACTION_REGEX = re.compile(r"^[\w.-]+/[\w.-]+(/[^@\s]*)?(@\S+)?$")
+REMOTE_WORKFLOW_REGEX = re.compile(
+    r"^[\w.-]+/[\w.-]+/\.github/workflows/[^@\s]+\.ya?ml@\S+$"
+)
+
+
+@dataclass(frozen=True)
+class Reference:
+    """A classified `uses:` value."""
+
+    kind: ReferenceKind
+    value: str
+
+    @property
+    def is_marketplace_candidate(self) -> bool:
+        return self.kind is ReferenceKind.REMOTE_ACTION
+
+
+@lru_cache(maxsize=None)
+def classify_reference(value: str, job_level: bool = False) -> Reference:
+    """Classify the value of a step-level (or job-level) `uses:` key."""
+    if value.startswith("./"):
+        if _escapes_repository(value):
+            kind = ReferenceKind.INVALID
+        elif job_level:
+            kind = ReferenceKind.LOCAL_WORKFLOW
+        else:
+            kind = ReferenceKind.LOCAL_ACTION
+    elif job_level:
+        kind = (
+            ReferenceKind.REMOTE_WORKFLOW
+            if REMOTE_WORKFLOW_REGEX.match(value)
+            else ReferenceKind.INVALID
+        )
+    elif value.startswith("docker://"):
+        kind = ReferenceKind.DOCKER_IMAGE
+    elif REMOTE_ACTION_REGEX.match(value):
+        kind = ReferenceKind.REMOTE_ACTION
+    else:
+        # E.g., expressions like `${{ matrix.action }}`
+        kind = ReferenceKind.INVALID
+    return Reference(kind, value)
+
+
+def _escapes_repository(path: str) -> bool:
+    return ".." in PurePosixPath(path).parts
+
+
+def local_action_directory(value: str) -> Optional[str]:
+    """Return the directory of a local action, relative to the repository.
+
+    `None` is returned for an action at the root of the repository, whose
+    definition cannot be stored next to the (flat) workflows.
+    """
+    directory = PurePosixPath(value).as_posix()
+    return None if directory == "." or _escapes_repository(value) else directory
+
+
+def local_action_paths(document: object) -> list[str]:
+    """Return the directories of the local actions used by a parsed YAML file.
+
+    Both the steps of the jobs of a workflow and the steps of a composite
+    action are considered.
+    """
+    steps: list = []
+    if isinstance(document, dict):
+        jobs = document.get("jobs")
+        for job in jobs.values() if isinstance(jobs, dict) else ():
+            if isinstance(job, dict) and isinstance(job.get("steps"), list):
+                steps.extend(job["steps"])
+        runs = document.get("runs")
+        if isinstance(runs, dict) and isinstance(runs.get("steps"), list):
+            steps.extend(runs["steps"])
+
+    paths: list[str] = []
+    for step in steps:
+        uses = step.get("uses") if isinstance(step, dict) else None
+        if not uses:
+            continue
+        reference = classify_reference(str(uses))
+        if reference.kind is ReferenceKind.LOCAL_ACTION:
+            directory = local_action_directory(reference.value)
+            if directory is not None and directory not in paths:
+                paths.append(directory)
+    return paths
+
+
+class ReferenceResolver:
+    """Resolve local references against the downloaded repository files.
+
+    Args:
+        read_file: returns the text of a file given its path relative to
+            `DATA_DIR` (e.g., `owner/repo/build.yml`), or `None` if missing
+    """
+
+    ACTION_FILENAMES = ("action.yml", "action.yaml")
+
+    def __init__(self, read_file: Callable[[str], Optional[str]]) -> None:
+        self._read_file = read_file
+        # (repository, reference) -> resolved key, or None if unresolved
+        self._workflow_cache: dict[tuple[str, str], Optional[str]] = {}
+        # (repository, reference) -> `uses` of the steps of a composite action
+        self._action_cache: dict[tuple[str, str], Optional[tuple[str, ...]]] = {}
+
+    def resolve_workflow(self, repository: str, value: str) -> Optional[str]:
+        """Return the corpus key of a local reusable workflow, if downloaded."""
+        cache_key = (repository, value)
+        if cache_key not in self._workflow_cache:
+            # Workflows are stored without the `.github/workflows` directories
+            key = f"{repository}/{PurePosixPath(value).name}"
+            self._workflow_cache[cache_key] = (
+                key if self._read_file(key) is not None else None
+            )
+        return self._workflow_cache[cache_key]
+
+    def resolve_action(self, repository: str, value: str) -> Optional[tuple[str, ...]]:
+        """Return the remote actions used by a local composite action.
+
+        Local actions nested in the composite action are resolved
+        recursively. `None` is returned if the action definition was not
+        downloaded (e.g., for an action at the root of the repository) or is
+        not a composite action.
+        """
+        return self._resolve_action(repository, value, frozenset())
+
+    def _resolve_action(
+        self, repository: str, value: str, visiting: frozenset
+    ) -> Optional[tuple[str, ...]]:
+        cache_key = (repository, value)
+        if cache_key in self._action_cache:
+            return self._action_cache[cache_key]
+        if cache_key in visiting:
+            return ()
+
+        definition = self._load_action_definition(repository, value)
+        runs = definition.get("runs") if isinstance(definition, dict) else None
+        if not isinstance(runs, dict) or runs.get("using") != "composite":
+            self._action_cache[cache_key] = None
+            return None
+
+        remote_actions: list[str] = []
+        for step in runs.get("steps") or []:
+            uses = step.get("uses") if isinstance(step, dict) else None
+            if not uses:
+                continue
+            reference = classify_reference(str(uses))
+            if reference.is_marketplace_candidate:
+                remote_actions.append(reference.value)
+            elif reference.kind is ReferenceKind.LOCAL_ACTION:
+                # Local paths are relative to the root of the repository
+                nested = self._resolve_action(
+                    repository, reference.value, visiting | {cache_key}
+                )
+                remote_actions.extend(nested or ())
+        self._action_cache[cache_key] = tuple(remote_actions)
+        return self._action_cache[cache_key]
+
+    def _load_action_definition(self, repository: str, value: str) -> Optional[dict]:
+        directory = local_action_directory(value)
+        if directory is None:
+            return None
+        for filename in self.ACTION_FILENAMES:
+            text = self._read_file(f"{repository}/{directory}/{filename}")
+            if text is not None:
+                try:
+                    return YAML(typ="safe", pure=True).load(text)
+                except YAMLError:
+                    return None
+        return None
@@ -0,0 +1,175 @@
+"""
+Local store of the raw repository metadata used to screen repositories.
+
+`DataScienceScraper` decides whether a repository is included in the study
+from its description, topics and last commit date. These raw facts are saved
+in a `RepoMetadataStore` (a JSON Lines file, appended to as the scraping goes)
+so that the inclusion criteria can be changed and applied again to the whole
+store in seconds, without any new API call:
+
+    python actions4DS/repo_metadata.py rescreen
+
+The criteria themselves are compiled once by `InclusionCriteria`, from the
+`keywords` and `githubActionsRelease*` entries of `settings.json`.
+"""
+
+import argparse
+import json
+import re
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from models import GitHubSlug
+
+
+@dataclass(frozen=True)
+class RepoMetadata:
+    """Raw facts about a repository, as returned by the GitHub API."""
+
+    slug: str
+    available: bool
+    description: str = ""
+    topics: tuple[str, ...] = ()
+    # ISO 8601 date of the last commit on the default branch
+    last_commit_date: Optional[str] = None
+
+
+class RepoMetadataStore:
+    """Append-only JSON Lines store of `RepoMetadata`, indexed by slug.
+
+    If a slug was stored more than once, its last record wins.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._records: dict[str, RepoMetadata] = {}
+        if path.exists():
+            with open(path, encoding="utf8") as store_file:
+                for line in store_file:
+                    if line.strip():
+                        record = json.loads(line)
+                        record["topics"] = tuple(record["topics"])
+                        self._records[record["slug"].lower()] = RepoMetadata(**record)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, slug: object) -> bool:
+        return str(slug).lower() in self._records
+
+    def __iter__(self) -> Iterator[RepoMetadata]:
+        return iter(self._records.values())
+
+    def __repr__(self) -> str:
+        return f'RepoMetadataStore("{self.path}", {len(self)} repositories)'
+
+    def get(self, slug: Union[GitHubSlug, str]) -> Optional[RepoMetadata]:
+        return self._records.get(str(slug).lower())
+
+    def add(self, metadata: RepoMetadata) -> None:
+        with self._lock:
+            with open(self.path, "a", encoding="utf8") as store_file:
+                store_file.write(json.dumps(asdict(metadata)) + "\n")
+            self._records[metadata.slug.lower()] = metadata
+
+
+class InclusionCriteria:
+    """Inclusion criteria of the study, compiled from the experiment settings.
+
+    - If `githubActionsReleaseCondition` is set, the last commit must be more
+      recent than the release of GitHub Actions plus
+      `githubActionsRelease-offset-months`.
+    - The description or the topics must contain at least one of `keywords`.
+    """
+
+    GITHUB_ACTIONS_RELEASE_DATE = datetime(2019, 11, 1)
+
+    def __init__(
+        self, keywords: list[str], acceptance_date: Optional[datetime] = None
+    ) -> None:
+        self.keywords = keywords
+        self.acceptance_date = acceptance_date
+        # A single alternation: one scan per text instead of one per keyword
+        self.keywords_regex = re.compile(
+            "|".join(f"(?:{keyword})" for keyword in keywords), re.IGNORECASE
+        )
+
+    @classmethod
+    def from_settings(cls, experiment_settings: dict) -> "InclusionCriteria":
+        acceptance_date = None
+        if experiment_settings["githubActionsReleaseCondition"]:
+            offset_months = int(
+                experiment_settings["githubActionsRelease-offset-months"]
+            )
+            acceptance_date = cls.GITHUB_ACTIONS_RELEASE_DATE + timedelta(
+                days=(offset_months * 30)
+            )
+        return cls(experiment_settings["keywords"], acceptance_date)
+
+    def is_active(self, metadata: RepoMetadata) -> bool:
+        """Whether the repository was committed to after the acceptance date."""
+        if self.acceptance_date is None:
+            return True
+        if metadata.last_commit_date is None:
+            return False
+        last_commit_date = datetime.fromisoformat(metadata.last_commit_date)
+        return last_commit_date.replace(tzinfo=None) >= self.acceptance_date
+
+    def has_keyword(self, metadata: RepoMetadata) -> bool:
+        """Whether the description or the topics contain a keyword."""
+        if not self.keywords:
+            return False
+        return bool(
+            self.keywords_regex.search(" ".join(metadata.topics))
+            or self.keywords_regex.search(metadata.description)
+        )
+
+
+if __name__ == "__main__":
+    from config import get_settings, setup_run
+    from scrape_repos import DataScienceScraper
+
+    parser = argparse.ArgumentParser(
+        description="Screen the stored repositories against settings.json."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rescreen_parser = subparsers.add_parser(
+        "rescreen", help="apply the inclusion criteria without API calls"
+    )
+    rescreen_parser.add_argument(
+        "--store", type=Path, default=None, help="defaults to DUMPS_DIR"
+    )
+    rescreen_parser.add_argument(
+        "--slugs",
+        type=Path,
+        default=None,
+        help="file with one slug per line (defaults to all the stored repositories)",
+    )
+    args = parser.parse_args()
+
+    settings = setup_run()
+    store_path = args.store or get_settings().dumps_dir / "repo_metadata.jsonl"
+    store = RepoMetadataStore(store_path)
+    if args.slugs:
+        slugs = [
+            GitHubSlug(line.strip())
+            for line in args.slugs.read_text().splitlines()
+            if line.strip()
+        ]
+    else:
+        slugs = [GitHubSlug(metadata.slug) for metadata in store]
+
+    scraper = DataScienceScraper(
+        settings.experiment_settings,
+        settings.token_list,
+        settings.dumps_dir,
+        slugs,
+        metadata_store=store,
+    )
+    scraper.rescreen()
+    print(scraper)
+    print(f"Dump saved to {scraper.dump_path}.")
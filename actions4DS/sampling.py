@@ -0,0 +1,233 @@
+"""
+Reproducible (stratified) samples of repositories and prevalence estimates.
+
+A full scrape of a large slug list takes days of token budget. A sample sized
+for a target margin of error gives, in a fraction of that time, estimates (with
+confidence intervals) of the prevalence of selected repos, repos with
+workflows, docker or CML usage, etc.
+
+`SamplingPlan` puts the slugs in a fixed random order such that every prefix
+of the order is a proportionally stratified sample: a sample is a prefix, a
+larger sample extends a smaller one, and the full run is the whole order.
+Since repos already screened (with a `RepoMetadataStore`) or downloaded are
+not queried again, a full run after a sample does not repeat its work.
+
+Strata:
+
+- `none`: simple random sample;
+- `owner`: the sample is spread across repository owners;
+- `segment`: the sample is spread across consecutive segments of the input
+  list (e.g., the chunks of a RepoReaper export).
+"""
+
+import hashlib
+import math
+import re
+from collections import defaultdict
+from statistics import NormalDist
+from typing import Iterable
+
+import pandas as pd
+from models import GitHubSlug
+from ruamel.yaml import YAML
+from ruamel.yaml.error import YAMLError
+
+# Same definitions as `Action`/`RunCommand` in `analyze_workflows.py`
+DOCKER_REGEX = re.compile("docker", re.IGNORECASE)
+CML_REGEX = re.compile("cml", re.IGNORECASE)
+
+
+def _z_score(confidence: float) -> float:
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def sample_size(
+    population: int,
+    margin_of_error: float,
+    confidence: float = 0.95,
+    proportion: float = 0.5,
+) -> int:
+    """Sample size estimating a proportion within `margin_of_error`.
+
+    The default `proportion` (0.5) gives the most conservative size. The
+    finite population correction is applied.
+    """
+    if population <= 0:
+        return 0
+    z = _z_score(confidence)
+    infinite_size = z**2 * proportion * (1 - proportion) / margin_of_error**2
+    size = infinite_size / (1 + (infinite_size - 1) / population)
+    return min(population, math.ceil(size))
+
+
+def proportion_interval(
+    successes: int, size: int, population: int, confidence: float = 0.95
+) -> tuple[float, float, float]:
+    """Estimate and Wilson score interval of a proportion.
+
+    The finite population correction shrinks the interval as the sample
+    approaches the whole population (it is empty for a census).
+
+    Returns:
+        tuple[float, float, float]: estimate, lower and upper bounds
+    """
+    if size == 0:
+        return math.nan, 0.0, 1.0
+    estimate = successes / size
+    correction = (population - size) / (population - 1) if population > 1 else 0.0
+    if correction <= 0:
+        return estimate, estimate, estimate
+    # Wilson interval for the effective sample size
+    effective_size = size / correction
+    z = _z_score(confidence)
+    denominator = 1 + z**2 / effective_size
+    center = (estimate + z**2 / (2 * effective_size)) / denominator
+    half_width = (
+        z
+        * math.sqrt(
+            estimate * (1 - estimate) / effective_size + z**2 / (4 * effective_size**2)
+        )
+        / denominator
+    )
+    return estimate, max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+def workflow_indicators(workflow_texts: Iterable[str]) -> dict[str, bool]:
+    """Whether the steps of the workflows of a repo use docker or CML."""
+    uses_docker = uses_cml = False
+    yaml_parser = YAML(typ="safe", pure=True)
+    for text in workflow_texts:
+        try:
+            document = yaml_parser.load(text)
+        except YAMLError:
+            continue
+        jobs = document.get("jobs") if isinstance(document, dict) else None
+        if not isinstance(jobs, dict):
+            continue
+        for job in jobs.values():
+            if not isinstance(job, dict):
+                continue
+            for step in job.get("steps") or []:
+                if not isinstance(step, dict):
+                    continue
+                for key in ("uses", "run"):
+                    value = str(step.get(key) or "")
+                    uses_docker = uses_docker or bool(DOCKER_REGEX.search(value))
+                    uses_cml = uses_cml or bool(CML_REGEX.search(value))
+    return {"uses_docker": uses_docker, "uses_cml": uses_cml}
+
+
+class SamplingPlan:
+    """A fixed random order of the slugs whose prefixes are stratified samples.
+
+    Args:
+        slugs: the population, in the order of the input list
+        strata: `none`, `owner` or `segment`
+        seed: seed of the random order
+        n_of_segments: number of segments of the input list (`segment` strata)
+    """
+
+    STRATA = ("none", "owner", "segment")
+
+    def __init__(
+        self,
+        slugs: list[GitHubSlug],
+        strata: str = "none",
+        seed: int = 0,
+        n_of_segments: int = 10,
+    ) -> None:
+        if strata not in self.STRATA:
+            raise ValueError(f"Unknown strata: {strata}.")
+        self.strata = strata
+        self.seed = seed
+        self.n_of_segments = n_of_segments
+        self.order: list[GitHubSlug] = self._systematic_order(slugs)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __repr__(self) -> str:
+        return f'SamplingPlan({len(self)} slugs, strata="{self.strata}")'
+
+    def sample(self, size: int) -> list[GitHubSlug]:
+        """The first `size` slugs of the order (nested as `size` grows)."""
+        return self.order[:size]
+
+    def sample_for(
+        self, margin_of_error: float, confidence: float = 0.95
+    ) -> list[GitHubSlug]:
+        """A sample sized for `margin_of_error` (see `sample_size()`)."""
+        return self.sample(sample_size(len(self), margin_of_error, confidence))
+
+    def remaining(self, size: int) -> list[GitHubSlug]:
+        """The slugs not in `sample(size)`."""
+        return self.order[size:]
+
+    def estimate(
+        self, outcomes: dict[str, dict[str, bool]], confidence: float = 0.95
+    ) -> pd.DataFrame:
+        """Estimate the prevalence of each indicator over the population.
+
+        Since the sample is proportionally stratified, it is self-weighting:
+        the estimate is the sample proportion, and the simple random sampling
+        interval is conservative.
+
+        Args:
+            outcomes: indicators of each scraped repo, by slug
+            confidence: confidence level of the intervals
+        """
+        indicators = list(dict.fromkeys(i for o in outcomes.values() for i in o))
+        records = []
+        for indicator in indicators:
+            successes = sum(bool(o.get(indicator)) for o in outcomes.values())
+            estimate, ci_low, ci_high = proportion_interval(
+                successes, len(outcomes), len(self), confidence
+            )
+            records.append(
+                {
+                    "indicator": indicator,
+                    "successes": successes,
+                    "sample_size": len(outcomes),
+                    "population": len(self),
+                    "estimate": estimate,
+                    "ci_low": ci_low,
+                    "ci_high": ci_high,
+                    "confidence": confidence,
+                }
+            )
+        return pd.DataFrame.from_records(records)
+
+    def _rank(self, key: str) -> int:
+        """Pseudo-random rank of a slug (or stratum), given the seed only."""
+        digest = hashlib.blake2b(
+            f"{self.seed}:{key.lower()}".encode("utf8"), digest_size=8
+        ).digest()
+        return int.from_bytes(digest, "big")
+
+    def _systematic_order(self, slugs: list[GitHubSlug]) -> list[GitHubSlug]:
+        """Interleave the strata so that every prefix is proportional to them.
+
+        Within its stratum of size `N_h`, the k-th slug (by rank) gets the
+        priority `(k + u_h) / N_h`, where `u_h` is a random start in [0, 1):
+        any prefix of the order by priority takes about `n * N_h / N` slugs
+        from each stratum.
+        """
+        strata: dict[str, list[GitHubSlug]] = defaultdict(list)
+        for position, slug in enumerate(slugs):
+            strata[self._stratum(slug, position, len(slugs))].append(slug)
+
+        keyed = []
+        for stratum, stratum_slugs in strata.items():
+            start = self._rank(f"stratum:{stratum}") / 2**64
+            ranked = sorted(stratum_slugs, key=lambda slug: self._rank(str(slug)))
+            for k, slug in enumerate(ranked):
+                keyed.append(((k + start) / len(ranked), self._rank(str(slug)), slug))
+        keyed.sort(key=lambda item: item[:2])
+        return [slug for _, _, slug in keyed]
+
+    def _stratum(self, slug: GitHubSlug, position: int, population: int) -> str:
+        if self.strata == "owner":
+            return slug.repo_owner.lower()
+        if self.strata == "segment":
+            return str(position * self.n_of_segments // population)
+        return ""
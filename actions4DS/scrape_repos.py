@@ -2,22 +2,37 @@ import calendar
 import json
 import logging
 import queue
-import re
 import threading
 import time
 import traceback
-from datetime import datetime, timedelta
+from datetime import datetime
+from io import StringIO
 from pathlib import Path
+from typing import Optional
 
+import pandas as pd
+from corpus import WorkflowArchive, is_workflow_key
 from github import Github
-from github.GithubException import UnknownObjectException
+from github.GithubException import GithubException, UnknownObjectException
+from instrumentation import metrics
 from models import GitHubSlug
+from references import ReferenceResolver, local_action_paths
+from repo_metadata import InclusionCriteria, RepoMetadata, RepoMetadataStore
 from rich.progress import BarColumn, Progress, TaskID, TimeRemainingColumn
 from ruamel.yaml import YAML
+from sampling import SamplingPlan, workflow_indicators
 
 
 class GitHubScraper:
-    """Base class for scraping GitHub repositories."""
+    """Base class for scraping GitHub repositories.
+
+    With `record_outcomes`, the indicators of each repo (e.g., whether it was
+    selected) are kept in `repo_outcomes`, so that the prevalence of each
+    indicator can be estimated when a sample of slugs is scraped (see
+    `estimate_prevalence()`).
+    """
+
+    GITHUB_API_URL = "https://api.github.com"
 
     def __init__(
         self,
@@ -25,6 +40,8 @@ class GitHubScraper:
         token_list: list[str],
         dumps_dir: Path,
         slugs: list[GitHubSlug],
+        max_queued_slugs: int = 0,
+        record_outcomes: bool = False,
     ) -> None:
 
         # Set up the experiment settings
@@ -42,6 +59,10 @@ class GitHubScraper:
         # Initialize list of selected slugs
         self.selected_slugs: list[GitHubSlug] = []
 
+        # Initialize (optional) indicators of each repo, by slug
+        self.record_outcomes = record_outcomes
+        self.repo_outcomes: dict[str, dict[str, bool]] = {}
+
         # Define dump filename upon the name of the class that produces it
         # and the current date
         current_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -50,25 +71,75 @@ class GitHubScraper:
         )
 
         # Initialize multithreading
+        # With `max_queued_slugs`, slugs are fed to a bounded queue while the
+        # scraping runs (see `_start_feeding()`) instead of all upfront
         self.token_list = token_list
-        self.queue: queue.Queue = queue.Queue()
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queued_slugs)
 
         self.slugs = slugs
+        self._feeder: Optional[threading.Thread] = None
+        if max_queued_slugs:
+            self._feeder = threading.Thread(target=self._feed_slugs, daemon=True)
+        else:
+            self._feed_slugs()
+
+    def _feed_slugs(self) -> None:
+        """Put the slugs in the queue, then one sentinel for each thread."""
         for slug in self.slugs:
             self.queue.put(slug)
-        for _ in range(len(token_list)):
+        for _ in range(len(self.token_list)):
             self.queue.put(None)
 
+    def _start_feeding(self) -> None:
+        if self._feeder is not None:
+            self._feeder.start()
+
+    def _join_queue(self) -> None:
+        """Block until every slug has been fed to the queue and processed."""
+        if self._feeder is not None:
+            # The queue can be momentarily empty while the feeder still runs
+            self._feeder.join()
+        self.queue.join()
+
+    def _record_outcome(self, slug: GitHubSlug, **indicators: bool) -> None:
+        if self.record_outcomes:
+            self.repo_outcomes.setdefault(str(slug), {}).update(indicators)
+
+    def estimate_prevalence(
+        self, plan: SamplingPlan, confidence: float = 0.95
+    ) -> pd.DataFrame:
+        """Estimate the prevalence of the indicators of the scraped sample.
+
+        The estimates are also added to the scraping stats and dumped.
+
+        Args:
+            plan: the plan the scraped slugs were sampled from
+            confidence: confidence level of the intervals
+        """
+        if not self.record_outcomes:
+            raise ValueError("Estimating prevalences requires `record_outcomes`.")
+        estimates_df = plan.estimate(self.repo_outcomes, confidence)
+        self.scraping_stats["prevalence_estimates"] = estimates_df.to_dict("records")
+        self._dump_scraping_results()
+        return estimates_df
+
+    def _get_github_client(self, token: str) -> Github:
+        """Return a PyGithub client authenticated with `token`."""
+        return Github(token, base_url=self.GITHUB_API_URL)
+
     def _check_rate_limit(self, github: Github):
         """Check the rate limit of the Github API."""
-        core_rate_limit = github.get_rate_limit().core
+        with metrics.timer("github.get_rate_limit"):
+            core_rate_limit = github.get_rate_limit().core
         if core_rate_limit.remaining <= 5:
             logging.info("Rate limit reached...")
+            metrics.count("github.rate_limit_reached")
             reset_timestamp = calendar.timegm(core_rate_limit.reset.timetuple())
             # add 5 seconds to be sure the rate limit has been reset)
             sleep_time = reset_timestamp - calendar.timegm(time.gmtime()) + 5
             logging.info(f"Sleeping for {sleep_time} seconds...")
-            time.sleep(sleep_time)
+            with metrics.timer("github.rate_limit_sleep"):
+                time.sleep(sleep_time)
             logging.info("Resuming after sleep...")
 
     def _dump_scraping_results(self) -> None:
@@ -98,10 +169,16 @@ class DataScienceScraper(GitHubScraper):
     """Scraper for data science repositories.
 
     INCLUSION CRITERIA
-    - The last commit in the repo must have been done `self.OFFSET_MONTHS` past
+    - The last commit in the repo must have been done `OFFSET_MONTHS` past
       the release date of GitHub Actions.
     - The description or the topics of the repo must contain at least one of
-      the keywords in `self.KEYWORDS`
+      the keywords in `KEYWORDS`
+
+    (See `repo_metadata.InclusionCriteria`.)
+
+    When a `RepoMetadataStore` is given, the raw metadata of each repo are
+    saved to it, repos already in the store are screened without API calls,
+    and `rescreen()` screens all the repos offline.
 
     Extends: GitHubScraper
     """
@@ -112,24 +189,25 @@ class DataScienceScraper(GitHubScraper):
         token_list: list[str],
         dumps_dir: Path,
         slugs: list[GitHubSlug],
+        metadata_store: Optional[RepoMetadataStore] = None,
+        record_outcomes: bool = False,
     ) -> None:
-        super().__init__(experiment_settings, token_list, dumps_dir, slugs)
+        super().__init__(
+            experiment_settings,
+            token_list,
+            dumps_dir,
+            slugs,
+            record_outcomes=record_outcomes,
+        )
 
-        # Set GitHub Actions release date and offset months
-        self.gh_actions_release_condition: bool = self.experiment_settings[
-            "githubActionsReleaseCondition"
-        ]
-        if self.gh_actions_release_condition:
-            GITHUB_ACTIONS_RELEASE_DATE: datetime = datetime(2019, 11, 1)
-            OFFSET_MONTHS: int = int(
-                self.experiment_settings["githubActionsRelease-offset-months"]
-            )
-            self.ACCEPTANCE_DATE = GITHUB_ACTIONS_RELEASE_DATE + timedelta(
-                days=(OFFSET_MONTHS * 30)
-            )
+        # Set the inclusion criteria (keywords, GitHub Actions release date)
+        self.criteria = InclusionCriteria.from_settings(self.experiment_settings)
+        self.gh_actions_release_condition: bool = (
+            self.criteria.acceptance_date is not None
+        )
 
-        # Set filtering keywords
-        self.KEYWORDS: list[str] = self.experiment_settings["keywords"]
+        # Set up the (optional) store of raw repo metadata
+        self.metadata_store: Optional[RepoMetadataStore] = metadata_store
 
         # Initialize scraping stats
         self.scraping_stats.update(
@@ -185,64 +263,31 @@ class DataScienceScraper(GitHubScraper):
 
             try:
 
+                # Repos already in the metadata store are screened without
+                # any API call
+                metadata = (
+                    self.metadata_store.get(slug)
+                    if self.metadata_store is not None
+                    else None
+                )
+
                 # Check GitHub API rate limit: wait if needed
-                self._check_rate_limit(github)
+                if metadata is None:
+                    self._check_rate_limit(github)
 
                 try:
-                    repo = github.get_repo(str(slug))  # API request (+1)
-
-                    if self.gh_actions_release_condition:
-                        # Decide based on last-commit date
-                        is_last_commit_date_ok = False
-                        commits = repo.get_commits(since=self.ACCEPTANCE_DATE)
-
-                        try:
-                            commits[0]  # API request (+1)
-                            is_last_commit_date_ok = True
-                        except IndexError:
-                            self.scraping_stats[
-                                "repos_inactive_before_GHA_release"
-                            ] += 1
-                            self.progress.console.log(
-                                f':cross_mark: Repo inactive before GHA release: "{slug}".',
-                            )
-
-                    if (
-                        not self.gh_actions_release_condition
-                    ) or is_last_commit_date_ok:
-
-                        # Decide based on keywords presence in repo topics or description
+                    if metadata is None:
                         try:
-                            topics = " ".join(repo.get_topics())  # API request (+1)
+                            metadata = self._fetch_metadata(github, slug)
                         except UnknownObjectException:
-                            topics = ""
-                        description = repo.description or ""
-
-                        keyword_found = False
-                        for keyword in self.KEYWORDS:
-                            keyword_in_topics = re.search(
-                                keyword, topics, re.IGNORECASE
-                            )
-                            keyword_in_description = re.search(
-                                keyword, description, re.IGNORECASE
-                            )
-                            if keyword_in_topics or keyword_in_description:
-                                keyword_found = True
-                                break
-
-                        if keyword_found:
-                            self.selected_slugs.append(slug)
-                            self.progress.console.log(
-                                f':thumbs_up: Data science repo found: "{slug}".',
-                            )
-                            self.scraping_stats["selected_repos"] += 1
-                            self._dump_scraping_results()
+                            metadata = RepoMetadata(str(slug), available=False)
+                        if self.metadata_store is not None:
+                            self.metadata_store.add(metadata)
+                    if self._screen_repo(slug, metadata):
+                        self._dump_scraping_results()
 
                 except Exception:
-                    self.scraping_stats["repos_not_available"] += 1
-                    self.progress.console.log(
-                        f':cross_mark: Repository not available: "{slug}".',
-                    )
+                    self._screen_repo(slug, RepoMetadata(str(slug), available=False))
                 finally:
                     self.progress.update(
                         self.task,
@@ -256,6 +301,106 @@ class DataScienceScraper(GitHubScraper):
             finally:
                 self.queue.task_done()
 
+    def _fetch_metadata(self, github: Github, slug: GitHubSlug) -> RepoMetadata:
+        """Query the GitHub API for the raw metadata of a repo.
+
+        Raises:
+            UnknownObjectException: if the repo does not exist
+        """
+        with metrics.timer("github.get_repo"):
+            repo = github.get_repo(str(slug))  # API request (+1)
+
+        # The last-commit date is only needed by the release condition, but
+        # is always stored so that the condition can be changed later
+        last_commit_date = None
+        if self.gh_actions_release_condition or self.metadata_store is not None:
+            try:
+                with metrics.timer("github.get_commits"):
+                    last_commit = repo.get_commits()[0]  # API request (+1)
+                last_commit_date = last_commit.commit.committer.date.isoformat()
+            except IndexError:
+                pass
+
+        try:
+            with metrics.timer("github.get_topics"):
+                topics = tuple(repo.get_topics())  # API request (+1)
+        except UnknownObjectException:
+            topics = ()
+
+        return RepoMetadata(
+            slug=str(slug),
+            available=True,
+            description=repo.description or "",
+            topics=topics,
+            last_commit_date=last_commit_date,
+        )
+
+    def _screen_repo(
+        self, slug: GitHubSlug, metadata: RepoMetadata, verbose: bool = True
+    ) -> bool:
+        """Apply the inclusion criteria to a repo and update the stats."""
+        self._record_outcome(
+            slug,
+            available=metadata.available,
+            active=metadata.available and self.criteria.is_active(metadata),
+            selected=False,
+        )
+        if not metadata.available:
+            self.scraping_stats["repos_not_available"] += 1
+            if verbose:
+                self.progress.console.log(
+                    f':cross_mark: Repository not available: "{slug}".',
+                )
+            return False
+
+        if not self.criteria.is_active(metadata):
+            self.scraping_stats["repos_inactive_before_GHA_release"] += 1
+            if verbose:
+                self.progress.console.log(
+                    f':cross_mark: Repo inactive before GHA release: "{slug}".',
+                )
+            return False
+
+        if not self.criteria.has_keyword(metadata):
+            return False
+
+        self.selected_slugs.append(slug)
+        self._record_outcome(slug, selected=True)
+        if verbose:
+            self.progress.console.log(
+                f':thumbs_up: Data science repo found: "{slug}".',
+            )
+        self.scraping_stats["selected_repos"] += 1
+        return True
+
+    def rescreen(self) -> list[GitHubSlug]:
+        """Screen the repos against the metadata store, without API calls.
+
+        Repos missing from the store are counted and skipped. The results
+        are dumped in the same format as `scrape_repos()`.
+
+        Returns:
+            list[GitHubSlug]: list of GitHub slugs with data science keywords
+        """
+        LOGGING_CONTEXT = "[Re-screening slugs from the metadata store] "
+        if self.metadata_store is None:
+            raise ValueError("Re-screening requires a metadata store.")
+
+        self.scraping_stats["repos_not_in_metadata_store"] = 0
+        for slug in self.slugs:
+            metadata = self.metadata_store.get(slug)
+            if metadata is None:
+                self.scraping_stats["repos_not_in_metadata_store"] += 1
+            else:
+                # Logging each repo would dominate the run time
+                self._screen_repo(slug, metadata, verbose=False)
+
+        self.scraping_stats["end_datetime"] = str(datetime.now())
+        self._dump_scraping_results()
+        logging.info(LOGGING_CONTEXT + "Re-screening completed.")
+        logging.info(LOGGING_CONTEXT + str(self))
+        return self.selected_slugs
+
     def scrape_repos(self) -> list[GitHubSlug]:
         """Scrape GitHub repos for data science.
 
@@ -272,12 +417,13 @@ class DataScienceScraper(GitHubScraper):
         self.progress.start()
 
         # Spawn the threads (one for each GitHub token)
+        self._start_feeding()
         for token in self.token_list:
-            g = Github(token)
+            g = self._get_github_client(token)
             threading.Thread(target=self._decide_on_repo, args=(g,)).start()
 
         # Block until all items in the queue have been gotten and processed
-        self.queue.join()
+        self._join_queue()
 
         # Stop progress bar
         self.progress.stop()
@@ -293,6 +439,21 @@ class DataScienceScraper(GitHubScraper):
 class WorkflowScraper(GitHubScraper):
     """Scraper for GitHub repositories with Actions workflows.
 
+    Workflows are saved as YAML files in `data_dir/<owner>/<repository>/`, or
+    appended to `archive` when a `WorkflowArchive` is given.
+
+    When a `workflow_sink` queue is given, the `(slug, [(key, yaml_text)])`
+    workflows of each repository (including the ones downloaded by a
+    previous run) are also put in it as soon as the repository is done.
+
+    The definitions of the local actions used by the workflows are downloaded
+    too, and stored under their path in the repository (e.g.,
+    `<owner>/<repository>/.github/actions/setup/action.yml`), so that local
+    composite actions can be resolved offline (see `references.py`).
+
+    Repositories downloaded by a previous run are read back from the disk
+    (or the archive) without any API call.
+
     Extends: GitHubScraper
     """
 
@@ -303,8 +464,19 @@ class WorkflowScraper(GitHubScraper):
         dumps_dir: Path,
         data_dir: Path,
         slugs: list[GitHubSlug],
+        archive: Optional[WorkflowArchive] = None,
+        workflow_sink: Optional[queue.Queue] = None,
+        max_queued_slugs: int = 0,
+        record_outcomes: bool = False,
     ) -> None:
-        super().__init__(experiment_settings, token_list, dumps_dir, slugs)
+        super().__init__(
+            experiment_settings,
+            token_list,
+            dumps_dir,
+            slugs,
+            max_queued_slugs,
+            record_outcomes,
+        )
 
         # Initialize scraping stats
         self.scraping_stats.update(
@@ -314,6 +486,7 @@ class WorkflowScraper(GitHubScraper):
                 "total_number_of_workflows": 0,
                 "total_number_of_valid_workflows": 0,  # Valid YAML file
                 "total_number_of_invalid_workflows": 0,  # Invalid YAML file
+                "total_number_of_local_actions": 0,  # Downloaded definitions
             }
         )
 
@@ -325,6 +498,12 @@ class WorkflowScraper(GitHubScraper):
         else:
             self.data_dir = data_dir
 
+        # Set up the (optional) packed corpus
+        self.archive: Optional[WorkflowArchive] = archive
+
+        # Set up the (optional) queue of downloaded workflows
+        self.workflow_sink: Optional[queue.Queue] = workflow_sink
+
         # Initialize progress bar
         self.progress: Progress = Progress(
             "[progress.description]{task.description}",
@@ -378,14 +557,35 @@ class WorkflowScraper(GitHubScraper):
 
             try:
 
+                # Repos downloaded by a previous run (e.g., on a sample of the
+                # slugs) are not queried again
+                local_repo_path = Path(self.data_dir, slug.repo_owner, slug.repo_name)
+                if self.archive is not None:
+                    already_downloaded = self.archive.has_repo(slug)
+                else:
+                    already_downloaded = local_repo_path.exists()
+
                 # Check GitHub API rate limit: wait if needed
-                self._check_rate_limit(github)
+                if not already_downloaded:
+                    self._check_rate_limit(github)
 
                 try:
-                    repo = github.get_repo(str(slug))
+                    if already_downloaded:
+                        self.selected_slugs.append(slug)
+                        self.progress.console.log(
+                            "Target directory already exists. Download canceled.",
+                        )
+                        local_workflows = self._read_local_workflows(slug)
+                        self._record_workflow_outcome(slug, local_workflows)
+                        self._hand_over(slug, local_workflows)
+                        continue
+
+                    with metrics.timer("github.get_repo"):
+                        repo = github.get_repo(str(slug))
 
                     try:
-                        workflows = repo.get_contents(".github/workflows")
+                        with metrics.timer("github.get_contents"):
+                            workflows = repo.get_contents(".github/workflows")
 
                         # Update scraping stats
                         self.selected_slugs.append(slug)
@@ -394,72 +594,79 @@ class WorkflowScraper(GitHubScraper):
                         self.progress.console.log(
                             f':down_arrow: Downloading workflows from "{slug}"...',
                         )
-                        local_repo_path = Path(
-                            self.data_dir, slug.repo_owner, slug.repo_name
-                        )
-                        if not local_repo_path.exists():
+                        if self.archive is None:
                             local_repo_path.mkdir(parents=True)
 
-                            number_of_workflows_in_current_repo = 0
-                            for workflow in workflows:
-
-                                workflow_path = Path(workflow.path)
-                                if workflow_path.suffix in [".yml", ".yaml"]:
-
+                        downloaded_workflows = []
+                        local_actions: list[str] = []
+                        number_of_workflows_in_current_repo = 0
+                        for workflow in workflows:
+
+                            workflow_path = Path(workflow.path)
+                            if workflow_path.suffix in [".yml", ".yaml"]:
+
+                                self.scraping_stats["total_number_of_workflows"] += 1
+                                number_of_workflows_in_current_repo += 1
+
+                                try:
+                                    workflow_filename = workflow_path.name
+                                    local_workflow_path = (
+                                        local_repo_path / workflow_filename
+                                    )
+                                    with metrics.timer("github.download_workflow"):
+                                        content = workflow.decoded_content
+                                    yaml_string = content.decode("utf8")
+                                    with metrics.timer("scraper.yaml_load"):
+                                        yaml_object = yaml_parser.load(yaml_string)
+                                    local_actions += local_action_paths(yaml_object)
+                                    stream = StringIO()
+                                    yaml_parser.dump(yaml_object, stream)
+                                    yaml_text = stream.getvalue()
+                                    key = f"{slug}/{workflow_filename}"
+                                    if self.archive is not None:
+                                        self.archive.append(key, yaml_text)
+                                    else:
+                                        local_workflow_path.write_text(
+                                            yaml_text, encoding="utf8"
+                                        )
+                                    downloaded_workflows.append((key, yaml_text))
+                                    self.scraping_stats[
+                                        "total_number_of_valid_workflows"
+                                    ] += 1
+                                except Exception as e:
                                     self.scraping_stats[
-                                        "total_number_of_workflows"
+                                        "total_number_of_invalid_workflows"
                                     ] += 1
-                                    number_of_workflows_in_current_repo += 1
+                                    self.progress.console.log(
+                                        f':cross_mark: Invalid YAML file: \
+                                            "{workflow_filename}".\
+                                                Exception: "{repr(e)}"',
+                                    )
+                        if number_of_workflows_in_current_repo > 0:
+                            self.scraping_stats["repos_with_at_least_one_workflow"] += 1
+                        self._download_local_actions(repo, slug, local_actions)
 
-                                    try:
-                                        workflow_filename = workflow_path.name
-                                        local_workflow_path = (
-                                            local_repo_path / workflow_filename
-                                        )
-                                        yaml_string = workflow.decoded_content.decode(
-                                            "utf8"
-                                        )
-                                        yaml_object = yaml_parser.load(yaml_string)
-                                        yaml_parser.dump(
-                                            yaml_object, local_workflow_path
-                                        )
-                                        self.scraping_stats[
-                                            "total_number_of_valid_workflows"
-                                        ] += 1
-                                    except Exception as e:
-                                        self.scraping_stats[
-                                            "total_number_of_invalid_workflows"
-                                        ] += 1
-                                        self.progress.console.log(
-                                            f':cross_mark: Invalid YAML file: \
-                                                "{workflow_filename}".\
-                                                    Exception: "{repr(e)}"',
-                                        )
-                            if number_of_workflows_in_current_repo > 0:
-                                self.scraping_stats[
-                                    "repos_with_at_least_one_workflow"
-                                ] += 1
-
-                            self.progress.console.log(
-                                f':thumbs_up: Downloaded workflows from "{slug}".',
-                            )
-                        else:
-                            self.progress.console.log(
-                                "Target directory already exists. Download canceled.",
-                            )
+                        self.progress.console.log(
+                            f':thumbs_up: Downloaded workflows from "{slug}".',
+                        )
+                        self._record_workflow_outcome(slug, downloaded_workflows)
+                        self._hand_over(slug, downloaded_workflows)
 
                     except UnknownObjectException:
+                        self._record_outcome(slug, found=True, has_workflows=False)
                         self.progress.console.log(
                             f'No workflows found in "{slug}". Skipping...',
                         )
 
                 except UnknownObjectException:
                     self.scraping_stats["repos_not_found"] += 1
+                    self._record_outcome(slug, found=False, has_workflows=False)
                     self.progress.console.log(
                         f':cross_mark: Repository not found: "{slug}".',
                     )
                 except Exception:
                     self.scraping_stats["repos_not_found"] += 1
+                    self._record_outcome(slug, found=False, has_workflows=False)
                     self.progress.console.log(
                         f':cross_mark: Error while accessing the repo: "{slug}".',
                     )
@@ -482,6 +689,77 @@ class WorkflowScraper(GitHubScraper):
             finally:
                 self.queue.task_done()
 
+    def _download_local_actions(
+        self, repo, slug: GitHubSlug, directories: list[str]
+    ) -> None:
+        """Download the definitions of local actions, and of the ones they use."""
+        pending = list(dict.fromkeys(directories))
+        seen = set(pending)
+        while pending:
+            directory = pending.pop(0)
+            for filename in ReferenceResolver.ACTION_FILENAMES:
+                try:
+                    with metrics.timer("github.download_action"):
+                        content = repo.get_contents(f"{directory}/{filename}")
+                except GithubException:
+                    # Missing, or e.g. too large for the contents API
+                    continue
+                if isinstance(content, list):
+                    # A directory
+                    continue
+                text = content.decoded_content.decode("utf8")
+                key = f"{slug}/{directory}/{filename}"
+                if self.archive is not None:
+                    self.archive.append(key, text)
+                else:
+                    action_path = Path(self.data_dir, key)
+                    action_path.parent.mkdir(parents=True, exist_ok=True)
+                    action_path.write_text(text, encoding="utf8")
+                self.scraping_stats["total_number_of_local_actions"] += 1
+
+                # Composite actions can use other local actions
+                try:
+                    nested = local_action_paths(YAML(typ="safe").load(text))
+                except Exception:
+                    nested = []
+                for nested_directory in nested:
+                    if nested_directory not in seen:
+                        seen.add(nested_directory)
+                        pending.append(nested_directory)
+                break
+
+    def _record_workflow_outcome(
+        self, slug: GitHubSlug, workflows: list[tuple[str, str]]
+    ) -> None:
+        if self.record_outcomes:
+            self._record_outcome(
+                slug,
+                found=True,
+                has_workflows=len(workflows) > 0,
+                **workflow_indicators(text for _, text in workflows),
+            )
+
+    def _hand_over(self, slug: GitHubSlug, workflows: list[tuple[str, str]]) -> None:
+        """Put the workflows of a repo in the sink (blocks while it is full)."""
+        if self.workflow_sink is not None:
+            self.workflow_sink.put((slug, workflows))
+
+    def _read_local_workflows(self, slug: GitHubSlug) -> list[tuple[str, str]]:
+        """Return the workflows of a repo downloaded by a previous run."""
+        if self.workflow_sink is None and not self.record_outcomes:
+            return []
+        if self.archive is not None:
+            return [
+                (key, self.archive.read_text(key))
+                for key in self.archive.repo_keys(slug)
+                if is_workflow_key(key)
+            ]
+        local_repo_path = Path(self.data_dir, slug.repo_owner, slug.repo_name)
+        return [
+            (f"{slug}/{path.name}", path.read_text(encoding="utf8"))
+            for path in sorted(local_repo_path.glob("*.y*ml"))
+        ]
+
     def scrape_repos(self) -> list[GitHubSlug]:
         """Scrape GitHub repos.
 
@@ -496,12 +774,13 @@ class WorkflowScraper(GitHubScraper):
         self.progress.start()
 
         # Spawn the threads (one for each GitHub token)
+        self._start_feeding()
         for token in self.token_list:
-            g = Github(token)
+            g = self._get_github_client(token)
             threading.Thread(target=self._download_repo_workflows, args=(g,)).start()
 
         # Block until all items in the queue have been gotten and processed
-        self.queue.join()
+        self._join_queue()
 
         # Stop progress bar
         self.progress.stop()
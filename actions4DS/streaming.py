@@ -0,0 +1,164 @@
+"""
+Bounded-memory tracking of frequent items and small itemsets over a stream.
+
+`WorkflowAnalyzer._mine_frequent_patterns()` runs apriori on the whole list of
+transactions. While the scraper keeps adding repositories, `LossyCounter`
+keeps an up-to-date summary instead, with the Lossy Counting algorithm (Manku
+and Motwani, 2002) applied to the itemsets of up to `max_itemset_size` items
+of each transaction (e.g., the untagged actions of a workflow):
+
+- each transaction updates the counts of its itemsets, i.e. O(m) work for the
+  single items of a transaction of m items (O(m^2) with pairs);
+- every `ceil(1 / epsilon)` transactions, the itemsets whose count (plus its
+  maximum error) is too low are dropped, which bounds the memory to
+  O(C / epsilon * log(epsilon * N)) entries after N transactions, where C is
+  the number of itemsets per transaction;
+- the count of an itemset is underestimated by at most `epsilon * N`, so
+  querying with a minimum support `s` returns every itemset whose support is
+  at least `s`, and none whose support is below `s - epsilon`.
+
+The summary can be checkpointed to disk, resumed, and queried at any time:
+
+    python actions4DS/streaming.py path/to/frequent_items_actions_noTags.npz
+"""
+
+import argparse
+import json
+import math
+from itertools import combinations
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+
+class LossyCounter:
+    """Lossy Counting of the itemsets of up to `max_itemset_size` items.
+
+    Args:
+        epsilon: maximum error on the support of the itemsets
+        max_itemset_size: size of the largest itemsets tracked
+    """
+
+    def __init__(self, epsilon: float = 0.005, max_itemset_size: int = 2) -> None:
+        self.epsilon = epsilon
+        self.max_itemset_size = max_itemset_size
+        self.bucket_width = math.ceil(1 / epsilon)
+        self.n_of_transactions = 0
+        # Itemset (sorted tuple) -> [count, maximum undercount]
+        self.entries: dict[tuple[str, ...], list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return (
+            f"LossyCounter(epsilon={self.epsilon}, {len(self)} entries, "
+            f"{self.n_of_transactions} transactions)"
+        )
+
+    def add(self, items: Iterable[str]) -> None:
+        """Count the itemsets of a transaction (repeated items count once)."""
+        transaction = sorted(set(items))
+        self.n_of_transactions += 1
+        bucket = math.ceil(self.n_of_transactions / self.bucket_width)
+        for size in range(1, min(self.max_itemset_size, len(transaction)) + 1):
+            for itemset in combinations(transaction, size):
+                entry = self.entries.get(itemset)
+                if entry is None:
+                    self.entries[itemset] = [1, bucket - 1]
+                else:
+                    entry[0] += 1
+        if self.n_of_transactions % self.bucket_width == 0:
+            self._prune(bucket)
+
+    def _prune(self, bucket: int) -> None:
+        self.entries = {
+            itemset: entry
+            for itemset, entry in self.entries.items()
+            if entry[0] + entry[1] > bucket
+        }
+
+    def frequent_itemsets(self, support: float) -> pd.DataFrame:
+        """Itemsets with a support of at least `support` (within `epsilon`).
+
+        Same columns as the output of apriori, plus `max_support`: the true
+        support of each itemset is between `support` and `max_support`.
+        """
+        threshold = (support - self.epsilon) * self.n_of_transactions
+        n_of_transactions = max(self.n_of_transactions, 1)
+        records = [
+            {
+                "support": count / n_of_transactions,
+                "max_support": (count + error) / n_of_transactions,
+                "itemsets": frozenset(itemset),
+                "length": len(itemset),
+            }
+            for itemset, (count, error) in self.entries.items()
+            if count >= threshold and count > 0
+        ]
+        return (
+            pd.DataFrame.from_records(
+                records, columns=["support", "max_support", "itemsets", "length"]
+            )
+            .sort_values(["length", "support"], ascending=[True, False])
+            .reset_index(drop=True)
+        )
+
+    # ----------- #
+    # PERSISTENCE #
+    # ----------- #
+
+    def save(self, path: Path) -> None:
+        """Checkpoint the summary as a compressed `.npz` file.
+
+        The file is replaced atomically, so it can be queried while the
+        ingestion goes on.
+        """
+        itemsets = list(self.entries)
+        counts = np.array(
+            [self.entries[itemset] for itemset in itemsets], dtype=np.int64
+        ).reshape(-1, 2)
+        metadata = {
+            "epsilon": self.epsilon,
+            "max_itemset_size": self.max_itemset_size,
+            "n_of_transactions": self.n_of_transactions,
+            "itemsets": itemsets,
+        }
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as checkpoint_file:
+            np.savez_compressed(
+                checkpoint_file,
+                counts=counts,
+                metadata=np.frombuffer(
+                    json.dumps(metadata).encode("utf8"), dtype=np.uint8
+                ),
+            )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "LossyCounter":
+        with np.load(path) as arrays:
+            metadata = json.loads(arrays["metadata"].tobytes().decode("utf8"))
+            counts = arrays["counts"].tolist()
+        counter = cls(metadata["epsilon"], metadata["max_itemset_size"])
+        counter.n_of_transactions = metadata["n_of_transactions"]
+        counter.entries = {
+            tuple(itemset): entry
+            for itemset, entry in zip(metadata["itemsets"], counts)
+        }
+        return counter
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Query a checkpoint of the streaming frequent itemsets."
+    )
+    parser.add_argument("checkpoint", type=Path, help="e.g. frequent_items.npz")
+    parser.add_argument("--support", type=float, default=0.05)
+    args = parser.parse_args()
+
+    counter = LossyCounter.load(args.checkpoint)
+    print(counter)
+    print(counter.frequent_itemsets(args.support).to_string())
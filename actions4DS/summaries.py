@@ -0,0 +1,306 @@
+"""
+Materialized summary tables of the analyzed workflows.
+
+The notebooks only need a handful of aggregates (usage of each action, usage by
+marketplace category and by verified creator, distribution of the docker
+commands, trigger events, corpus totals). `SummaryTables` keeps them as
+counters of the contributions of the workflows. `WorkflowAnalyzer` builds them
+from all its workflows, while the pipelined run adds each workflow as soon as
+it is parsed. The contribution of a workflow can also be subtracted, and the
+summaries of separately analyzed batches merged, without the workflows.
+
+The counters are saved as a compressed `.npz` file (one array of counts per
+counter, keys as UTF-8 JSON), from which the tables are rebuilt in
+milliseconds. The counters keyed by repository (number of repositories, and
+repositories using each action) are exact, so that workflows can be
+subtracted: the file grows linearly with the corpus, by about 75 bytes per
+repository (20 KB for 200 repositories, 150 KB for 2,000, on the synthetic
+corpus of the benchmarks).
+
+    python actions4DS/summaries.py path/to/dumps/summary_tables.npz
+    python actions4DS/summaries.py batch_1.npz --merge batch_2.npz batch_3.npz
+"""
+
+import argparse
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+# Keys of the counters are tuples of strings
+COUNTERS = (
+    "totals",
+    "repository.workflows",
+    "action.occurrences",
+    "action.workflows",
+    "action.repository_workflows",
+    "category.occurrences",
+    "marketplace.occurrences",
+    "docker.occurrences",
+    "docker.workflows",
+    "event.workflows",
+)
+
+
+class SummaryTables:
+    """Mergeable counters behind the summary tables of the corpus."""
+
+    TABLES = (
+        "totals",
+        "action_usage",
+        "category_usage",
+        "marketplace_usage",
+        "docker_commands",
+        "trigger_events",
+    )
+
+    def __init__(self) -> None:
+        self.counters: dict[str, Counter] = {name: Counter() for name in COUNTERS}
+
+    def __repr__(self) -> str:
+        return f"SummaryTables({self.counters['totals'][('workflows',)]} workflows)"
+
+    @classmethod
+    def from_workflows(cls, workflows: Iterable) -> "SummaryTables":
+        summaries = cls()
+        for workflow in workflows:
+            summaries.add_workflow(workflow)
+        return summaries
+
+    # ----------- #
+    # MAINTENANCE #
+    # ----------- #
+
+    def add_workflow(self, workflow) -> None:
+        for name, counter in self._contribution(workflow).items():
+            self.counters[name].update(counter)
+
+    def remove_workflow(self, workflow) -> None:
+        """Subtract the contribution of a workflow added before."""
+        for name, counter in self._contribution(workflow).items():
+            # In-place subtraction also drops the keys whose count reaches 0
+            self.counters[name] -= counter
+
+    def merge(self, other: "SummaryTables") -> None:
+        """Add the counters of summaries of another set of workflows."""
+        for name, counter in other.counters.items():
+            self.counters[name].update(counter)
+
+    @staticmethod
+    def _contribution(workflow) -> dict[str, Counter]:
+        """The counts of a single `Workflow`."""
+        repository = str(workflow.repository)
+        actions = workflow.actions
+        contribution = {name: Counter() for name in COUNTERS}
+        contribution["totals"].update(
+            {
+                ("workflows",): 1,
+                ("action_occurrences",): len(actions),
+                ("run_commands",): workflow.n_of_run_commands,
+                ("workflows_with_docker_commands",): int(
+                    bool(workflow.docker_commands)
+                ),
+            }
+        )
+        contribution["repository.workflows"][(repository,)] += 1
+
+        for action in actions:
+            contribution["action.occurrences"][(action.slug_without_tag,)] += 1
+            for category in action.categories or ():
+                contribution["category.occurrences"][(category,)] += 1
+            contribution["marketplace.occurrences"][
+                (
+                    str(action.available_in_marketplace),
+                    str(bool(action.is_from_verified_creator)),
+                )
+            ] += 1
+        for slug in {action.slug_without_tag for action in actions}:
+            contribution["action.workflows"][(slug,)] += 1
+            contribution["action.repository_workflows"][(slug, repository)] += 1
+
+        for command, count in workflow.docker_commands.items():
+            contribution["docker.occurrences"][(command,)] += count
+            contribution["docker.workflows"][(command,)] += 1
+        for event in set(workflow.events):
+            contribution["event.workflows"][(event,)] += 1
+        return contribution
+
+    # ------ #
+    # TABLES #
+    # ------ #
+
+    def tables(self) -> dict[str, pd.DataFrame]:
+        """Build all the summary tables."""
+        return {name: self.table(name) for name in self.TABLES}
+
+    def table(self, name: str) -> pd.DataFrame:
+        if name not in self.TABLES:
+            raise ValueError(f"Unknown summary table: {name}.")
+        return getattr(self, f"_{name}_table")()
+
+    def _totals_table(self) -> pd.DataFrame:
+        totals = {key[0]: count for key, count in self.counters["totals"].items()}
+        totals["repositories"] = len(self.counters["repository.workflows"])
+        return pd.DataFrame(
+            {"metric": list(totals), "value": list(totals.values())}
+        ).sort_values("metric", ignore_index=True)
+
+    def _action_usage_table(self) -> pd.DataFrame:
+        repositories = Counter(
+            slug for slug, _ in self.counters["action.repository_workflows"]
+        )
+        workflows = self.counters["action.workflows"]
+        records = [
+            {
+                "action_slug_noTag": slug,
+                "occurrences": occurrences,
+                "workflows": workflows[(slug,)],
+                "repositories": repositories[slug],
+            }
+            for (slug,), occurrences in self.counters["action.occurrences"].items()
+        ]
+        return self._sorted_frame(
+            records,
+            ["action_slug_noTag", "occurrences", "workflows", "repositories"],
+            "occurrences",
+        )
+
+    def _category_usage_table(self) -> pd.DataFrame:
+        table = self._sorted_frame(
+            [
+                {"category": category, "occurrences": occurrences}
+                for (category,), occurrences in self.counters[
+                    "category.occurrences"
+                ].items()
+            ],
+            ["category", "occurrences"],
+            "occurrences",
+        )
+        table["share"] = table["occurrences"] / max(
+            self._total("action_occurrences"), 1
+        )
+        return table
+
+    def _marketplace_usage_table(self) -> pd.DataFrame:
+        table = self._sorted_frame(
+            [
+                {
+                    "available_in_marketplace": available == "True",
+                    "from_verified_creator": verified == "True",
+                    "occurrences": occurrences,
+                }
+                for (available, verified), occurrences in self.counters[
+                    "marketplace.occurrences"
+                ].items()
+            ],
+            ["available_in_marketplace", "from_verified_creator", "occurrences"],
+            "occurrences",
+        )
+        table["share"] = table["occurrences"] / max(
+            self._total("action_occurrences"), 1
+        )
+        return table
+
+    def _docker_commands_table(self) -> pd.DataFrame:
+        workflows = self.counters["docker.workflows"]
+        return self._sorted_frame(
+            [
+                {
+                    "docker_command": command,
+                    "occurrences": occurrences,
+                    "workflows": workflows[(command,)],
+                }
+                for (command,), occurrences in self.counters[
+                    "docker.occurrences"
+                ].items()
+            ],
+            ["docker_command", "occurrences", "workflows"],
+            "occurrences",
+        )
+
+    def _trigger_events_table(self) -> pd.DataFrame:
+        table = self._sorted_frame(
+            [
+                {"event": event, "workflows": workflows}
+                for (event,), workflows in self.counters["event.workflows"].items()
+            ],
+            ["event", "workflows"],
+            "workflows",
+        )
+        table["share"] = table["workflows"] / max(self._total("workflows"), 1)
+        return table
+
+    def _total(self, metric: str) -> int:
+        return self.counters["totals"][(metric,)]
+
+    @staticmethod
+    def _sorted_frame(
+        records: list[dict], columns: list[str], count_column: str
+    ) -> pd.DataFrame:
+        return (
+            pd.DataFrame.from_records(records, columns=columns)
+            .sort_values([count_column, columns[0]], ascending=[False, True])
+            .reset_index(drop=True)
+        )
+
+    # ----------- #
+    # PERSISTENCE #
+    # ----------- #
+
+    def save(self, path: Path) -> None:
+        """Save the counters as a compressed `.npz` file."""
+        arrays: dict[str, np.ndarray] = {}
+        keys: dict[str, list[list[str]]] = {}
+        for name, counter in self.counters.items():
+            keys[name] = [list(key) for key in counter]
+            arrays[f"{name}.counts"] = np.fromiter(
+                counter.values(), dtype=np.int64, count=len(counter)
+            )
+        arrays["metadata"] = np.frombuffer(
+            json.dumps({"keys": keys}).encode("utf8"), dtype=np.uint8
+        )
+        with open(path, "wb") as summaries_file:
+            np.savez_compressed(summaries_file, **arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> "SummaryTables":
+        summaries = cls()
+        with np.load(path) as arrays:
+            metadata = json.loads(arrays["metadata"].tobytes().decode("utf8"))
+            for name, keys in metadata["keys"].items():
+                counts = arrays[f"{name}.counts"].tolist()
+                summaries.counters[name] = Counter(
+                    {tuple(key): count for key, count in zip(keys, counts)}
+                )
+        return summaries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Print the summary tables saved by analyze_workflows.py."
+    )
+    parser.add_argument("summaries", type=Path, help="e.g. summary_tables.npz")
+    parser.add_argument(
+        "--table", choices=SummaryTables.TABLES, default=None, help="defaults to all"
+    )
+    parser.add_argument("--top", type=int, default=20, help="rows to print")
+    parser.add_argument(
+        "--merge",
+        type=Path,
+        nargs="+",
+        default=[],
+        help="summaries of other batches, merged into (and saved to) the first",
+    )
+    args = parser.parse_args()
+
+    summaries = SummaryTables.load(args.summaries)
+    if args.merge:
+        for other_path in args.merge:
+            summaries.merge(SummaryTables.load(other_path))
+        summaries.save(args.summaries)
+    for name in [args.table] if args.table else SummaryTables.TABLES:
+        print(f"{name.upper()}")
+        print(summaries.table(name).head(args.top).to_string(), end="\n\n")
@@ -0,0 +1,249 @@
+"""
+Inverted indexes over the analyzed workflows, and a small query language.
+
+For each field (tagged action slug, untagged action slug, docker subcommand,
+triggering event) the index maps each term to the sorted array of the ids of
+the workflows containing it. Workflow ids are the positions of the workflows
+in `WorkflowAnalyzer.workflows` (i.e., the rows of `workflows_df`).
+
+Queries combine `field:term` lookups with `AND`, `OR`, `NOT` and parentheses
+(`AND` binds tighter than `OR`):
+
+    action_noTag:iterative/setup-cml AND docker:build
+    event:schedule OR (event:push AND NOT event:pull_request)
+
+From the command line:
+
+    python actions4DS/workflow_index.py "event:schedule" --repos
+"""
+
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+ID_DTYPE = np.uint32
+
+
+class WorkflowIndex:
+    """Inverted indexes from terms to sorted arrays of workflow ids."""
+
+    FIELDS = ("action", "action_noTag", "docker", "event")
+    TOKEN_REGEX = re.compile(r'\s*(\(|\)|[\w-]+:"[^"]*"|[^\s()]+)')
+
+    def __init__(
+        self, workflow_names: list[str], postings: dict[str, dict[str, np.ndarray]]
+    ) -> None:
+        self.workflow_names: list[str] = workflow_names
+        self.postings: dict[str, dict[str, np.ndarray]] = postings
+
+    def __len__(self) -> int:
+        return len(self.workflow_names)
+
+    def __repr__(self) -> str:
+        return f"WorkflowIndex({len(self)} workflows)"
+
+    @classmethod
+    def from_workflows(cls, workflows: Iterable) -> "WorkflowIndex":
+        """Build the indexes in a single pass over `Workflow` objects."""
+        workflow_names = []
+        lists: dict[str, dict[str, list[int]]] = {field: {} for field in cls.FIELDS}
+        for workflow_id, workflow in enumerate(workflows):
+            workflow_names.append(str(workflow))
+            actions = workflow.actions
+            terms = {
+                "action": {action.slug for action in actions},
+                "action_noTag": {action.slug_without_tag for action in actions},
+                "docker": set(workflow.docker_commands),
+                "event": set(workflow.events),
+            }
+            for field, field_terms in terms.items():
+                field_lists = lists[field]
+                for term in field_terms:
+                    field_lists.setdefault(term, []).append(workflow_id)
+
+        # Ids are appended in increasing order: the arrays are already sorted
+        postings = {
+            field: {term: np.array(ids, dtype=ID_DTYPE) for term, ids in terms.items()}
+            for field, terms in lists.items()
+        }
+        return cls(workflow_names, postings)
+
+    # ------- #
+    # LOOKUPS #
+    # ------- #
+
+    def lookup(self, field: str, term: str) -> np.ndarray:
+        """Return the sorted ids of the workflows where `term` appears."""
+        if field not in self.postings:
+            raise ValueError(
+                f'Unknown field "{field}". Available fields: {", ".join(self.FIELDS)}.'
+            )
+        return self.postings[field].get(term, np.empty(0, dtype=ID_DTYPE))
+
+    def all_of(self, *terms: str) -> np.ndarray:
+        """Ids of the workflows matching every `field:term`."""
+        ids_list = sorted((self._lookup_term(t) for t in terms), key=len)
+        if not ids_list:
+            return self._all_ids()
+        result = ids_list[0]
+        for ids in ids_list[1:]:
+            result = np.intersect1d(result, ids, assume_unique=True)
+        return result
+
+    def any_of(self, *terms: str) -> np.ndarray:
+        """Ids of the workflows matching at least one `field:term`."""
+        if not terms:
+            return np.empty(0, dtype=ID_DTYPE)
+        return np.unique(np.concatenate([self._lookup_term(t) for t in terms]))
+
+    def query(self, expression: str) -> np.ndarray:
+        """Evaluate a boolean query and return the matching workflow ids."""
+        tokens = self.TOKEN_REGEX.findall(expression)
+        ids, position = self._parse_or(tokens, 0)
+        if position != len(tokens):
+            raise ValueError(f'Unexpected token "{tokens[position]}" in query.')
+        return ids
+
+    def workflows(self, ids: np.ndarray) -> list[str]:
+        return [self.workflow_names[i] for i in ids]
+
+    def repositories(self, ids: np.ndarray) -> list[str]:
+        """Distinct repository slugs of the given workflows, sorted."""
+        return sorted({self.workflow_names[i].rsplit("/", 1)[0] for i in ids})
+
+    def terms(self, field: str) -> dict[str, int]:
+        """Number of workflows for each term of `field`, most frequent first."""
+        counts = {term: len(ids) for term, ids in self.postings[field].items()}
+        return dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+    def _all_ids(self) -> np.ndarray:
+        return np.arange(len(self), dtype=ID_DTYPE)
+
+    def _lookup_term(self, token: str) -> np.ndarray:
+        field, separator, term = token.partition(":")
+        if not separator:
+            raise ValueError(f'Invalid term "{token}": expected "<field>:<term>".')
+        if '"' in term:
+            if len(term) < 2 or not term.startswith('"') or not term.endswith('"'):
+                raise ValueError(f'Unterminated quote in term "{token}".')
+            term = term[1:-1]
+        return self.lookup(field, term)
+
+    # Recursive-descent parser: or_expr := and_expr ("OR" and_expr)*
+    #                           and_expr := not_expr ("AND" not_expr)*
+    #                           not_expr := "NOT" not_expr | "(" or_expr ")" | term
+
+    def _parse_or(self, tokens: list[str], position: int) -> tuple[np.ndarray, int]:
+        ids, position = self._parse_and(tokens, position)
+        while position < len(tokens) and tokens[position].upper() == "OR":
+            other, position = self._parse_and(tokens, position + 1)
+            ids = np.union1d(ids, other)
+        return ids, position
+
+    def _parse_and(self, tokens: list[str], position: int) -> tuple[np.ndarray, int]:
+        ids, position = self._parse_not(tokens, position)
+        while position < len(tokens) and tokens[position].upper() == "AND":
+            other, position = self._parse_not(tokens, position + 1)
+            ids = np.intersect1d(ids, other, assume_unique=True)
+        return ids, position
+
+    def _parse_not(self, tokens: list[str], position: int) -> tuple[np.ndarray, int]:
+        if position >= len(tokens):
+            raise ValueError("Unexpected end of query.")
+        token = tokens[position]
+        if token.upper() == "NOT":
+            ids, position = self._parse_not(tokens, position + 1)
+            return np.setdiff1d(self._all_ids(), ids, assume_unique=True), position
+        if token == "(":
+            ids, position = self._parse_or(tokens, position + 1)
+            if position >= len(tokens) or tokens[position] != ")":
+                raise ValueError("Unbalanced parentheses in query.")
+            return ids, position + 1
+        if token == ")" or token.upper() in ("AND", "OR"):
+            raise ValueError(f'Unexpected token "{token}" in query.')
+        return self._lookup_term(token), position + 1
+
+    # ----------- #
+    # PERSISTENCE #
+    # ----------- #
+
+    def save(self, path: Path) -> None:
+        """Save the index as a compressed `.npz` file.
+
+        Each field is stored as the concatenation of its postings plus an
+        array of offsets; terms and workflow names are stored as UTF-8 JSON.
+        """
+        arrays: dict[str, np.ndarray] = {}
+        vocabulary: dict[str, list[str]] = {}
+        for field, field_postings in self.postings.items():
+            terms = list(field_postings)
+            lengths = [len(field_postings[term]) for term in terms]
+            vocabulary[field] = terms
+            arrays[f"{field}.offsets"] = np.concatenate(
+                [[0], np.cumsum(lengths, dtype=np.int64)]
+            ).astype(np.int64)
+            arrays[f"{field}.ids"] = (
+                np.concatenate([field_postings[term] for term in terms])
+                if terms
+                else np.empty(0, dtype=ID_DTYPE)
+            )
+        metadata = {"workflow_names": self.workflow_names, "terms": vocabulary}
+        arrays["metadata"] = np.frombuffer(
+            json.dumps(metadata).encode("utf8"), dtype=np.uint8
+        )
+        with open(path, "wb") as index_file:
+            np.savez_compressed(index_file, **arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> "WorkflowIndex":
+        with np.load(path) as arrays:
+            metadata = json.loads(arrays["metadata"].tobytes().decode("utf8"))
+            postings = {}
+            for field, terms in metadata["terms"].items():
+                offsets = arrays[f"{field}.offsets"]
+                ids = arrays[f"{field}.ids"]
+                postings[field] = {
+                    term: ids[offsets[i] : offsets[i + 1]]
+                    for i, term in enumerate(terms)
+                }
+        return cls(metadata["workflow_names"], postings)
+
+
+if __name__ == "__main__":
+    from config import get_settings
+
+    parser = argparse.ArgumentParser(
+        description="Query the workflow index saved by analyze_workflows.py."
+    )
+    parser.add_argument(
+        "query", help='e.g. "action_noTag:actions/checkout AND event:push"'
+    )
+    parser.add_argument(
+        "--index",
+        type=Path,
+        default=None,
+        help="defaults to DUMPS_DIR/workflow_index.npz",
+    )
+    parser.add_argument(
+        "--repos", action="store_true", help="list repositories instead of workflows"
+    )
+    args = parser.parse_args()
+
+    index_path = args.index or get_settings().dumps_dir / "workflow_index.npz"
+    index = WorkflowIndex.load(index_path)
+
+    start = time.perf_counter()
+    try:
+        ids = index.query(args.query)
+    except ValueError as e:
+        parser.error(str(e))
+    results = index.repositories(ids) if args.repos else index.workflows(ids)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print("\n".join(results))
+    print(f"{len(results)} results in {elapsed_ms:.2f} ms.")
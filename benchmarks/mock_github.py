@@ -0,0 +1,399 @@
+"""
+Local stand-in for the GitHub REST API and the GitHub web pages we scrape.
+
+The server answers the handful of endpoints used by the scrapers (repos,
+workflow contents, commits, topics, rate limit) under `/api/v3`, and serves
+repository and marketplace HTML pages at the same paths as `github.com`
+(including the paginated marketplace listing). The HTML pages are rendered
+from the recorded pages in `benchmarks/assets/`.
+Latency and rate limits can be injected, and every request is counted so that
+benchmarks can report requests per repository.
+"""
+
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from string import Template
+from typing import Callable, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+API_PREFIX = "/api/v3"
+ASSETS_DIR = Path(__file__).parent / "assets"
+
+
+def _load_template(filename: str) -> Template:
+    return Template((ASSETS_DIR / filename).read_text())
+
+
+REPO_PAGE = _load_template("repository.html")
+MARKETPLACE_PAGE = _load_template("marketplace_action.html")
+LISTING_PAGE = _load_template("marketplace_listing.html")
+LISTING_CARD = _load_template("marketplace_listing_card.html")
+
+# Number of actions per listing page, as on github.com
+LISTING_PAGE_SIZE = 20
+
+VERIFIED_BADGE = (
+    '<svg aria-label="Verified creator" role="img" height="16" viewBox="0 0 16 16"'
+    ' version="1.1" width="16" class="octicon octicon-verified color-fg-accent">'
+    '<path fill-rule="evenodd" d="M9.585.52a2.678 2.678 0 00-3.17 0l-.928.68a1.178'
+    ' 1.178 0 01-.518.215L3.83 1.59a2.678 2.678 0 00-2.24 2.24z"></path></svg>'
+)
+CATEGORY_LINK = (
+    '<a class="topic-tag topic-tag-link f6" href="/marketplace?category={slug}'
+    '&amp;type=actions">\n  {name}\n</a>'
+)
+MARKETPLACE_LINK = (
+    '<a class="btn btn-sm" href="/marketplace/actions/{name}">View on Marketplace</a>'
+)
+
+
+def _category_slug(category: str) -> str:
+    return category.lower().replace(" ", "-")
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha1(text.encode("utf8")).hexdigest()  # nosec
+
+
+class MockGitHub:
+    """Threaded HTTP server emulating the GitHub API and web pages.
+
+    Args:
+        repo_workflows: maps a repository slug to its `(filename, yaml_text)`
+            workflows; slugs missing from the mapping answer 404
+        repo_files: maps a repository slug to its other files, by path
+            (e.g., `.github/actions/setup/action.yml`)
+        repo_metadata: maps a repository slug to `description` and `topics`
+        marketplace: maps an action slug (without tag) to a dict with
+            `verified` and `categories`; actions missing from the mapping
+            have no marketplace page
+        latency: seconds slept before answering each request
+        rate_limit: number of API requests allowed per `rate_limit_window`
+            seconds (`None` disables rate limiting)
+    """
+
+    def __init__(
+        self,
+        repo_workflows: Optional[dict[str, list[tuple[str, str]]]] = None,
+        repo_files: Optional[dict[str, dict[str, str]]] = None,
+        repo_metadata: Optional[dict[str, dict]] = None,
+        marketplace: Optional[dict[str, dict]] = None,
+        latency: float = 0.0,
+        rate_limit: Optional[int] = None,
+        rate_limit_window: float = 1.0,
+    ) -> None:
+        self.repo_workflows = repo_workflows or {}
+        self.repo_files = repo_files or {}
+        self.repo_metadata = repo_metadata or {}
+        self.marketplace = marketplace or {}
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+
+        self.request_counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._window_start = time.time()
+        self._window_requests = 0
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self) -> str:
+        return self.url + API_PREFIX
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.request_counts.values())
+
+    def start(self) -> "MockGitHub":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.request_counts.clear()
+
+    def __enter__(self) -> "MockGitHub":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    # ------- #
+    # ROUTING #
+    # ------- #
+
+    def _routes(self) -> list[tuple[str, re.Pattern, Callable]]:
+        return [
+            ("rate_limit", re.compile(r"^/rate_limit$"), self._rate_limit),
+            (
+                "contents_file",
+                re.compile(r"^/repos/([^/]+/[^/]+)/contents/\.github/workflows/(.+)$"),
+                self._workflow_file,
+            ),
+            (
+                "contents_dir",
+                re.compile(r"^/repos/([^/]+/[^/]+)/contents/\.github/workflows$"),
+                self._workflow_dir,
+            ),
+            (
+                "contents_other_file",
+                re.compile(r"^/repos/([^/]+/[^/]+)/contents/(.+)$"),
+                self._repo_file,
+            ),
+            ("commits", re.compile(r"^/repos/([^/]+/[^/]+)/commits$"), self._commits),
+            ("topics", re.compile(r"^/repos/([^/]+/[^/]+)/topics$"), self._topics),
+            ("repo", re.compile(r"^/repos/([^/]+/[^/]+)$"), self._repo),
+        ]
+
+    def _dispatch(
+        self, path: str, query: Optional[dict[str, list[str]]] = None
+    ) -> tuple[int, str, str]:
+        """Return `(status, content type, body)` for a GET request."""
+        if path.startswith(API_PREFIX):
+            api_path = path[len(API_PREFIX) :]
+            for name, pattern, handler in self._routes():
+                match = pattern.match(api_path)
+                if match:
+                    self._count(name)
+                    if name != "rate_limit" and not self._consume_rate_limit():
+                        return (
+                            403,
+                            "application/json",
+                            json.dumps({"message": "API rate limit exceeded"}),
+                        )
+                    status, body = handler(*match.groups())
+                    return status, "application/json", json.dumps(body)
+            self._count("api_not_found")
+            return 404, "application/json", json.dumps({"message": "Not Found"})
+
+        if path == "/marketplace":
+            self._count("marketplace_listing")
+            return self._marketplace_listing(query or {})
+        match = re.match(r"^/marketplace/actions/([^/]+)$", path)
+        if match:
+            self._count("marketplace_page")
+            return self._marketplace_page(match.group(1))
+        match = re.match(r"^/([^/]+/[^/]+)$", path)
+        if match:
+            self._count("repo_page")
+            return self._repo_page(match.group(1))
+        self._count("web_not_found")
+        return 404, "text/html", "Not Found"
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.request_counts[name] += 1
+
+    def _consume_rate_limit(self) -> bool:
+        if self.rate_limit is None:
+            return True
+        with self._lock:
+            self._roll_window()
+            if self._window_requests >= self.rate_limit:
+                return False
+            self._window_requests += 1
+            return True
+
+    def _roll_window(self) -> None:
+        if time.time() - self._window_start >= self.rate_limit_window:
+            self._window_start = time.time()
+            self._window_requests = 0
+
+    # --------- #
+    # ENDPOINTS #
+    # --------- #
+
+    def _rate_limit(self) -> tuple[int, dict]:
+        limit = self.rate_limit if self.rate_limit is not None else 5000
+        with self._lock:
+            self._roll_window()
+            remaining = limit - self._window_requests if self.rate_limit else limit
+            reset = int(self._window_start + self.rate_limit_window)
+        rate = {"limit": limit, "remaining": remaining, "reset": reset}
+        return 200, {"resources": {"core": rate, "search": rate}, "rate": rate}
+
+    def _repo_json(self, slug: str) -> dict:
+        owner, name = slug.split("/")
+        metadata = self.repo_metadata.get(slug, {})
+        return {
+            "id": int(_sha(slug)[:8], 16),
+            "name": name,
+            "full_name": slug,
+            "owner": {"login": owner},
+            "description": metadata.get("description", ""),
+            "url": f"{self.api_url}/repos/{slug}",
+        }
+
+    def _repo_exists(self, slug: str) -> bool:
+        return slug in self.repo_workflows or slug in self.repo_metadata
+
+    def _repo(self, slug: str) -> tuple[int, dict]:
+        if not self._repo_exists(slug):
+            return 404, {"message": "Not Found"}
+        return 200, self._repo_json(slug)
+
+    def _workflow_dir(self, slug: str) -> tuple[int, object]:
+        if not self.repo_workflows.get(slug):
+            return 404, {"message": "Not Found"}
+        listing = []
+        for filename, text in self.repo_workflows[slug]:
+            path = f".github/workflows/{filename}"
+            listing.append(
+                {
+                    "type": "file",
+                    "name": filename,
+                    "path": path,
+                    "size": len(text),
+                    "sha": _sha(slug + filename),
+                    "url": f"{self.api_url}/repos/{slug}/contents/{path}",
+                }
+            )
+        return 200, listing
+
+    def _workflow_file(self, slug: str, filename: str) -> tuple[int, dict]:
+        for name, text in self.repo_workflows.get(slug, []):
+            if name == unquote(filename):
+                path = f".github/workflows/{name}"
+                return 200, {
+                    "type": "file",
+                    "name": name,
+                    "path": path,
+                    "size": len(text),
+                    "encoding": "base64",
+                    "content": base64.b64encode(text.encode("utf8")).decode("ascii"),
+                    "url": f"{self.api_url}/repos/{slug}/contents/{path}",
+                }
+        return 404, {"message": "Not Found"}
+
+    def _repo_file(self, slug: str, path: str) -> tuple[int, dict]:
+        path = unquote(path)
+        text = self.repo_files.get(slug, {}).get(path)
+        if text is None:
+            return 404, {"message": "Not Found"}
+        return 200, {
+            "type": "file",
+            "name": path.rsplit("/", 1)[-1],
+            "path": path,
+            "size": len(text),
+            "encoding": "base64",
+            "content": base64.b64encode(text.encode("utf8")).decode("ascii"),
+            "url": f"{self.api_url}/repos/{slug}/contents/{path}",
+        }
+
+    def _commits(self, slug: str) -> tuple[int, object]:
+        if not self._repo_exists(slug):
+            return 404, {"message": "Not Found"}
+        date = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        sha = _sha(slug)
+        return 200, [
+            {
+                "sha": sha,
+                "url": f"{self.api_url}/repos/{slug}/commits/{sha}",
+                "commit": {"author": {"date": date}, "committer": {"date": date}},
+            }
+        ]
+
+    def _topics(self, slug: str) -> tuple[int, dict]:
+        if not self._repo_exists(slug):
+            return 404, {"message": "Not Found"}
+        return 200, {"names": self.repo_metadata.get(slug, {}).get("topics", [])}
+
+    def _repo_page(self, slug: str) -> tuple[int, str, str]:
+        link = ""
+        if slug in self.marketplace:
+            link = MARKETPLACE_LINK.format(name=slug.split("/")[1])
+        page = REPO_PAGE.substitute(slug=slug, marketplace_link=link)
+        return 200, "text/html", page
+
+    def _marketplace_page(self, name: str) -> tuple[int, str, str]:
+        for slug, listing in self.marketplace.items():
+            owner, action_name = slug.split("/")
+            if action_name == name:
+                categories = "\n".join(
+                    CATEGORY_LINK.format(slug=_category_slug(c), name=c)
+                    for c in listing.get("categories", [])
+                )
+                page = MARKETPLACE_PAGE.substitute(
+                    name=name,
+                    owner=owner,
+                    slug=slug,
+                    verified_badge=VERIFIED_BADGE if listing.get("verified") else "",
+                    categories=categories,
+                )
+                return 200, "text/html", page
+        return 404, "text/html", "Not Found"
+
+    def _marketplace_listing(self, query: dict[str, list[str]]) -> tuple[int, str, str]:
+        category = query.get("category", [""])[0]
+        page_number = int(query.get("page", ["1"])[0])
+        slugs = [
+            slug
+            for slug, listing in self.marketplace.items()
+            if not category
+            or category in map(_category_slug, listing.get("categories", []))
+        ]
+        start = (page_number - 1) * LISTING_PAGE_SIZE
+        cards = []
+        for slug in slugs[start : start + LISTING_PAGE_SIZE]:
+            owner, name = slug.split("/")
+            verified = self.marketplace[slug].get("verified")
+            cards.append(
+                LISTING_CARD.substitute(
+                    name=name,
+                    owner=owner,
+                    verified_badge=VERIFIED_BADGE if verified else "",
+                )
+            )
+        pagination = ""
+        if start + LISTING_PAGE_SIZE < len(slugs):
+            pagination = (
+                f'<a class="next_page" rel="next" href="/marketplace?category='
+                f'{category}&amp;page={page_number + 1}&amp;type=actions">Next</a>'
+            )
+        page = LISTING_PAGE.substitute(
+            category=category, cards="".join(cards), pagination=pagination
+        )
+        return 200, "text/html", page
+
+    def _make_handler(self) -> type:
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                if mock.latency:
+                    time.sleep(mock.latency)
+                url = urlparse(self.path)
+                status, content_type, body = mock._dispatch(
+                    url.path, parse_qs(url.query)
+                )
+                payload = body.encode("utf8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return Handler
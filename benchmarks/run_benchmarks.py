@@ -0,0 +1,690 @@
+"""
+Benchmark the analyzer and scraper hot paths on synthetic corpora.
+
+Each stage is run against a synthetic workflow corpus (see `synthetic.py`) and,
+for the stages that hit the network, against a local mock of GitHub (see
+`mock_github.py`). For every stage the script reports wall-clock time,
+throughput and peak memory (traced with `tracemalloc` in a separate run, so
+that tracing does not skew the timings).
+
+Results are stored as JSON files in `benchmarks/results/` and compared with
+the previous run to spot regressions:
+
+    python benchmarks/run_benchmarks.py --repos 200 --latency 0.01
+"""
+
+import argparse
+import json
+import random
+import shutil
+import subprocess  # nosec
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from mock_github import MockGitHub
+from rich import print
+from rich.table import Table
+from synthetic import CorpusShape, SyntheticCorpus
+
+BASE_DIR = Path(__file__).parent.parent.absolute()
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Make the `actions4DS` modules importable
+sys.path.insert(0, str(BASE_DIR / "actions4DS"))
+
+
+def measure(stage: Callable[[], dict], repeat: int) -> dict:
+    """Run `stage` `repeat` times (best time wins), then once more traced."""
+    timings = []
+    metrics: dict = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        metrics = stage()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    stage()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = min(timings)
+    result = {"seconds": round(seconds, 4), "peak_memory_mb": round(peak / 2**20, 2)}
+    for name, value in metrics.items():
+        if name.startswith("n_of_"):
+            # Counts become throughputs: n_of_workflows -> workflows_per_s
+            unit = name[len("n_of_") :]
+            result[f"{unit}_per_s"] = round(value / seconds, 2) if seconds else None
+        result[name] = value
+    return result
+
+
+class BenchmarkSuite:
+    """Set up the synthetic corpus and the mock server, then run the stages."""
+
+    STAGES = [
+        "workflow_parsing",
+        "run_command_extraction",
+        "action_enrichment",
+        "marketplace_catalog",
+        "html_extraction",
+        "analyzer",
+        "pattern_mining",
+        "cooccurrence",
+        "streaming_frequent_items",
+        "workflow_scraper",
+        "datascience_scraper",
+        "datascience_rescreen",
+        "sampled_scrape",
+        "pipeline",
+    ]
+
+    def __init__(self, args: argparse.Namespace, workdir: Path) -> None:
+        self.args = args
+        self.workdir = workdir
+        self.shape = CorpusShape(
+            n_of_repos=args.repos,
+            workflows_per_repo=args.workflows_per_repo,
+            jobs_per_workflow=args.jobs,
+            steps_per_job=args.steps,
+            n_of_tail_actions=args.tail_actions,
+            docker_ratio=args.docker_ratio,
+            seed=args.seed,
+        )
+        self.corpus = SyntheticCorpus(self.shape)
+        self.data_dir = workdir / "corpus"
+        self.n_of_workflows = self.corpus.write_to_directory(self.data_dir)
+
+        rnd = random.Random(args.seed)
+        self.mock = MockGitHub(
+            repo_workflows={
+                slug: [
+                    (key.rsplit("/", 1)[1], text)
+                    for key, text in self.corpus.repo_workflows(slug)
+                ]
+                for slug in self.corpus.slugs
+            },
+            repo_metadata={
+                slug: {
+                    "description": rnd.choice(["A machine learning project", "A CLI"]),
+                    "topics": rnd.sample(["mlops", "nlp", "web", "cli"], 2),
+                }
+                for slug in self.corpus.slugs
+            },
+            marketplace={
+                action: {
+                    "verified": i % 3 == 0,
+                    # Every marketplace action is listed in at least one category
+                    "categories": ["Continuous integration", "Utilities"][: i % 2 + 1],
+                }
+                for i, action in enumerate(self.corpus.action_pool)
+                if i % 2 == 0
+            },
+            latency=args.latency,
+            rate_limit=args.rate_limit,
+        )
+
+    def run(self, stages: list[str]) -> dict:
+        from instrumentation import metrics
+
+        if self.args.instrument:
+            metrics.enable()
+
+        results = {}
+        with self.mock:
+            for stage in stages:
+                print(f"[bold]Running stage:[/bold] {stage}")
+                self.mock.reset_counts()
+                metrics.reset()
+                results[stage] = getattr(self, f"_stage_{stage}")()
+                if metrics.enabled:
+                    results[stage]["instrumentation"] = metrics.report()["timers"]
+        return results
+
+    # ------ #
+    # STAGES #
+    # ------ #
+
+    def _warm_marketplace_cache(self) -> None:
+        """Mark every action as already looked up, to keep stages offline."""
+        from analyze_workflows import Action
+
+        Action.scraping_cache.clear()
+        for action in self.corpus.action_pool:
+            Action.scraping_cache[action] = {
+                "available_in_marketplace": False,
+                "marketplace_page": None,
+            }
+
+    def _stage_workflow_parsing(self) -> dict:
+        from analyze_workflows import Workflow
+
+        self._warm_marketplace_cache()
+        paths = list(self.data_dir.glob("**/*.y*ml"))
+
+        def stage() -> dict:
+            workflows = [Workflow(self.data_dir, path) for path in paths]
+            return {"n_of_workflows": len(workflows)}
+
+        return measure(stage, self.args.repeat)
+
+    def _stage_run_command_extraction(self) -> dict:
+        from analyze_workflows import RunCommand
+        from ruamel.yaml import YAML
+
+        # Workflows do not keep the scripts of their run commands
+        yaml_parser = YAML(typ="safe", pure=True)
+        commands = []
+        for path in self.data_dir.glob("**/*.y*ml"):
+            for job in yaml_parser.load(path)["jobs"].values():
+                commands.extend(
+                    str(step["run"]) for step in job.get("steps") or [] if "run" in step
+                )
+
+        def stage() -> dict:
+            for command in commands:
+                RunCommand(command)
+            return {"n_of_run_commands": len(commands)}
+
+        return measure(stage, self.args.repeat)
+
+    def _stage_action_enrichment(self) -> dict:
+        from analyze_workflows import Action
+
+        Action.BASE_GITHUB_URL = self.mock.url
+        Action.marketplace_catalog = None
+        slugs = [action + "@v1" for action in self.corpus.action_pool]
+
+        def stage() -> dict:
+            Action.scraping_cache.clear()
+            for slug in slugs:
+                Action(slug)
+            return {"n_of_actions": len(slugs)}
+
+        result = measure(stage, self.args.repeat)
+        result["requests_per_action"] = round(
+            self.mock.total_requests / ((self.args.repeat + 1) * len(slugs)), 2
+        )
+        return result
+
+    def _stage_marketplace_catalog(self) -> dict:
+        """Build the catalog from the listing pages, then enrich from it."""
+        from analyze_workflows import Action
+        from marketplace import MarketplaceCatalog
+
+        slugs = [action + "@v1" for action in self.corpus.action_pool]
+
+        def stage() -> dict:
+            catalog = MarketplaceCatalog.build(
+                base_url=self.mock.url,
+                categories=["continuous-integration", "utilities"],
+            )
+            Action.marketplace_catalog = catalog
+            try:
+                for slug in slugs:
+                    Action(slug)
+            finally:
+                Action.marketplace_catalog = None
+            return {"n_of_actions": len(slugs), "catalog_size": len(catalog)}
+
+        result = measure(stage, self.args.repeat)
+        result["requests_per_action"] = round(
+            self.mock.total_requests / ((self.args.repeat + 1) * len(slugs)), 2
+        )
+        result["requests"] = dict(self.mock.request_counts)
+        return result
+
+    def _stage_html_extraction(self) -> dict:
+        """Compare the targeted extraction with full `BeautifulSoup` trees.
+
+        The pages are rendered from the recorded pages in `assets/`.
+        """
+        from bs4 import BeautifulSoup
+        from html_extraction import extract_marketplace_link, extract_marketplace_page
+
+        repo_pages, marketplace_pages = [], []
+        for slug in self.mock.marketplace:
+            repo_pages.append(self.mock._repo_page(slug)[2].encode("utf8"))
+            name = slug.split("/")[1]
+            marketplace_pages.append(
+                self.mock._marketplace_page(name)[2].encode("utf8")
+            )
+        n_of_pages = len(repo_pages) + len(marketplace_pages)
+
+        def beautifulsoup_stage() -> dict:
+            facts = []
+            for repo_page, marketplace_page in zip(repo_pages, marketplace_pages):
+                link = BeautifulSoup(repo_page, "html.parser").find(
+                    "a", string="View on Marketplace"
+                )
+                parsed_html = BeautifulSoup(marketplace_page, "html.parser")
+                verified = bool(parsed_html.find_all("svg", class_="octicon-verified"))
+                categories = tuple(
+                    c.text.strip()
+                    for c in parsed_html.find_all("a", class_="topic-tag")
+                )
+                facts.append((link["href"], verified, categories))
+            return {"n_of_pages": n_of_pages, "facts": facts}
+
+        def extraction_stage() -> dict:
+            facts = []
+            for repo_page, marketplace_page in zip(repo_pages, marketplace_pages):
+                page = extract_marketplace_page(marketplace_page)
+                facts.append(
+                    (
+                        extract_marketplace_link(repo_page),
+                        page.verified_creator,
+                        page.categories,
+                    )
+                )
+            return {"n_of_pages": n_of_pages, "facts": facts}
+
+        if beautifulsoup_stage()["facts"] != extraction_stage()["facts"]:
+            raise AssertionError("The extracted facts differ from BeautifulSoup's.")
+        result = measure(extraction_stage, self.args.repeat)
+        baseline = measure(beautifulsoup_stage, self.args.repeat)
+        for stage_result in (result, baseline):
+            del stage_result["facts"]
+        result["page_kb"] = round(
+            sum(map(len, repo_pages + marketplace_pages)) / n_of_pages / 1024, 1
+        )
+        result["beautifulsoup"] = baseline
+        result["speedup"] = round(baseline["seconds"] / result["seconds"], 1)
+        return result
+
+    def _stage_analyzer(self) -> dict:
+        import mlxtend.preprocessing  # noqa: F401 (slow import, kept out of timings)
+        from analyze_workflows import WorkflowAnalyzer
+
+        self._warm_marketplace_cache()
+
+        def stage() -> dict:
+            WorkflowAnalyzer(self.data_dir)
+            return {"n_of_workflows": self.n_of_workflows}
+
+        return measure(stage, self.args.repeat)
+
+    def _stage_pattern_mining(self) -> dict:
+        from analyze_workflows import WorkflowAnalyzer
+
+        self._warm_marketplace_cache()
+        analyzer = WorkflowAnalyzer(self.data_dir)
+        transactions = [
+            [action.slug_without_tag for action in workflow.actions]
+            for workflow in analyzer.workflows
+        ]
+
+        def stage() -> dict:
+            analyzer._mine_frequent_patterns(transactions, support=0.05)
+            return {"n_of_transactions": len(transactions)}
+
+        return measure(stage, self.args.repeat)
+
+    def _stage_cooccurrence(self) -> dict:
+        import pandas as pd
+        from analyze_workflows import WorkflowAnalyzer
+        from cooccurrence import CooccurrenceMatrix
+        from mlxtend.preprocessing import TransactionEncoder
+
+        self._warm_marketplace_cache()
+        analyzer = WorkflowAnalyzer(self.data_dir)
+        transactions = analyzer._get_actions_per_workflow(include_tags=False)
+
+        def stage() -> dict:
+            matrix = CooccurrenceMatrix.from_transactions(transactions)
+            matrix.association_rules(analyzer.rule_thresholds)
+            return {"n_of_transactions": len(transactions)}
+
+        def baseline_stage() -> dict:
+            # What the notebooks did: a dense product of the one-hot encoding
+            te = TransactionEncoder()
+            encoding_df = pd.DataFrame(
+                te.fit(transactions).transform(transactions), columns=te.columns_
+            ).astype(int)
+            encoding_df.T.dot(encoding_df)
+            return {"n_of_transactions": len(transactions)}
+
+        result = measure(stage, self.args.repeat)
+        baseline = measure(baseline_stage, self.args.repeat)
+        result["dense_baseline"] = baseline
+        result["speedup"] = round(baseline["seconds"] / result["seconds"], 1)
+        return result
+
+    def _stage_streaming_frequent_items(self) -> dict:
+        from collections import Counter
+        from itertools import combinations
+
+        from analyze_workflows import WorkflowAnalyzer
+        from streaming import LossyCounter
+
+        self._warm_marketplace_cache()
+        analyzer = WorkflowAnalyzer(self.data_dir)
+        transactions = analyzer._get_actions_per_workflow(include_tags=False)
+        support = 0.05
+        counters: list[LossyCounter] = []
+
+        def stage() -> dict:
+            counter = LossyCounter(max_itemset_size=2)
+            for transaction in transactions:
+                counter.add(transaction)
+            counters.append(counter)
+            return {"n_of_transactions": len(transactions)}
+
+        result = measure(stage, self.args.repeat)
+        counter = counters[-1]
+
+        # Agreement with apriori, within the error of the summary
+        exact_counts: Counter = Counter()
+        for transaction in transactions:
+            items = sorted(set(transaction))
+            for size in (1, 2):
+                exact_counts.update(frozenset(c) for c in combinations(items, size))
+        exact = analyzer._mine_frequent_patterns(transactions, support=support)
+        exact = set(exact.loc[exact["length"] <= 2, "itemsets"])
+        streamed = counter.frequent_itemsets(support)
+        n = len(transactions)
+        errors = [
+            exact_counts[itemset] / n - row_support
+            for itemset, row_support in zip(streamed["itemsets"], streamed["support"])
+        ]
+        result["epsilon"] = counter.epsilon
+        result["entries"] = len(counter)
+        result["distinct_itemsets"] = len(exact_counts)
+        result["missed_itemsets"] = len(exact - set(streamed["itemsets"]))
+        result["reported_below_support_minus_epsilon"] = sum(
+            exact_counts[itemset] / n < support - counter.epsilon
+            for itemset in streamed["itemsets"]
+        )
+        result["max_support_error"] = round(max(errors, default=0.0), 4)
+        return result
+
+    def _run_scraper(self, scraper) -> None:
+        scraper.GITHUB_API_URL = self.mock.api_url
+        # The progress bar shares the global console: mute it only while scraping
+        console = scraper.progress.console
+        console.quiet = True
+        try:
+            scraper.scrape_repos()
+        finally:
+            console.quiet = False
+
+    def _scraper_result(self, stage: Callable[[], dict]) -> dict:
+        result = measure(stage, self.args.repeat)
+        result["requests_per_repo"] = round(
+            self.mock.total_requests
+            / ((self.args.repeat + 1) * len(self.corpus.slugs)),
+            2,
+        )
+        result["requests"] = dict(self.mock.request_counts)
+        return result
+
+    def _stage_workflow_scraper(self) -> dict:
+        from models import GitHubSlug
+        from scrape_repos import WorkflowScraper
+
+        slugs = [GitHubSlug(slug) for slug in self.corpus.slugs]
+        tokens = [f"token{i}" for i in range(self.args.tokens)]
+
+        def stage() -> dict:
+            output_dir = Path(tempfile.mkdtemp(dir=self.workdir))
+            scraper = WorkflowScraper(
+                {}, tokens, output_dir, output_dir / "data", slugs
+            )
+            self._run_scraper(scraper)
+            return {"n_of_repos": len(slugs)}
+
+        return self._scraper_result(stage)
+
+    def _stage_datascience_scraper(self) -> dict:
+        from models import GitHubSlug
+        from scrape_repos import DataScienceScraper
+
+        with open(BASE_DIR / "settings.json") as settings_file:
+            settings = json.load(settings_file)
+        settings["githubActionsReleaseCondition"] = True
+        slugs = [GitHubSlug(slug) for slug in self.corpus.slugs]
+        tokens = [f"token{i}" for i in range(self.args.tokens)]
+
+        def stage() -> dict:
+            output_dir = Path(tempfile.mkdtemp(dir=self.workdir))
+            scraper = DataScienceScraper(settings, tokens, output_dir, slugs)
+            self._run_scraper(scraper)
+            return {"n_of_repos": len(slugs)}
+
+        return self._scraper_result(stage)
+
+    def _stage_datascience_rescreen(self) -> dict:
+        """Fill a metadata store once, then re-screen it with new keywords."""
+        from models import GitHubSlug
+        from repo_metadata import RepoMetadataStore
+        from scrape_repos import DataScienceScraper
+
+        with open(BASE_DIR / "settings.json") as settings_file:
+            settings = json.load(settings_file)
+        settings["githubActionsReleaseCondition"] = True
+        slugs = [GitHubSlug(slug) for slug in self.corpus.slugs]
+        tokens = [f"token{i}" for i in range(self.args.tokens)]
+        store = RepoMetadataStore(self.workdir / "repo_metadata.jsonl")
+        self._run_scraper(
+            DataScienceScraper(settings, tokens, self.workdir, slugs, store)
+        )
+        self.mock.reset_counts()
+
+        rescreen_settings = dict(settings, keywords=settings["keywords"] + ["cli"])
+
+        def stage() -> dict:
+            output_dir = Path(tempfile.mkdtemp(dir=self.workdir))
+            scraper = DataScienceScraper(
+                rescreen_settings, tokens, output_dir, slugs, store
+            )
+            selected = scraper.rescreen()
+            return {"n_of_repos": len(slugs), "selected_repos": len(selected)}
+
+        return self._scraper_result(stage)
+
+    def _stage_sampled_scrape(self) -> dict:
+        """Scrape a sample, estimate prevalences, then extend to a full run.
+
+        Not wrapped in `measure()`: a second run would find every repo
+        already downloaded. `seconds` is the time of the sample plus the
+        extension, and no peak memory is reported.
+        """
+        from models import GitHubSlug
+        from sampling import SamplingPlan
+        from scrape_repos import WorkflowScraper
+
+        plan = SamplingPlan([GitHubSlug(slug) for slug in self.corpus.slugs], "owner")
+        tokens = [f"token{i}" for i in range(self.args.tokens)]
+        output_dir = Path(tempfile.mkdtemp(dir=self.workdir))
+
+        def scrape(slugs: list) -> WorkflowScraper:
+            scraper = WorkflowScraper(
+                {}, tokens, output_dir, output_dir / "data", slugs, record_outcomes=True
+            )
+            self._run_scraper(scraper)
+            return scraper
+
+        sample = plan.sample_for(margin_of_error=0.1)
+        start = time.perf_counter()
+        estimates_df = scrape(sample).estimate_prevalence(plan)
+        sample_seconds = time.perf_counter() - start
+        sample_requests = self.mock.total_requests
+
+        # The full run does not query the repos downloaded for the sample
+        self.mock.reset_counts()
+        start = time.perf_counter()
+        full_run = scrape(plan.order)
+        full_seconds = time.perf_counter() - start
+        true_prevalences = plan.estimate(full_run.repo_outcomes).set_index("indicator")
+
+        return {
+            "seconds": round(sample_seconds + full_seconds, 4),
+            "n_of_repos": len(plan),
+            "sample_size": len(sample),
+            "sample_seconds": round(sample_seconds, 4),
+            "sample_requests": sample_requests,
+            "extension_seconds": round(full_seconds, 4),
+            "extension_requests": self.mock.total_requests,
+            "estimates": {
+                row.indicator: {
+                    "estimate": round(row.estimate, 3),
+                    "ci": [round(row.ci_low, 3), round(row.ci_high, 3)],
+                    "true": round(true_prevalences.at[row.indicator, "estimate"], 3),
+                }
+                for row in estimates_df.itertuples()
+            },
+        }
+
+    def _stage_pipeline(self) -> dict:
+        """Scrape then analyze (batch), vs. both at once (pipelined)."""
+        import mlxtend.preprocessing  # noqa: F401 (slow import, kept out of timings)
+        from analyze_workflows import WorkflowAnalyzer
+        from config import Settings
+        from models import GitHubSlug
+        from pipeline import WorkflowPipeline
+        from scrape_repos import WorkflowScraper
+
+        self._warm_marketplace_cache()
+        slugs = [GitHubSlug(slug) for slug in self.corpus.slugs]
+        tokens = [f"token{i}" for i in range(self.args.tokens)]
+
+        def batch_stage() -> dict:
+            output_dir = Path(tempfile.mkdtemp(dir=self.workdir))
+            scraper = WorkflowScraper(
+                {}, tokens, output_dir, output_dir / "data", slugs
+            )
+            self._run_scraper(scraper)
+            WorkflowAnalyzer(output_dir / "data")
+            return {"n_of_repos": len(slugs)}
+
+        def pipelined_stage() -> dict:
+            output_dir = Path(tempfile.mkdtemp(dir=self.workdir))
+            settings = Settings(output_dir / "data", output_dir, output_dir, tokens)
+            settings.create_directories()
+            pipeline = WorkflowPipeline(settings, slugs)
+            console = pipeline.scraper.progress.console
+            pipeline.scraper.GITHUB_API_URL = self.mock.api_url
+            console.quiet = True
+            try:
+                pipeline.run()
+            finally:
+                console.quiet = False
+            return {"n_of_repos": len(slugs)}
+
+        result = measure(pipelined_stage, self.args.repeat)
+        result["batch"] = measure(batch_stage, self.args.repeat)
+        result["speedup"] = round(result["batch"]["seconds"] / result["seconds"], 2)
+        return result
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(  # nosec
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare_with_previous(report: dict, results_dir: Path, threshold: float) -> None:
+    """Print the change in time of each stage with respect to the last run."""
+    previous_reports = sorted(results_dir.glob("*.json"))
+    if not previous_reports:
+        print("No previous results to compare with.")
+        return
+    with open(previous_reports[-1]) as previous_file:
+        previous = json.load(previous_file)
+    if previous.get("shape") != report["shape"]:
+        print("[yellow]Previous run used a different corpus shape.[/yellow]")
+
+    table = Table(title=f"Compared with {previous_reports[-1].name}")
+    for column in ["Stage", "Before (s)", "After (s)", "Change", "Peak MB"]:
+        table.add_column(column)
+    for stage, metrics in report["stages"].items():
+        before = previous["stages"].get(stage, {}).get("seconds")
+        after = metrics.get("seconds")
+        peak_memory = str(metrics.get("peak_memory_mb", "-"))
+        if after is None:
+            # Stage without a timing to compare
+            continue
+        if not before:
+            table.add_row(stage, "-", str(after), "-", peak_memory)
+            continue
+        change = (after - before) / before
+        style = "red" if change > threshold else "green" if change < 0 else ""
+        table.add_row(
+            stage,
+            str(before),
+            str(after),
+            f"[{style}]{change:+.1%}[/{style}]" if style else f"{change:+.1%}",
+            peak_memory,
+        )
+    print(table)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repos", type=int, default=100)
+    parser.add_argument("--workflows-per-repo", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=2)
+    parser.add_argument("--steps", type=int, default=6)
+    parser.add_argument("--tail-actions", type=int, default=300)
+    parser.add_argument("--docker-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument(
+        "--rate-limit", type=int, default=None, help="API requests per second"
+    )
+    parser.add_argument("--tokens", type=int, default=4, help="scraper threads")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--instrument", action="store_true", help="include per-call timings"
+    )
+    parser.add_argument(
+        "--stages", nargs="+", choices=BenchmarkSuite.STAGES, default=None
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="regression threshold"
+    )
+    parser.add_argument("--results-dir", type=Path, default=RESULTS_DIR)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="actions4DS-bench-"))
+    try:
+        suite = BenchmarkSuite(args, workdir)
+        stages = suite.run(args.stages or BenchmarkSuite.STAGES)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "shape": asdict(suite.shape),
+        "n_of_workflows": suite.n_of_workflows,
+        "mock": {"latency": args.latency, "rate_limit": args.rate_limit},
+        "stages": stages,
+    }
+    print(json.dumps(report["stages"], indent=2))
+
+    args.results_dir.mkdir(parents=True, exist_ok=True)
+    compare_with_previous(report, args.results_dir, args.threshold)
+    if not args.no_save:
+        current_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        report_path = args.results_dir / f"{current_time}_{report['commit']}.json"
+        with open(report_path, "w") as report_file:
+            json.dump(report, report_file, indent=4)
+        print(f"Results saved to {report_path}")
+
+
+if __name__ == "__main__":
+    main()
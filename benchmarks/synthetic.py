@@ -0,0 +1,110 @@
+"""
+Generate synthetic GitHub Actions workflow corpora for benchmarking.
+
+The generated workflows mimic the shape of the scraped dataset: a handful of
+very popular actions (checkout, setup-python, ...) and a long tail of rarely
+used ones, a mix of triggering events, and run commands of which a
+configurable share invoke `docker`.
+"""
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+POPULAR_ACTIONS = [
+    "actions/checkout",
+    "actions/setup-python",
+    "actions/cache",
+    "actions/upload-artifact",
+    "actions/download-artifact",
+    "iterative/setup-cml",
+    "iterative/setup-dvc",
+    "docker/login-action",
+    "docker/build-push-action",
+    "docker/setup-buildx-action",
+    "actions/setup-node",
+    "codecov/codecov-action",
+]
+TAGS = ["@v1", "@v2", "@v3", "@main", "@master", ""]
+EVENTS = ["push", "pull_request", "schedule", "workflow_dispatch", "release"]
+DOCKER_COMMANDS = ["build", "push", "run", "pull", "tag", "login", "compose"]
+PLAIN_COMMANDS = [
+    "pip install -r requirements.txt",
+    "python train.py",
+    "pytest -q",
+    "dvc repro",
+    "cml-send-comment report.md",
+    "echo done",
+]
+
+
+@dataclass
+class CorpusShape:
+    """Size and shape of a synthetic corpus."""
+
+    n_of_repos: int = 100
+    workflows_per_repo: int = 3
+    jobs_per_workflow: int = 2
+    steps_per_job: int = 6
+    n_of_tail_actions: int = 300
+    docker_ratio: float = 0.2
+    seed: int = 42
+
+
+class SyntheticCorpus:
+    """Deterministic generator of `(key, yaml_text)` workflow records."""
+
+    def __init__(self, shape: Optional[CorpusShape] = None) -> None:
+        self.shape = shape or CorpusShape()
+        self._random = random.Random(self.shape.seed)
+
+        tail_actions = [
+            f"owner{i}/action-{i}" for i in range(self.shape.n_of_tail_actions)
+        ]
+        self.action_pool: list[str] = POPULAR_ACTIONS + tail_actions
+        # Zipf-like popularity: the i-th action is picked with weight 1 / (i + 1)
+        self._action_weights = [1 / (i + 1) for i in range(len(self.action_pool))]
+
+    @property
+    def slugs(self) -> list[str]:
+        return [f"owner{i % 97}/repo-{i}" for i in range(self.shape.n_of_repos)]
+
+    def workflows(self) -> Iterator[tuple[str, str]]:
+        """Yield `(<owner>/<repo>/<filename>, yaml_text)` pairs."""
+        for slug in self.slugs:
+            for key, text in self.repo_workflows(slug):
+                yield key, text
+
+    def repo_workflows(self, slug: str) -> list[tuple[str, str]]:
+        return [
+            (f"{slug}/workflow-{i}.yml", self._workflow_yaml(f"Workflow {i}"))
+            for i in range(self.shape.workflows_per_repo)
+        ]
+
+    def write_to_directory(self, data_dir: Path) -> int:
+        """Write the corpus in the `DATA_DIR` layout and return its size."""
+        n_of_workflows = 0
+        for key, text in self.workflows():
+            workflow_path = data_dir / key
+            workflow_path.parent.mkdir(parents=True, exist_ok=True)
+            workflow_path.write_text(text, encoding="utf8")
+            n_of_workflows += 1
+        return n_of_workflows
+
+    def _workflow_yaml(self, name: str) -> str:
+        rnd = self._random
+        events = rnd.sample(EVENTS, rnd.randint(1, 3))
+        lines = [f"name: {name}", f"on: [{', '.join(events)}]", "jobs:"]
+        for j in range(self.shape.jobs_per_workflow):
+            lines += [f"  job-{j}:", "    runs-on: ubuntu-latest", "    steps:"]
+            for _ in range(self.shape.steps_per_job):
+                if rnd.random() < 0.5:
+                    action = rnd.choices(self.action_pool, self._action_weights)[0]
+                    lines.append(f"      - uses: {action}{rnd.choice(TAGS)}")
+                elif rnd.random() < self.shape.docker_ratio:
+                    command = rnd.choice(DOCKER_COMMANDS)
+                    lines.append(f"      - run: docker {command} image-{j} .")
+                else:
+                    lines.append(f"      - run: {rnd.choice(PLAIN_COMMANDS)}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,61 @@
+"""
+Shared fixtures: a small synthetic corpus (see `benchmarks/synthetic.py`)
+served by a local mock of GitHub (see `benchmarks/mock_github.py`).
+"""
+
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+BASE_DIR = Path(__file__).parent.parent.absolute()
+
+# Make the `actions4DS` modules and the benchmark helpers importable
+sys.path.insert(0, str(BASE_DIR / "actions4DS"))
+sys.path.insert(0, str(BASE_DIR / "benchmarks"))
+
+from mock_github import MockGitHub  # noqa: E402
+from synthetic import CorpusShape, SyntheticCorpus  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def corpus() -> SyntheticCorpus:
+    return SyntheticCorpus(CorpusShape(n_of_repos=40, seed=7))
+
+
+@pytest.fixture
+def mock_github(corpus: SyntheticCorpus) -> MockGitHub:
+    repo_workflows = {
+        slug: [
+            (key.rsplit("/", 1)[1], text) for key, text in corpus.repo_workflows(slug)
+        ]
+        for slug in corpus.slugs
+    }
+    with MockGitHub(repo_workflows=repo_workflows) as mock:
+        yield mock
+
+
+@pytest.fixture
+def offline_marketplace(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Look actions up in an empty catalog instead of scraping github.com."""
+    from analyze_workflows import Action
+    from marketplace import MarketplaceCatalog
+
+    monkeypatch.setattr(Action, "marketplace_catalog", MarketplaceCatalog())
+
+
+@pytest.fixture
+def scrape(mock_github: MockGitHub) -> Callable:
+    """Return a function running a scraper against the mock GitHub."""
+
+    def run_scraper(scraper) -> None:
+        scraper.GITHUB_API_URL = mock_github.api_url
+        console = scraper.progress.console
+        console.quiet = True
+        try:
+            scraper.scrape_repos()
+        finally:
+            console.quiet = False
+
+    return run_scraper
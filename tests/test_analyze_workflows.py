@@ -0,0 +1,25 @@
+from pathlib import Path
+
+from analyze_workflows import Workflow
+
+WORKFLOW = """
+on: push
+jobs:
+  build:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v3
+      - run: |
+          docker build -t image .
+          docker push image
+      - run: pytest -q
+"""
+
+
+def test_workflow_keeps_docker_facts_not_scripts(offline_marketplace):
+    workflow = Workflow(Path("data"), Path("data/owner/repo/ci.yml"), WORKFLOW)
+    record = workflow.asdict()
+    assert record["n_of_run_commands"] == 2
+    assert record["docker_related_commands"]
+    assert record["docker_commands"] == ["build", "push"]
+    assert not hasattr(workflow, "commands")
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from config import Settings, get_settings
+from conftest import BASE_DIR
+
+ENV_INI = """\
+[PATHS]
+DATA_DIR = data
+LOGS_DIR = logs
+DUMPS_DIR = dumps
+WORKFLOW_ARCHIVE = data/workflows.pack
+
+[GITHUB]
+TOKEN_LIST = ["token0", "token1"]
+
+[INSTRUMENTATION]
+PROMETHEUS_EXPORT = true
+"""
+
+
+def test_import_reads_no_configuration(tmp_path):
+    # Without `env.ini` nor `settings.json` in the current directory
+    modules = "config, analyze_workflows, scrape_repos, pipeline, history, main"
+    env = dict(os.environ, PYTHONPATH=str(BASE_DIR / "actions4DS"))
+    subprocess.run(
+        [sys.executable, "-c", f"import {modules}"], cwd=tmp_path, env=env, check=True
+    )
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_settings_are_loaded_lazily(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    get_settings.cache_clear()
+    try:
+        with pytest.raises(ValueError, match="env.ini"):
+            get_settings()
+
+        (tmp_path / "env.ini").write_text(ENV_INI)
+        (tmp_path / "settings.json").write_text('{"max_repos": 10}')
+        settings = get_settings()
+        assert get_settings() is settings
+    finally:
+        get_settings.cache_clear()
+
+    assert settings == Settings(
+        data_dir=Path("data"),
+        logs_dir=Path("logs"),
+        dumps_dir=Path("dumps"),
+        token_list=["token0", "token1"],
+        experiment_settings={"max_repos": 10},
+        workflow_archive=Path("data/workflows.pack"),
+        instrumentation_enabled=True,
+        prometheus_export=True,
+    )
+    # Nothing is created until an entry point asks for it
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "env.ini",
+        "settings.json",
+    ]
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import pytest
+from cooccurrence import CooccurrenceMatrix, RuleThresholds
+from mlxtend.frequent_patterns import apriori, association_rules
+from mlxtend.preprocessing import TransactionEncoder
+
+TRANSACTIONS = [
+    ["a", "b", "c"],
+    ["a", "b"],
+    ["a", "c"],
+    ["b"],
+    ["a", "b", "a"],  # Repeated items count once
+    [],
+]
+NO_THRESHOLDS = RuleThresholds(min_support=0, min_confidence=0, min_lift=0)
+
+
+@pytest.fixture
+def matrix() -> CooccurrenceMatrix:
+    return CooccurrenceMatrix.from_transactions(TRANSACTIONS)
+
+
+def test_counts(matrix):
+    assert matrix.items == ["a", "b", "c"]
+    assert matrix.n_transactions == 6
+    assert matrix.counts.toarray().tolist() == [
+        [4, 3, 2],
+        [3, 4, 1],
+        [2, 1, 2],
+    ]
+    assert matrix.item_counts.tolist() == [4, 4, 2]
+    assert matrix.count("a", "b") == matrix.count("b", "a") == 3
+    assert matrix.count("a", "unknown") == 0
+
+    pairs_df = matrix.to_frame()
+    assert list(zip(pairs_df["item_1"], pairs_df["item_2"], pairs_df["count"])) == [
+        ("a", "b", 3),
+        ("a", "c", 2),
+        ("b", "c", 1),
+    ]
+    assert pairs_df["support"].tolist() == pytest.approx([3 / 6, 2 / 6, 1 / 6])
+
+
+def test_rule_metrics_by_hand(matrix):
+    rules_df = matrix.association_rules(NO_THRESHOLDS).set_index(
+        ["antecedent", "consequent"]
+    )
+    assert len(rules_df) == 6
+    # c -> a: both in 2 transactions out of 6, a in 4
+    c_a = rules_df.loc[("c", "a")]
+    assert c_a["support"] == pytest.approx(2 / 6)
+    assert c_a["confidence"] == pytest.approx(1.0)
+    assert c_a["lift"] == pytest.approx(1 / (4 / 6))
+    a_b = rules_df.loc[("a", "b")]
+    assert a_b["antecedent_support"] == pytest.approx(4 / 6)
+    assert a_b["confidence"] == pytest.approx(3 / 4)
+    assert a_b["lift"] == pytest.approx((3 / 4) / (4 / 6))
+    # Sorted by decreasing lift
+    assert rules_df["lift"].is_monotonic_decreasing
+
+
+def test_rule_metrics_match_mlxtend(matrix):
+    encoder = TransactionEncoder()
+    onehot = encoder.fit(TRANSACTIONS).transform(TRANSACTIONS)
+    onehot_df = pd.DataFrame(onehot, columns=encoder.columns_)
+    itemsets_df = apriori(onehot_df, min_support=0.01, use_colnames=True, max_len=2)
+    expected_df = association_rules(itemsets_df, len(TRANSACTIONS), min_threshold=0)
+    expected = {
+        (next(iter(row.antecedents)), next(iter(row.consequents))): row
+        for row in expected_df.itertuples()
+    }
+
+    rules_df = matrix.association_rules(NO_THRESHOLDS)
+    assert len(rules_df) == len(expected)
+    for rule in rules_df.itertuples():
+        other = expected[rule.antecedent, rule.consequent]
+        assert rule.support == pytest.approx(other.support)
+        assert rule.confidence == pytest.approx(other.confidence)
+        assert rule.lift == pytest.approx(other.lift)
+
+
+@pytest.mark.parametrize(
+    "thresholds, expected",
+    [
+        (RuleThresholds(), {("c", "a"), ("a", "c"), ("a", "b"), ("b", "a")}),
+        (RuleThresholds(min_support=0.4), {("a", "b"), ("b", "a")}),
+        (RuleThresholds(min_confidence=0.8), {("c", "a")}),
+        (RuleThresholds(min_lift=1.2), {("c", "a"), ("a", "c")}),
+        (
+            RuleThresholds(min_support=1 / 6, min_confidence=0, min_lift=0),
+            {("a", "b"), ("b", "a"), ("a", "c"), ("c", "a"), ("b", "c"), ("c", "b")},
+        ),
+    ],
+)
+def test_thresholds(matrix, thresholds, expected):
+    rules_df = matrix.association_rules(thresholds)
+    assert set(zip(rules_df["antecedent"], rules_df["consequent"])) == expected
+    assert (rules_df["support"] >= thresholds.min_support).all()
+    assert (rules_df["confidence"] >= thresholds.min_confidence).all()
+    assert (rules_df["lift"] >= thresholds.min_lift).all()
+
+
+def test_npz_round_trip(matrix, tmp_path):
+    matrix.save(tmp_path / "cooccurrence.npz")
+    loaded = CooccurrenceMatrix.load(tmp_path / "cooccurrence.npz")
+    assert loaded.items == matrix.items
+    assert loaded.n_transactions == matrix.n_transactions
+    assert (loaded.counts != matrix.counts).nnz == 0
+    pd.testing.assert_frame_equal(
+        loaded.association_rules(NO_THRESHOLDS), matrix.association_rules(NO_THRESHOLDS)
+    )
+
+
+def test_no_transactions():
+    matrix = CooccurrenceMatrix.from_transactions([])
+    assert len(matrix) == 0
+    assert matrix.association_rules().empty
+    assert np.array_equal(matrix.item_counts, [])
@@ -0,0 +1,63 @@
+import pytest
+from analyze_workflows import WorkflowAnalyzer
+from corpus import WorkflowArchive, pack_directory, unpack_archive
+from models import GitHubSlug
+from scrape_repos import WorkflowScraper
+
+
+def test_scrape_into_empty_archive(tmp_path, corpus, scrape, offline_marketplace):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    slugs = [GitHubSlug(slug) for slug in corpus.slugs]
+    with WorkflowArchive(tmp_path / "workflows.pack") as archive:
+        assert len(archive) == 0
+        scrape(WorkflowScraper({}, ["token0"], tmp_path, data_dir, slugs, archive))
+
+        assert not list(data_dir.iterdir())
+        assert len(archive) == len(list(corpus.workflows()))
+        for slug in slugs:
+            assert sorted(archive.repo_keys(slug)) == sorted(
+                key for key, _ in corpus.repo_workflows(str(slug))
+            )
+
+        analyzer = WorkflowAnalyzer(archive)
+        assert len(analyzer.workflows) == len(archive)
+        assert set(analyzer.workflows_df["repository"].astype(str)) == set(corpus.slugs)
+
+
+def test_pack_unpack_round_trip(tmp_path, corpus):
+    corpus.write_to_directory(tmp_path / "data")
+    with pack_directory(tmp_path / "data", tmp_path / "workflows.pack") as archive:
+        keys = archive.keys()
+    assert unpack_archive(tmp_path / "workflows.pack", tmp_path / "copy") == len(keys)
+    for key in keys:
+        assert (tmp_path / "copy" / key).read_bytes() == (
+            tmp_path / "data" / key
+        ).read_bytes()
+
+
+def test_missing_archive_is_not_created_when_reading(tmp_path):
+    with pytest.raises(ValueError, match="does not exist"):
+        WorkflowArchive(tmp_path / "missing.pack", create=False)
+    assert not (tmp_path / "missing.pack").exists()
+
+
+def test_append_after_truncated_record(tmp_path):
+    path = tmp_path / "workflows.pack"
+    with WorkflowArchive(path) as archive:
+        archive.append("a/b/ci.yml", b"on: push\n")
+        archive.append("a/b/release.yml", b"on: release\n" * 10)
+    # Interrupted write: the last record loses the end of its data
+    with open(path, "r+b") as archive_file:
+        archive_file.truncate(path.stat().st_size - 5)
+
+    with WorkflowArchive(path) as archive:
+        assert archive.keys() == ["a/b/ci.yml"]
+        archive.append("c/d/ci.yml", b"on: pull_request\n")
+    # Rescan the records rather than trusting the index
+    (tmp_path / "workflows.pack.idx").unlink()
+
+    with WorkflowArchive(path) as archive:
+        assert sorted(archive.keys()) == ["a/b/ci.yml", "c/d/ci.yml"]
+        assert archive.read_text("a/b/ci.yml") == "on: push\n"
+        assert archive.read_text("c/d/ci.yml") == "on: pull_request\n"
@@ -0,0 +1,200 @@
+import subprocess
+from pathlib import Path
+
+import history
+import pytest
+from history import HistoryMiner
+from models import GitHubSlug
+
+SLUG = GitHubSlug("owner/repo")
+# Commits are dated in seconds after this timestamp
+EPOCH = 1_600_000_000
+
+CI_V1 = """
+on: push
+jobs:
+  test:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v2
+"""
+CI_V2 = """
+on: [push, pull_request]
+jobs:
+  test:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v3
+      - uses: iterative/setup-cml@v1
+"""
+DOCS = """
+on: release
+jobs:
+  docs:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v3
+"""
+BROKEN = "on: [push\njobs: {\n"
+
+
+def git(repo_path: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-C", str(repo_path), *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+@pytest.fixture
+def upstream(tmp_path, monkeypatch) -> Path:
+    """A repository whose workflows are added, modified, renamed and deleted."""
+    for variable in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{variable}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{variable}_EMAIL", "test@example.com")
+    repo_path = tmp_path / "upstream" / "owner" / "repo"
+    repo_path.mkdir(parents=True)
+    git(repo_path, "init", "--quiet", "--initial-branch=main")
+    # Serve blobless clones over file://
+    git(repo_path, "config", "uploadpack.allowFilter", "true")
+    workflows_dir = repo_path / ".github" / "workflows"
+
+    def commit(timestamp: int, **files) -> None:
+        for path, text in files.items():
+            file_path = repo_path / path
+            if text is None:
+                git(repo_path, "rm", "--quiet", path)
+                continue
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(text)
+            git(repo_path, "add", path)
+        date = f"@{EPOCH + timestamp} +0000"
+        monkeypatch.setenv("GIT_AUTHOR_DATE", date)
+        monkeypatch.setenv("GIT_COMMITTER_DATE", date)
+        git(repo_path, "commit", "--quiet", "-m", f"Commit at {timestamp}")
+
+    commit(1000, **{".github/workflows/ci.yml": CI_V1, "README.md": "# Repo\n"})
+    commit(
+        2000,
+        **{
+            ".github/workflows/ci.yml": CI_V2,
+            ".github/workflows/docs.yaml": DOCS,
+            # Ignored by GitHub (and by the miner)
+            ".github/workflows/templates/ignored.yml": "# Template\n" + CI_V1,
+        },
+    )
+    commit(3000, **{"README.md": "# Repo\n\nNo workflow change.\n"})
+    git(repo_path, "mv", ".github/workflows/docs.yaml", ".github/workflows/pages.yml")
+    commit(4000)
+    commit(5000, **{".github/workflows/broken.yml": BROKEN})
+    commit(6000, **{".github/workflows/ci.yml": None})
+    assert workflows_dir.is_dir()
+    return repo_path
+
+
+@pytest.fixture
+def miner(tmp_path, upstream) -> HistoryMiner:
+    return HistoryMiner(
+        tmp_path / "clones", clone_url=f"file://{tmp_path / 'upstream'}/{{slug}}"
+    )
+
+
+def summarize(records: list[dict]) -> list[tuple]:
+    return [
+        (
+            int(record["commit_datetime"].timestamp()) - EPOCH,
+            record["filename"],
+            record["change"],
+            record.get("valid"),
+        )
+        for record in records
+    ]
+
+
+EXPECTED = [
+    (1000, "ci.yml", "A", True),
+    (2000, "ci.yml", "M", True),
+    (2000, "docs.yaml", "A", True),
+    # Renames are a deletion plus an addition
+    (4000, "docs.yaml", "D", None),
+    (4000, "pages.yml", "A", True),
+    (5000, "broken.yml", "A", False),
+    (6000, "ci.yml", "D", None),
+]
+
+
+def test_mine_blobless_clone(miner, upstream, offline_marketplace, monkeypatch):
+    cat_file_processes = []
+    popen = subprocess.Popen
+
+    def counting_popen(args, *popen_args, **kwargs):
+        if "cat-file" in args:
+            cat_file_processes.append(args)
+        return popen(args, *popen_args, **kwargs)
+
+    monkeypatch.setattr(history.subprocess, "Popen", counting_popen)
+    records = miner.mine(SLUG)
+
+    assert summarize(records) == EXPECTED
+    assert len(cat_file_processes) == 1
+    assert {record["repository"] for record in records} == {"owner/repo"}
+    by_version = {(r["filename"], r["change"]): r for r in records}
+    assert by_version["ci.yml", "A"]["actions"] == ["actions/checkout@v2"]
+    assert by_version["ci.yml", "M"]["actions"] == [
+        "actions/checkout@v3",
+        "iterative/setup-cml@v1",
+    ]
+    assert by_version["pages.yml", "A"]["actions"] == ["actions/checkout@v3"]
+    assert by_version["broken.yml", "A"]["error"]
+    assert "actions" not in by_version["ci.yml", "D"]
+
+    # Only the blobs of the workflow versions were fetched into the clone
+    clone_path = miner.clone_path(SLUG)
+    assert git(clone_path, "config", "remote.origin.promisor").strip() == "true"
+    missing = {
+        line[1:]
+        for line in git(
+            clone_path, "rev-list", "--objects", "--missing=print", "--all"
+        ).splitlines()
+        if line.startswith("?")
+    }
+    assert missing == {
+        git(upstream, "rev-parse", f"{commit}:{path}").strip()
+        for commit, path in [
+            ("HEAD~4", ".github/workflows/templates/ignored.yml"),
+            ("HEAD~4", "README.md"),
+            ("HEAD~3", "README.md"),
+        ]
+    }
+
+
+def test_clones_are_reused(miner, upstream, offline_marketplace, monkeypatch):
+    first_run = miner.mine(SLUG)
+    clone_path = miner.clone_path(SLUG)
+    head = git(clone_path, "rev-parse", "HEAD")
+
+    commands = []
+    run = subprocess.run
+
+    def recording_run(args, *run_args, **kwargs):
+        commands.append(args)
+        return run(args, *run_args, **kwargs)
+
+    monkeypatch.setattr(history.subprocess, "run", recording_run)
+    second_run = miner.mine(SLUG)
+    assert summarize(second_run) == summarize(first_run)
+    assert not any("clone" in args or "fetch" in args for args in commands)
+    assert git(clone_path, "rev-parse", "HEAD") == head
+
+    # An existing (non-bare, complete) clone can be mined in place
+    assert summarize(miner.mine(SLUG, repo_path=upstream)) == EXPECTED
+
+
+def test_mine_all_skips_failing_repositories(miner, offline_marketplace):
+    history_df = miner.mine_all([SLUG, GitHubSlug("owner/missing")])
+    assert set(history_df["repository"]) == {"owner/repo"}
+    assert len(history_df) == len(EXPECTED)
+    assert list(zip(history_df["filename"], history_df["change"])) == [
+        (filename, change) for _, filename, change, _ in EXPECTED
+    ]
@@ -0,0 +1,102 @@
+import csv
+import json
+import time
+
+import pytest
+from instrumentation import _NULL_TIMER, Instrumentation
+
+
+def test_disabled_timers_are_no_ops():
+    instrumentation = Instrumentation()
+    assert instrumentation.timer("stage") is _NULL_TIMER
+
+    @instrumentation.timed("function")
+    def function(x):
+        return x + 1
+
+    with instrumentation.timer("stage"):
+        assert function(1) == 2
+    instrumentation.count("event")
+    instrumentation.add_time("stage", 1.0)
+
+    report = instrumentation.report()
+    assert report["timers"] == {}
+    assert report["counters"] == {}
+    assert instrumentation.write_report(None, "run") is None
+
+
+def test_aggregation_per_name():
+    instrumentation = Instrumentation()
+    instrumentation.enable()
+
+    @instrumentation.timed("function")
+    def function():
+        pass
+
+    for _ in range(3):
+        function()
+    with instrumentation.timer("stage"):
+        time.sleep(0.01)
+    instrumentation.add_time("stage", 0.5)
+    instrumentation.count("event")
+    instrumentation.count("event", 4)
+
+    report = instrumentation.report()
+    assert report["timers"]["function"]["count"] == 3
+    stage = report["timers"]["stage"]
+    assert stage["count"] == 2
+    assert stage["max_seconds"] == 0.5
+    assert 0.51 <= stage["total_seconds"] < 1.0
+    assert stage["mean_seconds"] == pytest.approx(stage["total_seconds"] / 2, abs=1e-6)
+    assert report["counters"] == {"event": 5}
+
+    instrumentation.reset()
+    assert instrumentation.report()["timers"] == {}
+
+
+def test_start_datetime_is_the_start_of_the_run():
+    instrumentation = Instrumentation()
+    time.sleep(0.05)
+    instrumentation.enable()
+    assert instrumentation.report()["wall_clock_seconds"] < 0.05
+
+    time.sleep(0.05)
+    instrumentation.reset()
+    assert instrumentation.report()["wall_clock_seconds"] < 0.05
+
+
+def test_report_files(tmp_path):
+    instrumentation = Instrumentation()
+    instrumentation.enable()
+    instrumentation.add_time("github.get_repo", 0.25)
+    instrumentation.add_time("github.get_repo", 0.75)
+    instrumentation.count("workflow.downloaded", 2)
+
+    json_path = instrumentation.write_report(tmp_path, "Run", prometheus=True)
+    assert json_path.name.endswith("_Run_metrics.json")
+    report = json.loads(json_path.read_text())
+    assert set(report) == {
+        "start_datetime",
+        "end_datetime",
+        "wall_clock_seconds",
+        "timers",
+        "counters",
+    }
+    assert report["timers"]["github.get_repo"] == {
+        "count": 2,
+        "total_seconds": 1.0,
+        "mean_seconds": 0.5,
+        "max_seconds": 0.75,
+    }
+
+    with open(json_path.with_suffix(".csv"), newline="") as csv_file:
+        rows = list(csv.reader(csv_file))
+    assert rows == [
+        ["kind", "name", "count", "total_seconds", "mean_seconds", "max_seconds"],
+        ["timer", "github.get_repo", "2", "1.0", "0.5", "0.75"],
+        ["counter", "workflow.downloaded", "2", "", "", ""],
+    ]
+
+    prometheus = json_path.with_suffix(".prom").read_text()
+    assert 'actions4ds_timer_seconds_total{name="github.get_repo"} 1.0' in prometheus
+    assert 'actions4ds_events_total{name="workflow.downloaded"} 2' in prometheus
@@ -0,0 +1,266 @@
+from pathlib import Path
+
+import pytest
+from analyze_workflows import Workflow, WorkflowAnalyzer
+from jobs import dag_depths, extract_job, matrix_size, needed_jobs, runner_os
+from ruamel.yaml import YAML
+
+
+def strategy(text: str) -> dict:
+    return YAML(typ="safe").load(text)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        # GitHub docs, "Expanding or adding matrix configurations"
+        (
+            """
+matrix:
+  fruit: [apple, pear]
+  animal: [cat, dog]
+  include:
+    - color: green
+    - color: pink
+      animal: cat
+    - fruit: apple
+      shape: circle
+    - fruit: banana
+    - fruit: banana
+      animal: cat
+""",
+            6,
+        ),
+        # 2 x 3 combinations, one of them excluded
+        (
+            """
+matrix:
+  os: [ubuntu-latest, windows-latest]
+  version: [12, 14, 16]
+  exclude:
+    - os: windows-latest
+      version: 12
+""",
+            5,
+        ),
+        # GitHub docs, "Excluding matrix configurations"
+        (
+            """
+matrix:
+  os: [macos-latest, windows-latest]
+  version: [12, 14, 16]
+  environment: [staging, production]
+  exclude:
+    - os: macos-latest
+      version: 12
+      environment: production
+    - os: windows-latest
+      version: 16
+""",
+            9,
+        ),
+        # GitHub docs, only `include`
+        (
+            """
+matrix:
+  include:
+    - site: production
+      datacenter: site-a
+    - site: staging
+      datacenter: site-b
+""",
+            2,
+        ),
+        # GitHub docs, "Example: Expanding configurations"
+        (
+            """
+matrix:
+  os: [windows-latest, ubuntu-latest]
+  node: [14, 16]
+  include:
+    - os: windows-latest
+      node: 16
+      npm: 6
+""",
+            4,
+        ),
+        # GitHub docs, "Example: Adding configurations"
+        (
+            """
+matrix:
+  os: [windows-latest, ubuntu-latest]
+  version: [12, 14, 16]
+  include:
+    - os: windows-latest
+      version: 17
+""",
+            7,
+        ),
+        ("fail-fast: false", 1),
+    ],
+)
+def test_matrix_size(text, expected):
+    assert matrix_size(strategy(text)) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "matrix: ${{ fromJSON(needs.setup.outputs.matrix) }}",
+        "matrix:\n  python: ${{ fromJSON(needs.setup.outputs.versions) }}",
+        "matrix:\n  python: ['3.10']\n  include: ${{ fromJSON(inputs.extra) }}",
+    ],
+)
+def test_expression_matrix_size_is_unknown(text):
+    assert matrix_size(strategy(text)) is None
+
+
+def test_no_matrix():
+    assert matrix_size(None) == 1
+    assert matrix_size("${{ inputs.strategy }}") == 1
+
+
+def test_needed_jobs():
+    assert needed_jobs({}) == ()
+    assert needed_jobs({"needs": "build"}) == ("build",)
+    assert needed_jobs({"needs": ["build", "test"]}) == ("build", "test")
+
+
+def test_dag_depths():
+    needs = {
+        "lint": (),
+        "test": ("lint",),
+        "build": ("lint", "test"),
+        "deploy": ("build",),
+        "docs": (),
+    }
+    assert dag_depths(needs) == {
+        "lint": 1,
+        "test": 2,
+        "build": 3,
+        "deploy": 4,
+        "docs": 1,
+    }
+    # Unknown dependencies are ignored
+    assert dag_depths({"test": ("missing",), "build": ("test",)}) == {
+        "test": 1,
+        "build": 2,
+    }
+
+
+@pytest.mark.parametrize(
+    "needs",
+    [
+        {"a": ("a",)},
+        {"a": ("b",), "b": ("a",)},
+        {"a": ("c",), "b": ("a",), "c": ("b",), "d": ("c",)},
+    ],
+)
+def test_dag_depths_with_cycles(needs):
+    depths = dag_depths(needs)
+    assert set(depths) == set(needs)
+    assert all(1 <= depth <= len(needs) for depth in depths.values())
+
+
+@pytest.mark.parametrize(
+    "runs_on, expected",
+    [
+        (None, None),
+        ("ubuntu-latest", "linux"),
+        ("ubuntu-22.04", "linux"),
+        ("windows-2022", "windows"),
+        ("macos-13", "macos"),
+        ("self-hosted,linux,x64", "self-hosted"),
+        ("${{ matrix.os }}", "expression"),
+        ("my-large-runner", "other"),
+    ],
+)
+def test_runner_os(runs_on, expected):
+    assert runner_os(runs_on) == expected
+
+
+def test_extract_job():
+    job = YAML(typ="safe").load("""
+runs-on: [self-hosted, linux]
+needs: build
+container:
+  image: python:3.11
+services:
+  redis:
+    image: redis
+strategy:
+  matrix:
+    python: ['3.10', '3.11']
+steps:
+  - run: pytest
+""")
+    extracted = extract_job("test", job, dag_depth=2)
+    assert extracted.runs_on == "self-hosted,linux"
+    assert extracted.runner_os == "self-hosted"
+    assert extracted.needs == ("build",)
+    assert extracted.matrix_size == 2
+    assert extracted.container == "python:3.11"
+    assert extracted.services == ("redis",)
+    assert extracted.n_of_steps == 1
+    assert extract_job("group", {"runs-on": {"group": "large"}}).runner_os == "other"
+
+
+WORKFLOW = """
+on: push
+jobs:
+  lint:
+    runs-on: ubuntu-latest
+    steps:
+      - run: flake8
+  test:
+    needs: lint
+    runs-on: ${{ matrix.os }}
+    strategy:
+      matrix:
+        os: [ubuntu-latest, windows-latest]
+    steps:
+      - run: pytest
+  build:
+    needs: [lint, test]
+    runs-on: ubuntu-latest
+    steps:
+      - run: make
+  deploy:
+    needs: build
+    runs-on: ubuntu-latest
+    steps:
+      - run: make deploy
+  docs:
+    needs: unknown
+    runs-on: macos-latest
+    steps:
+      - run: make docs
+"""
+
+
+def test_critical_path_length(offline_marketplace):
+    workflow = Workflow(Path("data"), Path("data/owner/repo/ci.yml"), WORKFLOW)
+    analyzer = WorkflowAnalyzer.from_workflows([workflow])
+
+    workflow_record = analyzer.workflows_df.iloc[0]
+    assert workflow_record["n_of_jobs"] == 5
+    assert workflow_record["critical_path_length"] == 4
+
+    jobs_df = analyzer.jobs_df.set_index("job_id")
+    assert jobs_df["dag_depth"].to_dict() == {
+        "lint": 1,
+        "test": 2,
+        "build": 3,
+        "deploy": 4,
+        "docs": 1,
+    }
+    assert jobs_df.loc["test", "runner_os"] == "expression"
+    assert jobs_df.loc["test", "matrix_size"] == 2
+    assert jobs_df.loc["docs", "runner_os"] == "macos"
+
+
+def test_workflow_without_jobs(offline_marketplace):
+    workflow = Workflow(
+        Path("data"), Path("data/owner/repo/ci.yml"), "on: push\njobs: {}\n"
+    )
+    assert workflow.asdict()["critical_path_length"] == 0
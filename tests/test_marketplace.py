@@ -0,0 +1,131 @@
+import requests
+from analyze_workflows import Action
+from html_extraction import extract_marketplace_link, extract_marketplace_page
+from marketplace import MarketplaceCatalog
+from mock_github import LISTING_PAGE_SIZE, MARKETPLACE_PAGE, VERIFIED_BADGE, MockGitHub
+
+LISTINGS = {
+    "iterative/setup-cml": {"verified": True, "categories": ["Utilities"]},
+    "docker/build-push-action": {
+        "verified": False,
+        "categories": ["Continuous integration", "Deployment"],
+    },
+}
+
+
+def render_marketplace_page(slug: str, verified: bool = True) -> str:
+    owner, name = slug.split("/")[:2]
+    return MARKETPLACE_PAGE.substitute(
+        name=name,
+        owner=owner,
+        slug=slug,
+        verified_badge=VERIFIED_BADGE if verified else "",
+        categories="",
+    )
+
+
+def test_build_catalog_from_recorded_pages(tmp_path):
+    with MockGitHub(marketplace=LISTINGS) as mock:
+        catalog = MarketplaceCatalog.build(
+            base_url=mock.url, categories=["utilities", "deployment"], workers=2
+        )
+    assert not catalog.unresolved_urls
+    assert set(catalog.listings) == set(LISTINGS)
+    for slug, expected in LISTINGS.items():
+        listing = catalog.get(slug.upper())
+        assert listing.repository == slug
+        assert listing.verified_creator == expected["verified"]
+        assert listing.categories == tuple(expected["categories"])
+
+    catalog.save(tmp_path / "catalog.json")
+    assert MarketplaceCatalog.load(tmp_path / "catalog.json").listings == (
+        catalog.listings
+    )
+
+
+def test_repository_page_links_to_marketplace():
+    with MockGitHub(marketplace=LISTINGS) as mock:
+        page = requests.get(f"{mock.url}/iterative/setup-cml")
+    assert extract_marketplace_link(page.text) == "/marketplace/actions/setup-cml"
+
+
+def test_action_published_from_a_subdirectory():
+    page = render_marketplace_page("owner/repo").replace(
+        "uses: owner/repo@", "uses: owner/repo/path/to/action@"
+    )
+    extracted = extract_marketplace_page(page)
+    assert extracted.repository == "owner/repo"
+    assert extracted.action == "owner/repo/path/to/action"
+    assert extracted.verified_creator
+
+    listing = MarketplaceCatalog.parse_listing(page, "/marketplace/actions/repo")
+    assert MarketplaceCatalog({listing.slug: listing}).get("owner/repo/path/to/action")
+
+
+def test_repository_is_not_taken_from_other_uses_text():
+    page = render_marketplace_page("owner/repo", verified=False)
+    # Without the installation snippet, the first `uses:` of the page is an
+    # example using another action
+    start = page.index('<details class="details-overlay')
+    end = page.index("</details>") + len("</details>")
+    page = (
+        page[:start]
+        + "<p>Add it after uses: actions/checkout@v3 in your workflow.</p>"
+        + page[end:]
+    )
+
+    extracted = extract_marketplace_page(page)
+    assert extracted.repository == "owner/repo"
+    assert extracted.action == "owner/repo"
+    assert not extracted.verified_creator
+
+
+def test_categories_are_crawled_to_the_last_page():
+    # Three listing pages in "utilities"
+    listings = {
+        f"owner{i}/action{i}": {"verified": False, "categories": ["Utilities"]}
+        for i in range(2 * LISTING_PAGE_SIZE + 5)
+    }
+    with MockGitHub(marketplace=listings) as mock:
+        catalog = MarketplaceCatalog.build(base_url=mock.url, categories=["utilities"])
+        assert mock.request_counts["marketplace_listing"] == 4
+    assert set(catalog.listings) == set(listings)
+    assert not catalog.truncated_categories
+    assert catalog.complete
+
+
+def test_truncated_categories_are_recorded(tmp_path, caplog, monkeypatch):
+    listings = {
+        f"owner{i}/action{i}": {"verified": False, "categories": ["Utilities"]}
+        for i in range(2 * LISTING_PAGE_SIZE + 5)
+    }
+    listings["docker/build-push-action"] = LISTINGS["docker/build-push-action"]
+    with MockGitHub(marketplace=listings) as mock:
+        catalog = MarketplaceCatalog.build(
+            base_url=mock.url, categories=["utilities", "deployment"], max_pages=2
+        )
+
+        assert len(catalog) == 2 * LISTING_PAGE_SIZE + 1
+        assert catalog.truncated_categories == ["utilities"]
+        assert not catalog.complete
+        assert 'Category "utilities" has more than 2 pages' in caplog.text
+
+        catalog.save(tmp_path / "catalog.json")
+        catalog = MarketplaceCatalog.load(tmp_path / "catalog.json")
+        assert catalog.truncated_categories == ["utilities"]
+
+        # Actions missing from an incomplete catalog are looked up on GitHub
+        monkeypatch.setattr(Action, "marketplace_catalog", catalog)
+        monkeypatch.setattr(Action, "BASE_GITHUB_URL", mock.url)
+        monkeypatch.setattr(Action, "scraping_cache", {})
+        last_slug = (
+            f"owner{2 * LISTING_PAGE_SIZE + 4}/action{2 * LISTING_PAGE_SIZE + 4}"
+        )
+        assert last_slug not in catalog
+        assert Action(last_slug + "@v1").available_in_marketplace
+        assert not Action("owner/unlisted@v1").available_in_marketplace
+        assert mock.request_counts["repo_page"] == 2
+
+        # Listed actions are not
+        assert Action("owner0/action0@v1").available_in_marketplace
+        assert mock.request_counts["repo_page"] == 2
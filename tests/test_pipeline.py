@@ -0,0 +1,84 @@
+import time
+
+import pandas as pd
+import pytest
+from analyze_workflows import WorkflowAnalyzer
+from config import Settings
+from corpus import WorkflowArchive
+from models import GitHubSlug
+from pipeline import WorkflowPipeline
+from scrape_repos import GitHubScraper, WorkflowScraper
+from streaming import LossyCounter
+
+TOKENS = [f"token{i}" for i in range(8)]
+
+
+@pytest.mark.parametrize("packed", [False, True], ids=["directory", "archive"])
+def test_pipelined_run_matches_batch_analysis(
+    tmp_path, corpus, mock_github, scrape, offline_marketplace, packed
+):
+    settings = Settings(tmp_path / "data", tmp_path, tmp_path, TOKENS)
+    settings.create_directories()
+    archive = WorkflowArchive(tmp_path / "workflows.pack") if packed else None
+    slugs = [GitHubSlug(slug) for slug in corpus.slugs]
+
+    # Half of the repositories were downloaded by a previous run
+    scrape(
+        WorkflowScraper({}, TOKENS, tmp_path, settings.data_dir, slugs[::2], archive)
+    )
+
+    pipeline = WorkflowPipeline(settings, slugs, archive)
+    pipeline.scraper.GITHUB_API_URL = mock_github.api_url
+    console = pipeline.scraper.progress.console
+    console.quiet = True
+    try:
+        pipelined = pipeline.run()
+    finally:
+        console.quiet = False
+
+    batch = WorkflowAnalyzer(archive if packed else settings.data_dir)
+    assert len(batch.workflows) == len(list(corpus.workflows()))
+    for name in ("workflows_df", "actions_df", "jobs_df"):
+        pd.testing.assert_frame_equal(getattr(pipelined, name), getattr(batch, name))
+    assert bool(list(settings.data_dir.iterdir())) != packed
+
+    # Checkpoints of the frequent items cover every parsed workflow
+    checkpoint = LossyCounter.load(tmp_path / "frequent_items_actions_noTags.npz")
+    assert checkpoint.n_of_transactions == len(batch.workflows)
+    if archive is not None:
+        archive.close()
+
+
+def slow_feed_slugs(self) -> None:
+    """`GitHubScraper._feed_slugs()`, with the slugs coming in slowly."""
+    for slug in self.slugs:
+        time.sleep(0.01)
+        self.queue.put(slug)
+    for _ in range(len(self.token_list)):
+        self.queue.put(None)
+
+
+def test_scraping_waits_for_the_feeder(
+    tmp_path, corpus, scrape, offline_marketplace, monkeypatch
+):
+    monkeypatch.setattr(GitHubScraper, "_feed_slugs", slow_feed_slugs)
+    slugs = [GitHubSlug(slug) for slug in corpus.slugs]
+    scraper = WorkflowScraper({}, TOKENS, tmp_path, tmp_path, slugs, max_queued_slugs=4)
+    scrape(scraper)
+    assert sorted(map(str, scraper.selected_slugs)) == sorted(corpus.slugs)
+
+
+def test_pipeline_waits_for_the_feeder(
+    tmp_path, corpus, mock_github, offline_marketplace, monkeypatch
+):
+    monkeypatch.setattr(GitHubScraper, "_feed_slugs", slow_feed_slugs)
+    settings = Settings(tmp_path / "data", tmp_path, tmp_path, TOKENS)
+    settings.create_directories()
+    slugs = [GitHubSlug(slug) for slug in corpus.slugs]
+
+    # Queues large enough for an early sentinel to drop repos, not to hang
+    pipeline = WorkflowPipeline(settings, slugs, queue_size=len(slugs))
+    pipeline.scraper.GITHUB_API_URL = mock_github.api_url
+    pipeline.scraper.progress.console.quiet = True
+    analyzer = pipeline.run()
+    assert len(analyzer.workflows) == len(list(corpus.workflows()))
@@ -0,0 +1,149 @@
+from pathlib import Path
+
+import pytest
+from analyze_workflows import Action, Workflow, WorkflowAnalyzer, corpus_file_reader
+from corpus import WorkflowArchive
+from mock_github import MockGitHub
+from models import GitHubSlug
+from references import (
+    ReferenceKind,
+    ReferenceResolver,
+    classify_reference,
+    local_action_paths,
+)
+from ruamel.yaml import YAML
+from scrape_repos import WorkflowScraper
+
+COMPOSITE_ACTION = """
+runs:
+  using: composite
+  steps:
+    - uses: actions/setup-python@v4
+    - uses: ./.github/actions/nested
+"""
+NESTED_ACTION = """
+runs:
+  using: composite
+  steps:
+    - uses: iterative/setup-cml@v1
+"""
+
+
+def test_classify_reference():
+    assert classify_reference("actions/checkout@v3").is_marketplace_candidate
+    assert classify_reference("./.github/actions/setup").kind is (
+        ReferenceKind.LOCAL_ACTION
+    )
+    assert classify_reference("docker://alpine:3").kind is ReferenceKind.DOCKER_IMAGE
+    assert classify_reference("${{ matrix.action }}").kind is ReferenceKind.INVALID
+    workflow = "./.github/workflows/build.yml"
+    assert classify_reference(workflow, job_level=True).kind is (
+        ReferenceKind.LOCAL_WORKFLOW
+    )
+
+
+def test_references_outside_the_repository_are_invalid():
+    assert classify_reference(".").kind is ReferenceKind.INVALID
+    assert classify_reference("./../other-repo/action").kind is ReferenceKind.INVALID
+    assert classify_reference("./a/../../b", job_level=True).kind is (
+        ReferenceKind.INVALID
+    )
+
+
+def test_resolve_composite_action_offline():
+    files = {
+        "owner/repo/.github/actions/setup/action.yml": COMPOSITE_ACTION,
+        "owner/repo/.github/actions/nested/action.yaml": NESTED_ACTION,
+        "owner/other/action.yml": NESTED_ACTION,
+    }
+    requested = []
+
+    def read_file(key):
+        requested.append(key)
+        return files.get(key)
+
+    resolver = ReferenceResolver(read_file)
+    assert resolver.resolve_action("owner/repo", "./.github/actions/setup") == (
+        "actions/setup-python@v4",
+        "iterative/setup-cml@v1",
+    )
+    assert resolver.resolve_action("owner/repo", "./../other") is None
+    assert all(key.startswith("owner/repo/") for key in requested)
+
+
+def test_workflow_with_invalid_local_reference(offline_marketplace):
+    text = """
+on: push
+jobs:
+  build:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: .
+      - uses: ./../other-repo
+      - uses: actions/checkout@v3
+"""
+    workflow = Workflow(Path("data"), Path("data/owner/repo/ci.yml"), text)
+    assert [action.slug for action in workflow.actions] == ["actions/checkout@v3"]
+
+
+LOCAL_ACTIONS_WORKFLOW = """
+on: push
+jobs:
+  build:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v3
+      - uses: ./.github/actions/setup
+      - uses: ./.github/actions/missing
+      - uses: ./
+"""
+
+
+def test_local_action_paths():
+    workflow = YAML(typ="safe").load(LOCAL_ACTIONS_WORKFLOW)
+    assert local_action_paths(workflow) == [
+        ".github/actions/setup",
+        ".github/actions/missing",
+    ]
+    composite = YAML(typ="safe").load(COMPOSITE_ACTION)
+    assert local_action_paths(composite) == [".github/actions/nested"]
+    assert local_action_paths(["not", "a", "mapping"]) == []
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_scraper_downloads_local_actions(tmp_path, offline_marketplace, packed):
+    repo_workflows = {"owner/repo": [("ci.yml", LOCAL_ACTIONS_WORKFLOW)]}
+    repo_files = {
+        "owner/repo": {
+            ".github/actions/setup/action.yml": COMPOSITE_ACTION,
+            ".github/actions/nested/action.yaml": NESTED_ACTION,
+            "action.yml": NESTED_ACTION,
+        }
+    }
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    archive = WorkflowArchive(tmp_path / "workflows.pack") if packed else None
+    with MockGitHub(repo_workflows=repo_workflows, repo_files=repo_files) as mock:
+        scraper = WorkflowScraper(
+            {}, ["token0"], tmp_path, data_dir, [GitHubSlug("owner/repo")], archive
+        )
+        scraper.GITHUB_API_URL = mock.api_url
+        scraper.progress.console.quiet = True
+        scraper.scrape_repos()
+    assert scraper.scraping_stats["total_number_of_local_actions"] == 2
+
+    corpus = archive if packed else data_dir
+    read_file = corpus_file_reader(corpus)
+    assert read_file("owner/repo/.github/actions/setup/action.yml") == (
+        COMPOSITE_ACTION
+    )
+    assert read_file("owner/repo/.github/actions/nested/action.yaml") == NESTED_ACTION
+
+    analyzer = WorkflowAnalyzer(corpus)
+    (workflow,) = analyzer.workflows
+    assert [Action._instances[i].slug for i in workflow.indirect_action_ids] == [
+        "actions/setup-python@v4",
+        "iterative/setup-cml@v1",
+    ]
+    if packed:
+        archive.close()
@@ -0,0 +1,128 @@
+import math
+import random
+from collections import Counter
+
+import pytest
+from models import GitHubSlug
+from sampling import SamplingPlan, proportion_interval, sample_size
+
+LARGE_POPULATION = 10**9
+
+
+@pytest.mark.parametrize(
+    "population, margin_of_error, expected",
+    [
+        # 1.96^2 * 0.25 / 0.05^2 = 384.1 without the correction
+        (LARGE_POPULATION, 0.05, 385),
+        (1000, 0.05, 278),
+        (100, 0.1, 50),
+        (50, 0.05, 45),
+        (10, 0.5, 3),
+        (0, 0.05, 0),
+    ],
+)
+def test_sample_size(population, margin_of_error, expected):
+    assert sample_size(population, margin_of_error) == expected
+
+
+def test_sample_size_never_exceeds_the_population():
+    assert sample_size(20, 0.001) == 20
+    assert sample_size(1000, 0.05, confidence=0.99) > sample_size(1000, 0.05)
+    assert sample_size(1000, 0.05, proportion=0.1) < sample_size(1000, 0.05)
+
+
+def test_wilson_interval():
+    estimate, low, high = proportion_interval(30, 100, LARGE_POPULATION)
+    assert estimate == 0.3
+    assert (low, high) == pytest.approx((0.2189, 0.3958), abs=1e-4)
+
+
+def test_wilson_interval_at_the_bounds():
+    z_squared = 1.959964**2
+    estimate, low, high = proportion_interval(0, 100, LARGE_POPULATION)
+    assert (estimate, low) == (0.0, 0.0)
+    assert high == pytest.approx(z_squared / (100 + z_squared))
+
+    estimate, low, high = proportion_interval(100, 100, LARGE_POPULATION)
+    assert (estimate, high) == (1.0, 1.0)
+    assert low == pytest.approx(100 / (100 + z_squared))
+
+
+def test_finite_population_correction():
+    _, low, high = proportion_interval(30, 100, LARGE_POPULATION)
+    _, small_low, small_high = proportion_interval(30, 100, 200)
+    assert low < small_low < 0.3 < small_high < high
+    # A census has no sampling error
+    assert proportion_interval(30, 100, 100) == (0.3, 0.3, 0.3)
+    estimate, low, high = proportion_interval(0, 0, 100)
+    assert math.isnan(estimate) and (low, high) == (0.0, 1.0)
+
+
+def make_slugs(owner_sizes: dict[str, int]) -> list[GitHubSlug]:
+    return [
+        GitHubSlug(f"{owner}/repo{i}")
+        for owner, size in owner_sizes.items()
+        for i in range(size)
+    ]
+
+
+@pytest.mark.parametrize("strata", SamplingPlan.STRATA)
+def test_order_is_reproducible(strata):
+    slugs = make_slugs({"a": 60, "b": 30, "c": 10})
+    plan = SamplingPlan(slugs, strata, seed=1)
+    assert sorted(map(str, plan.order)) == sorted(map(str, slugs))
+    assert SamplingPlan(slugs, strata, seed=1).order == plan.order
+    assert SamplingPlan(slugs, strata, seed=2).order != plan.order
+
+
+def test_order_does_not_depend_on_the_input_order():
+    slugs = make_slugs({"a": 60, "b": 30, "c": 10})
+    shuffled = slugs[:]
+    random.Random(0).shuffle(shuffled)
+    for strata in ("none", "owner"):
+        assert SamplingPlan(shuffled, strata).order == SamplingPlan(slugs, strata).order
+
+
+def test_larger_samples_extend_smaller_ones():
+    plan = SamplingPlan(make_slugs({"a": 600, "b": 300, "c": 100}), "owner")
+    small, large = plan.sample_for(0.1), plan.sample_for(0.05)
+    assert len(small) < len(large) < len(plan)
+    assert large[: len(small)] == small
+    assert plan.sample(len(small)) + plan.remaining(len(small)) == plan.order
+
+
+@pytest.mark.parametrize("strata", ["owner", "segment"])
+def test_strata_are_proportional(strata):
+    owner_sizes = {"a": 60, "b": 30, "c": 10}
+    slugs = make_slugs(owner_sizes)
+    plan = SamplingPlan(slugs, strata, n_of_segments=10)
+    stratum_sizes = (
+        owner_sizes if strata == "owner" else {str(s): 10 for s in range(10)}
+    )
+
+    def stratum(slug: GitHubSlug) -> str:
+        if strata == "owner":
+            return slug.repo_owner
+        return str(slugs.index(slug) * 10 // len(slugs))
+
+    for size in range(1, len(plan) + 1):
+        counts = Counter(stratum(slug) for slug in plan.sample(size))
+        for name, stratum_size in stratum_sizes.items():
+            expected = size * stratum_size / len(plan)
+            assert abs(counts[name] - expected) < 1
+
+
+def test_estimate():
+    plan = SamplingPlan(make_slugs({"a": 100}))
+    outcomes = {
+        str(slug): {"found": True, "uses_docker": i < 3}
+        for i, slug in enumerate(plan.sample(10))
+    }
+    estimates_df = plan.estimate(outcomes).set_index("indicator")
+    assert estimates_df.loc["found", "estimate"] == 1.0
+    assert estimates_df.loc["uses_docker", "successes"] == 3
+    assert estimates_df.loc["uses_docker", "estimate"] == 0.3
+    assert (estimates_df["sample_size"] == 10).all()
+    assert (estimates_df["population"] == 100).all()
+    low, high = estimates_df.loc["uses_docker", ["ci_low", "ci_high"]]
+    assert low < 0.3 < high
@@ -0,0 +1,31 @@
+import json
+from pathlib import Path
+
+from models import GitHubSlug
+from repo_metadata import RepoMetadataStore
+from scrape_repos import DataScienceScraper
+
+SETTINGS_PATH = Path(__file__).parent.parent / "settings.json"
+
+
+def test_stored_repositories_are_screened_without_api_calls(
+    tmp_path, corpus, mock_github, scrape
+):
+    with open(SETTINGS_PATH) as settings_file:
+        settings = json.load(settings_file)
+    settings["githubActionsReleaseCondition"] = True
+    slugs = [GitHubSlug(slug) for slug in corpus.slugs]
+    tokens = ["token0", "token1"]
+    store = RepoMetadataStore(tmp_path / "repo_metadata.jsonl")
+
+    first_run = DataScienceScraper(settings, tokens, tmp_path, slugs, store)
+    scrape(first_run)
+    assert len(store) == len(slugs)
+
+    mock_github.reset_counts()
+    second_run = DataScienceScraper(settings, tokens, tmp_path, slugs, store)
+    scrape(second_run)
+    assert mock_github.total_requests == 0
+    assert sorted(map(str, second_run.selected_slugs)) == sorted(
+        map(str, first_run.selected_slugs)
+    )
@@ -0,0 +1,77 @@
+from collections import Counter
+from itertools import combinations
+from pathlib import Path
+
+import pytest
+from analyze_workflows import Workflow, WorkflowAnalyzer
+from streaming import LossyCounter
+
+SUPPORT = 0.05
+
+
+@pytest.fixture
+def analyzer(corpus, offline_marketplace):
+    analyzer = WorkflowAnalyzer.__new__(WorkflowAnalyzer)
+    analyzer.workflows = [
+        Workflow(Path(), Path(key), text) for key, text in corpus.workflows()
+    ]
+    return analyzer
+
+
+@pytest.fixture
+def transactions(analyzer):
+    return analyzer._get_actions_per_workflow(include_tags=False)
+
+
+def exact_counts(transactions):
+    counts = Counter()
+    for transaction in transactions:
+        items = sorted(set(transaction))
+        for size in (1, 2):
+            counts.update(frozenset(c) for c in combinations(items, size))
+    return counts
+
+
+@pytest.mark.parametrize("epsilon", [0.005, 0.02])
+def test_agrees_with_apriori_within_epsilon(analyzer, transactions, epsilon):
+    counter = LossyCounter(epsilon, max_itemset_size=2)
+    for transaction in transactions:
+        counter.add(transaction)
+    n = len(transactions)
+    counts = exact_counts(transactions)
+    assert len(counter) <= len(counts)
+
+    exact = analyzer._mine_frequent_patterns(transactions, support=SUPPORT)
+    exact = set(exact.loc[exact["length"] <= 2, "itemsets"])
+    streamed = counter.frequent_itemsets(SUPPORT)
+
+    # No frequent itemset is missed, none below `SUPPORT - epsilon` is reported
+    assert exact <= set(streamed["itemsets"])
+    for row in streamed.itertuples():
+        true_support = counts[row.itemsets] / n
+        assert true_support >= SUPPORT - epsilon
+        assert row.support <= true_support <= row.support + epsilon
+        assert true_support <= row.max_support
+
+
+def test_memory_is_bounded_by_pruning(transactions):
+    counter = LossyCounter(0.02, max_itemset_size=2)
+    for transaction in transactions * 4:
+        counter.add(transaction)
+    assert len(counter) < len(exact_counts(transactions)) / 2
+
+
+def test_checkpoint_resumes_the_stream(tmp_path, transactions):
+    middle = len(transactions) // 2
+    uninterrupted = LossyCounter(0.02)
+    resumed = LossyCounter(0.02)
+    for transaction in transactions[:middle]:
+        uninterrupted.add(transaction)
+        resumed.add(transaction)
+    resumed.save(tmp_path / "frequent_items.npz")
+    resumed = LossyCounter.load(tmp_path / "frequent_items.npz")
+    for transaction in transactions[middle:]:
+        uninterrupted.add(transaction)
+        resumed.add(transaction)
+    assert resumed.n_of_transactions == uninterrupted.n_of_transactions
+    assert resumed.entries == uninterrupted.entries
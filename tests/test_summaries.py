@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from analyze_workflows import Workflow
+from summaries import SummaryTables
+
+
+@pytest.fixture
+def workflows(corpus, offline_marketplace):
+    return [Workflow(Path(), Path(key), text) for key, text in corpus.workflows()]
+
+
+def assert_same_tables(summaries, other):
+    for name in SummaryTables.TABLES:
+        pd.testing.assert_frame_equal(summaries.table(name), other.table(name))
+
+
+def test_merged_batches_match_whole_corpus(tmp_path, workflows):
+    whole = SummaryTables.from_workflows(workflows)
+    merged = SummaryTables.from_workflows(workflows[::2])
+    merged.merge(SummaryTables.from_workflows(workflows[1::2]))
+    assert_same_tables(merged, whole)
+
+    whole.save(tmp_path / "summary_tables.npz")
+    assert_same_tables(SummaryTables.load(tmp_path / "summary_tables.npz"), whole)
+
+
+def test_removed_workflows_leave_no_trace(workflows):
+    summaries = SummaryTables.from_workflows(workflows[:10])
+    for workflow in workflows[10:]:
+        summaries.add_workflow(workflow)
+    for workflow in workflows[10:]:
+        summaries.remove_workflow(workflow)
+    assert summaries.counters == SummaryTables.from_workflows(workflows[:10]).counters
@@ -0,0 +1,189 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from analyze_workflows import Workflow
+from conftest import BASE_DIR
+from workflow_index import ID_DTYPE, WorkflowIndex
+
+WORKFLOW_NAMES = [
+    "owner/a/ci.yml",
+    "owner/a/release.yml",
+    "owner/b/ci.yml",
+    "owner/c/ci.yml",
+    "owner/c/nightly.yml",
+    "owner/d/ci.yml",
+]
+POSTINGS = {
+    "action": {
+        "actions/checkout@v3": [0, 1, 2],
+        "actions/checkout@v4": [3, 5],
+    },
+    "action_noTag": {
+        "actions/checkout": [0, 1, 2, 3, 5],
+        "iterative/setup-cml": [2, 4],
+    },
+    "docker": {"build": [1, 3], "push": [1], "buildx build": [3]},
+    "event": {
+        "push": [0, 2, 3, 5],
+        "pull_request": [0, 2],
+        "schedule": [4],
+        "release": [1],
+    },
+}
+
+
+@pytest.fixture
+def index() -> WorkflowIndex:
+    postings = {
+        field: {term: np.array(ids, dtype=ID_DTYPE) for term, ids in terms.items()}
+        for field, terms in POSTINGS.items()
+    }
+    return WorkflowIndex(WORKFLOW_NAMES, postings)
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("event:push", [0, 2, 3, 5]),
+        # AND binds tighter than OR
+        ("event:schedule OR event:push AND event:pull_request", [0, 2, 4]),
+        ("event:push AND event:pull_request OR event:schedule", [0, 2, 4]),
+        ("(event:schedule OR event:push) AND event:pull_request", [0, 2]),
+        # NOT binds tighter than AND
+        ("NOT event:push AND action_noTag:actions/checkout", [1]),
+        ("NOT (event:push OR event:release)", [4]),
+        ("NOT NOT event:release", [1]),
+        ("event:push and not docker:build or event:release", [0, 1, 2, 5]),
+        ("((event:release))", [1]),
+        # Quoted terms
+        ('action:"actions/checkout@v4"', [3, 5]),
+        ('docker:"buildx build" OR docker:push', [1, 3]),
+        # Unknown terms match nothing
+        ("event:workflow_dispatch", []),
+        ("NOT event:workflow_dispatch", [0, 1, 2, 3, 4, 5]),
+        ("event:push AND docker:compose", []),
+    ],
+)
+def test_query(index, query, expected):
+    ids = index.query(query)
+    assert ids.tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "query, message",
+    [
+        ("", "Unexpected end"),
+        ("NOT", "Unexpected end"),
+        ("event:push AND", "Unexpected end"),
+        ("(event:push", "Unbalanced parentheses"),
+        ("()", 'Unexpected token ")"'),
+        ("event:push)", 'Unexpected token ")"'),
+        ("AND event:push", 'Unexpected token "AND"'),
+        ("event:push OR OR event:release", 'Unexpected token "OR"'),
+        ("event:push event:release", 'Unexpected token "event:release"'),
+        ("push", "expected"),
+        ('action:"actions/checkout', "Unterminated quote"),
+        ("trigger:push", 'Unknown field "trigger"'),
+    ],
+)
+def test_malformed_query(index, query, message):
+    with pytest.raises(ValueError, match=re.escape(message)):
+        index.query(query)
+
+
+def test_all_of_any_of(index):
+    assert index.all_of("event:push", "event:pull_request").tolist() == [0, 2]
+    assert index.all_of().tolist() == list(range(len(WORKFLOW_NAMES)))
+    assert index.any_of("docker:push", "event:schedule").tolist() == [1, 4]
+    assert index.any_of().tolist() == []
+
+
+def test_repositories_are_deduplicated(index):
+    ids = index.query("action_noTag:actions/checkout")
+    assert index.workflows(ids) == [
+        "owner/a/ci.yml",
+        "owner/a/release.yml",
+        "owner/b/ci.yml",
+        "owner/c/ci.yml",
+        "owner/d/ci.yml",
+    ]
+    assert index.repositories(ids) == ["owner/a", "owner/b", "owner/c", "owner/d"]
+
+
+def test_npz_round_trip(index, tmp_path):
+    index.save(tmp_path / "workflow_index.npz")
+    loaded = WorkflowIndex.load(tmp_path / "workflow_index.npz")
+
+    assert loaded.workflow_names == index.workflow_names
+    assert loaded.postings.keys() == index.postings.keys()
+    for field, terms in index.postings.items():
+        assert loaded.postings[field].keys() == terms.keys()
+        for term, ids in terms.items():
+            assert loaded.postings[field][term].dtype == ID_DTYPE
+            assert loaded.postings[field][term].tolist() == ids.tolist()
+    assert loaded.terms("event") == index.terms("event")
+
+
+def test_command_line(index, tmp_path):
+    index.save(tmp_path / "workflow_index.npz")
+    env = dict(os.environ, PYTHONPATH=str(BASE_DIR / "actions4DS"))
+
+    def run(*args) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, str(BASE_DIR / "actions4DS" / "workflow_index.py")]
+            + ["--index", str(tmp_path / "workflow_index.npz"), *args],
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+
+    result = run("event:push OR event:release", "--repos")
+    assert result.returncode == 0
+    *repos, summary = result.stdout.splitlines()
+    assert repos == ["owner/a", "owner/b", "owner/c", "owner/d"]
+    assert summary.startswith("4 results")
+
+    result = run("event:push AND")
+    assert result.returncode == 2
+    assert "Unexpected end of query." in result.stderr
+    assert "Traceback" not in result.stderr
+
+
+def test_from_workflows(offline_marketplace):
+    texts = {
+        "owner/a/ci.yml": """
+on: [push, pull_request]
+jobs:
+  build:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v3
+      - run: docker build -t image .
+""",
+        "owner/b/nightly.yml": """
+on:
+  schedule:
+    - cron: "0 0 * * *"
+jobs:
+  train:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v4
+      - uses: iterative/setup-cml@v1
+""",
+    }
+    workflows = [
+        Workflow(Path("data"), Path("data") / key, text) for key, text in texts.items()
+    ]
+    index = WorkflowIndex.from_workflows(workflows)
+
+    assert index.workflow_names == list(texts)
+    assert index.query("action_noTag:actions/checkout").tolist() == [0, 1]
+    assert index.query("action:actions/checkout@v4").tolist() == [1]
+    assert index.query("docker:build AND event:pull_request").tolist() == [0]
+    assert index.query("event:schedule AND NOT docker:build").tolist() == [1]